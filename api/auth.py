@@ -8,43 +8,37 @@ import json
 import hashlib
 import hmac
 import os
+import sys
 import time
 from urllib.parse import urlparse, parse_qs
 
-# Simple user storage (JSON file)
+# Add parent directory to path (user_store.py, rate_limit.py)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from rate_limit import RATE_LIMITER, client_ip_from_forwarded, retry_after_header
+from user_store import UserStore, UserExists
+
+# User storage (SQLite WAL); users.json lama dimigrasikan saat pertama dibuka
 USERS_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'users.json')
+USERS_DB = os.environ.get("PRESCIENT_USERS_DB", os.path.join(os.path.dirname(__file__), '..', 'data', 'users.db'))
 SECRET_KEY = "your-secret-key-prescient-2024"  # Change in production
 
-def ensure_data_dir():
-    """Ensure data directory exists"""
-    data_dir = os.path.dirname(USERS_FILE)
-    if not os.path.exists(data_dir):
-        os.makedirs(data_dir)
+_user_store = None
 
-def load_users():
-    """Load users from JSON file"""
-    ensure_data_dir()
-    if not os.path.exists(USERS_FILE):
-        # Create with default users
-        default_users = {
-            "eiz": {
-                "username": "eiz",
-                "email": "eiz@prescient.com",
-                "password": hash_password("iris"),
-                "is_active": True
-            }
-        }
-        save_users(default_users)
-        return default_users
-    
-    with open(USERS_FILE, 'r') as f:
-        return json.load(f)
+def default_users():
+    """Default users jika belum ada data sama sekali"""
+    return [{
+        "username": "eiz",
+        "email": "eiz@prescient.com",
+        "password": hash_password("iris"),
+        "is_active": True
+    }]
 
-def save_users(users):
-    """Save users to JSON file"""
-    ensure_data_dir()
-    with open(USERS_FILE, 'w') as f:
-        json.dump(users, f, indent=2)
+def get_user_store():
+    """User store dibuka sekali per instance function (dipakai ulang saat warm)"""
+    global _user_store
+    if _user_store is None:
+        _user_store = UserStore(USERS_DB, legacy_json=USERS_FILE, default_users=default_users)
+    return _user_store
 
 def hash_password(password):
     """Hash password using PBKDF2-HMAC-SHA256"""
@@ -70,14 +64,34 @@ class handler(BaseHTTPRequestHandler):
             # Parse request body
             content_length = int(self.headers['Content-Length'])
             post_data = self.rfile.read(content_length)
-            data = json.loads(post_data.decode('utf-8'))
+            try:
+                data = json.loads(post_data.decode('utf-8'))
+            except ValueError:
+                data = None
+            if not isinstance(data, dict):
+                self.send_error_response(400, "Request body must be a JSON object")
+                return
             
             if path == '/api/auth/login' or path == '/auth/token':
-                self.handle_login(data)
+                route = '/api/auth/login'
             elif path == '/api/auth/register':
-                self.handle_register(data)
+                route = '/api/auth/register'
             else:
                 self.send_error_response(404, "Endpoint not found")
+                return
+            
+            # Token bucket per IP/username (berlaku per instance yang warm)
+            client_ip = client_ip_from_forwarded(self.headers.get('X-Forwarded-For'), self.client_address[0])
+            retry_after = RATE_LIMITER.check('POST', route, client_ip, data.get('username'))
+            if retry_after:
+                self.send_error_response(429, "Terlalu banyak request. Coba lagi nanti.",
+                                         {'Retry-After': retry_after_header(retry_after)})
+                return
+            
+            if route == '/api/auth/login':
+                self.handle_login(data)
+            else:
+                self.handle_register(data)
                 
         except Exception as e:
             self.send_error_response(500, str(e))
@@ -91,8 +105,7 @@ class handler(BaseHTTPRequestHandler):
             self.send_error_response(400, "Username and password required")
             return
         
-        users = load_users()
-        user = users.get(username)
+        user = get_user_store().get_by_username(username)
         
         if not user or not verify_password(password, user['password']):
             self.send_error_response(401, "Username atau password salah")
@@ -119,28 +132,15 @@ class handler(BaseHTTPRequestHandler):
             self.send_error_response(400, "Email, username, and password required")
             return
         
-        users = load_users()
-        
-        # Check if username exists
-        if username in users:
-            self.send_error_response(400, "Username sudah digunakan")
-            return
-        
-        # Check if email exists
-        for user in users.values():
-            if user['email'] == email:
+        # Create new user (username/email unik dijaga constraint database)
+        try:
+            get_user_store().create(username, email, hash_password(password))
+        except UserExists as e:
+            if e.field == 'username':
+                self.send_error_response(400, "Username sudah digunakan")
+            else:
                 self.send_error_response(400, "Email sudah terdaftar")
-                return
-        
-        # Create new user
-        users[username] = {
-            "username": username,
-            "email": email,
-            "password": hash_password(password),
-            "is_active": True
-        }
-        
-        save_users(users)
+            return
         
         response = {
             "success": True,
@@ -169,11 +169,13 @@ class handler(BaseHTTPRequestHandler):
         self.end_headers()
         self.wfile.write(json.dumps(data).encode('utf-8'))
     
-    def send_error_response(self, code, message):
+    def send_error_response(self, code, message, headers=None):
         """Send error response"""
         self.send_response(code)
         self.send_header('Content-Type', 'application/json')
         self.send_header('Access-Control-Allow-Origin', '*')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
         self.end_headers()
         error = {"detail": message}
         self.wfile.write(json.dumps(error).encode('utf-8'))
@@ -3,17 +3,19 @@ Authentication utilities for Prescient System
 JWT Token generation, password hashing, email sending
 """
 
+import hashlib
+import os
+import threading
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-import hashlib
-import secrets
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from pydantic import BaseModel, EmailStr
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from hashing_pool import hash_password, check_password
+from mail_queue import MailQueue, SMTPConfig
+from shared_state import SHARED_STATE
 
 # Security Configuration
 SECRET_KEY = "prescient-secret-key-change-this-in-production-2024"  # CHANGE IN PRODUCTION!
@@ -21,13 +23,21 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 1440  # 24 hours
 
 # OAuth2 scheme
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
+
+# Username admin (pisah koma) untuk endpoint operasional: registry model,
+# shadow scoring, perubahan data lead. Kosong = tidak ada admin.
+ADMIN_USERS = {u.strip() for u in os.environ.get("PRESCIENT_ADMIN_USERS", "").split(",") if u.strip()}
+
+# Verified-token cache (jumlah token maksimal di memori)
+TOKEN_CACHE_SIZE = int(os.environ.get("PRESCIENT_TOKEN_CACHE_SIZE", "10000"))
 
 # Email Configuration (Gmail SMTP)
-EMAIL_HOST = "smtp.gmail.com"
-EMAIL_PORT = 587
-EMAIL_USER = "your-email@gmail.com"  # REPLACE WITH YOUR GMAIL
-EMAIL_PASSWORD = "your-app-password"  # REPLACE WITH GMAIL APP PASSWORD
+EMAIL_HOST = os.environ.get("PRESCIENT_SMTP_HOST", "smtp.gmail.com")
+EMAIL_PORT = int(os.environ.get("PRESCIENT_SMTP_PORT", "587"))
+EMAIL_USER = os.environ.get("PRESCIENT_SMTP_USER", "your-email@gmail.com")  # REPLACE WITH YOUR GMAIL
+EMAIL_PASSWORD = os.environ.get("PRESCIENT_SMTP_PASSWORD", "your-app-password")  # REPLACE WITH GMAIL APP PASSWORD
+EMAIL_STARTTLS = os.environ.get("PRESCIENT_SMTP_STARTTLS", "1") != "0"
 
 # Pydantic Models
 class UserRegister(BaseModel):
@@ -50,29 +60,15 @@ class TokenData(BaseModel):
     username: Optional[str] = None
 
 # Password utilities
+# PBKDF2 ada di hashing_pool.py; route auth memanggilnya lewat HASHING_POOL
+# supaya tidak memblokir threadpool. Fungsi sync ini untuk script/CLI.
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify plain password against hashed password"""
-    # Extract salt and hash from stored password
-    # Format: salt$hash
-    try:
-        salt, stored_hash = hashed_password.split('$')
-        # Hash the plain password with the same salt
-        password_hash = hashlib.pbkdf2_hmac('sha256', plain_password.encode('utf-8'), 
-                                           salt.encode('utf-8'), 100000)
-        calculated_hash = password_hash.hex()
-        return calculated_hash == stored_hash
-    except:
-        return False
+    """Verify plain password against hashed password (format: salt$hash)"""
+    return check_password(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    """Hash a plain password with salt"""
-    # Generate random salt
-    salt = secrets.token_hex(16)
-    # Hash password with salt
-    password_hash = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), 
-                                       salt.encode('utf-8'), 100000)
-    # Return salt$hash format
-    return f"{salt}${password_hash.hex()}"
+    """Hash a plain password with salt (format: salt$hash)"""
+    return hash_password(password)
 
 # JWT Token utilities
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -87,27 +83,200 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+class TokenCache:
+    """
+    Cache token yang sudah diverifikasi: token -> (TokenData, exp).
+    
+    Cache hit hanya berupa lookup dict + perbandingan exp, tanpa decode JWT
+    dan HMAC. Entry berlaku sampai `exp` token itu sendiri. Jika penuh,
+    entry kadaluarsa dibuang dulu, lalu entry tertua. Token yang di-revoke
+    dikeluarkan dari cache dan dicatat sampai exp-nya lewat.
+    
+    Revocation disimpan (sebagai hash SHA-256) di SharedState, sehingga logout
+    di satu worker serve.py berlaku di semua worker: get() memanggil
+    shared.sync() dulu, dan revocation dari proses lain dimuat ulang begitu
+    data_version SQLite berubah.
+    """
+    
+    def __init__(self, max_size: int = TOKEN_CACHE_SIZE, shared=SHARED_STATE):
+        self.max_size = max_size
+        self.shared = shared
+        self._entries = {}      # token -> (TokenData, exp, hash)
+        self._revoked = {}      # hash -> exp
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        shared.subscribe(self._reload_revoked)
+    
+    @staticmethod
+    def token_hash(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+    
+    def _reload_revoked(self):
+        """Muat ulang revocation dari SharedState dan buang token tsb dari cache."""
+        revoked = self.shared.revoked_tokens()
+        with self._lock:
+            self._revoked = revoked
+            for key in [k for k, (_, _, h) in self._entries.items() if h in revoked]:
+                del self._entries[key]
+    
+    def get(self, token: str) -> Optional[TokenData]:
+        self.shared.sync()
+        entry = self._entries.get(token)
+        if entry is None or entry[1] <= time.time():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[0]
+    
+    def put(self, token: str, token_data: TokenData, exp: float):
+        token_hash = self.token_hash(token)
+        with self._lock:
+            if token_hash in self._revoked:
+                return
+            if len(self._entries) >= self.max_size:
+                now = time.time()
+                for key in [k for k, (_, e, _) in self._entries.items() if e <= now]:
+                    del self._entries[key]
+                while len(self._entries) >= self.max_size:
+                    del self._entries[next(iter(self._entries))]
+            self._entries[token] = (token_data, exp, token_hash)
+    
+    def revoke(self, token: str, exp: float):
+        token_hash = self.token_hash(token)
+        self.shared.revoke(token_hash, exp)
+        with self._lock:
+            self._entries.pop(token, None)
+            now = time.time()
+            for key in [k for k, e in self._revoked.items() if e <= now]:
+                del self._revoked[key]
+            self._revoked[token_hash] = exp
+    
+    def is_revoked(self, token: str) -> bool:
+        return self.token_hash(token) in self._revoked
+    
+    def stats(self):
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "revoked": len(self._revoked),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+TOKEN_CACHE = TokenCache()
+
 def verify_token(token: str) -> TokenData:
-    """Verify JWT token and extract username"""
+    """Verify JWT token and extract username (cached sampai exp token)"""
+    token_data = TOKEN_CACHE.get(token)
+    if token_data is not None:
+        return token_data
+    
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    if TOKEN_CACHE.is_revoked(token):
+        raise credentials_exception
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
-        if username is None:
+        # Token reset password tidak boleh dipakai sebagai access token
+        if username is None or payload.get("purpose") is not None:
             raise credentials_exception
         token_data = TokenData(username=username)
+        TOKEN_CACHE.put(token, token_data, payload["exp"])
         return token_data
-    except JWTError:
+    except (JWTError, KeyError):
         raise credentials_exception
 
+def revoke_token(token: str):
+    """Revoke access token (logout); berlaku sampai token kadaluarsa"""
+    verify_token(token)
+    TOKEN_CACHE.revoke(token, jwt.get_unverified_claims(token)["exp"])
+
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> TokenData:
+    """
+    Dependency untuk route yang butuh login (Authorization: Bearer <token>)
+    
+    async supaya FastAPI tidak mengirimnya ke threadpool.
+    """
+    return verify_token(token)
+
+async def get_current_admin(current_user: TokenData = Depends(get_current_user)) -> TokenData:
+    """
+    Dependency untuk route admin: login + username ada di PRESCIENT_ADMIN_USERS
+    """
+    if current_user.username not in ADMIN_USERS:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Hanya admin yang boleh mengakses endpoint ini",
+        )
+    return current_user
+
 # Email utilities
+# Template HTML di-render sekali saat import; per email hanya link yang disisipkan
+RESET_EMAIL_SUBJECT = "Prescient - Reset Password Request"
+RESET_LINK_TEMPLATE = "http://localhost:8000/reset-password?token={reset_token}"
+RESET_EMAIL_TEMPLATE = """
+<html>
+  <body style="font-family: Arial, sans-serif; background-color: #050507; color: #e2e8f0; padding: 20px;">
+    <div style="max-width: 600px; margin: 0 auto; background: rgba(15, 16, 20, 0.9); border-radius: 16px; padding: 40px; border: 1px solid rgba(99, 102, 241, 0.3);">
+      <h1 style="color: #6366f1; margin-bottom: 20px;">🔐 Prescient Password Reset</h1>
+      <p style="font-size: 16px; line-height: 1.6;">
+        Anda menerima email ini karena ada permintaan reset password untuk akun Prescient Anda.
+      </p>
+      <p style="font-size: 16px; line-height: 1.6;">
+        Klik tombol di bawah untuk mereset password Anda:
+      </p>
+      <div style="text-align: center; margin: 30px 0;">
+        <a href="{reset_link}" 
+           style="background: linear-gradient(135deg, #6366f1 0%, #a855f7 100%); 
+                  color: white; 
+                  padding: 14px 32px; 
+                  text-decoration: none; 
+                  border-radius: 12px; 
+                  font-weight: bold;
+                  display: inline-block;
+                  box-shadow: 0 4px 15px rgba(99, 102, 241, 0.4);">
+          RESET PASSWORD
+        </a>
+      </div>
+      <p style="font-size: 14px; color: #9ca3af; line-height: 1.6;">
+        Atau copy link berikut ke browser Anda:<br>
+        <code style="background: rgba(0,0,0,0.3); padding: 8px; border-radius: 4px; display: block; margin-top: 8px; word-break: break-all;">
+          {reset_link}
+        </code>
+      </p>
+      <hr style="border: 1px solid rgba(255,255,255,0.1); margin: 30px 0;">
+      <p style="font-size: 12px; color: #6b7280;">
+        ⚠️ Link ini akan kadaluarsa dalam 1 jam.<br>
+        Jika Anda tidak meminta reset password, abaikan email ini.
+      </p>
+      <p style="font-size: 12px; color: #4b5563; margin-top: 20px;">
+        Best regards,<br>
+        <strong>Prescient Team</strong>
+      </p>
+    </div>
+  </body>
+</html>
+"""
+_RESET_EMAIL_PARTS = RESET_EMAIL_TEMPLATE.split("{reset_link}")
+
+MAIL_QUEUE = MailQueue(SMTPConfig(EMAIL_HOST, EMAIL_PORT, EMAIL_USER, EMAIL_PASSWORD, starttls=EMAIL_STARTTLS))
+
+def render_reset_password_email(reset_token: str) -> str:
+    """HTML email reset password untuk satu token."""
+    reset_link = RESET_LINK_TEMPLATE.format(reset_token=reset_token)
+    return reset_link.join(_RESET_EMAIL_PARTS)
+
 def send_reset_password_email(email: str, reset_token: str):
     """
-    Send password reset email to user
+    Queue password reset email to user (dikirim oleh worker MAIL_QUEUE)
+    
+    Return True jika email masuk antrian. Pengiriman SMTP, retry dan
+    backoff terjadi di background (lihat mail_queue.py).
     
     SETUP GMAIL APP PASSWORD:
     1. Go to https://myaccount.google.com/security
@@ -115,78 +284,15 @@ def send_reset_password_email(email: str, reset_token: str):
     3. Go to App passwords: https://myaccount.google.com/apppasswords
     4. Select "Mail" and "Other (Custom name)" -> Name it "Prescient"
     5. Copy the 16-character password
-    6. Replace EMAIL_PASSWORD in this file
+    6. Set PRESCIENT_SMTP_USER / PRESCIENT_SMTP_PASSWORD (atau EMAIL_PASSWORD di file ini)
     """
     
     try:
-        # Create message
-        message = MIMEMultipart("alternative")
-        message["Subject"] = "Prescient - Reset Password Request"
-        message["From"] = EMAIL_USER
-        message["To"] = email
-        
-        # Reset link (frontend route)
-        reset_link = f"http://localhost:8000/reset-password?token={reset_token}"
-        
-        # HTML email body
-        html = f"""
-        <html>
-          <body style="font-family: Arial, sans-serif; background-color: #050507; color: #e2e8f0; padding: 20px;">
-            <div style="max-width: 600px; margin: 0 auto; background: rgba(15, 16, 20, 0.9); border-radius: 16px; padding: 40px; border: 1px solid rgba(99, 102, 241, 0.3);">
-              <h1 style="color: #6366f1; margin-bottom: 20px;">🔐 Prescient Password Reset</h1>
-              <p style="font-size: 16px; line-height: 1.6;">
-                Anda menerima email ini karena ada permintaan reset password untuk akun Prescient Anda.
-              </p>
-              <p style="font-size: 16px; line-height: 1.6;">
-                Klik tombol di bawah untuk mereset password Anda:
-              </p>
-              <div style="text-align: center; margin: 30px 0;">
-                <a href="{reset_link}" 
-                   style="background: linear-gradient(135deg, #6366f1 0%, #a855f7 100%); 
-                          color: white; 
-                          padding: 14px 32px; 
-                          text-decoration: none; 
-                          border-radius: 12px; 
-                          font-weight: bold;
-                          display: inline-block;
-                          box-shadow: 0 4px 15px rgba(99, 102, 241, 0.4);">
-                  RESET PASSWORD
-                </a>
-              </div>
-              <p style="font-size: 14px; color: #9ca3af; line-height: 1.6;">
-                Atau copy link berikut ke browser Anda:<br>
-                <code style="background: rgba(0,0,0,0.3); padding: 8px; border-radius: 4px; display: block; margin-top: 8px; word-break: break-all;">
-                  {reset_link}
-                </code>
-              </p>
-              <hr style="border: 1px solid rgba(255,255,255,0.1); margin: 30px 0;">
-              <p style="font-size: 12px; color: #6b7280;">
-                ⚠️ Link ini akan kadaluarsa dalam 1 jam.<br>
-                Jika Anda tidak meminta reset password, abaikan email ini.
-              </p>
-              <p style="font-size: 12px; color: #4b5563; margin-top: 20px;">
-                Best regards,<br>
-                <strong>Prescient Team</strong>
-              </p>
-            </div>
-          </body>
-        </html>
-        """
-        
-        # Attach HTML body
-        part = MIMEText(html, "html")
-        message.attach(part)
-        
-        # Send email via Gmail SMTP
-        with smtplib.SMTP(EMAIL_HOST, EMAIL_PORT) as server:
-            server.starttls()
-            server.login(EMAIL_USER, EMAIL_PASSWORD)
-            server.send_message(message)
-        
+        MAIL_QUEUE.enqueue(email, RESET_EMAIL_SUBJECT, render_reset_password_email(reset_token))
         return True
     
     except Exception as e:
-        print(f"❌ Error sending email: {e}")
+        print(f"❌ Error queueing email: {e}")
         return False
 
 def generate_password_reset_token(email: str) -> str:
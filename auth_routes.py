@@ -4,19 +4,25 @@ Register, Login, Forgot Password endpoints
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from database import get_db, User, init_db
+from sqlalchemy import or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db, AsyncSessionLocal, User, init_db
 from auth import (
     UserRegister, 
     UserLogin, 
     ForgotPassword, 
     Token,
-    get_password_hash, 
-    verify_password,
     create_access_token,
+    oauth2_scheme,
+    revoke_token,
+    TOKEN_CACHE,
+    MAIL_QUEUE,
     send_reset_password_email,
     generate_password_reset_token
 )
+from hashing_pool import HASHING_POOL, PoolSaturated
+from rate_limit import RATE_LIMITER
 
 # Initialize database tables
 init_db()
@@ -24,9 +30,69 @@ init_db()
 # Create router
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
+async def run_hashing(fn, *args):
+    """
+    Jalankan hashing di HASHING_POOL; 503 + Retry-After jika pool penuh
+    """
+    try:
+        return await fn(*args)
+    except PoolSaturated:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server sedang sibuk memproses login. Coba lagi sebentar.",
+            headers={"Retry-After": "1"},
+        )
+
+# Query database untuk register/login memakai AsyncSessionLocal dengan session
+# pendek, supaya koneksi pool tidak ditahan selama menunggu hashing.
+
+DUPLICATE_EMAIL = "Email sudah terdaftar. Gunakan email lain atau login."
+DUPLICATE_USERNAME = "Username sudah digunakan. Pilih username lain."
+
+async def find_user(username: str):
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(select(User).where(User.username == username))
+
+async def check_new_user(email: str, username: str):
+    """Return pesan error jika email/username sudah dipakai, None jika bebas (satu query)"""
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(
+            select(User.email, User.username)
+            .where(or_(User.email == email, User.username == username))
+            .limit(2)
+        )).all()
+    if any(row.email == email for row in rows):
+        return DUPLICATE_EMAIL
+    if rows:
+        return DUPLICATE_USERNAME
+    return None
+
+async def create_user(email: str, username: str, hashed_password: str):
+    """
+    INSERT user baru; unique constraint email/username yang menjadi penentu
+    akhir (register bersamaan dengan data sama -> HTTP 400, bukan 500)
+    """
+    new_user = User(
+        email=email,
+        username=username,
+        hashed_password=hashed_password,
+        is_active=True
+    )
+    async with AsyncSessionLocal() as db:
+        db.add(new_user)
+        try:
+            await db.commit()
+        except IntegrityError as e:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=DUPLICATE_EMAIL if "users.email" in str(e.orig) else DUPLICATE_USERNAME
+            )
+    return new_user
+
 # ==================== REGISTER ENDPOINT ====================
 @router.post("/register", status_code=status.HTTP_201_CREATED)
-def register_user(user_data: UserRegister, db: Session = Depends(get_db)):
+async def register_user(user_data: UserRegister):
     """
     Register new user
     
@@ -35,36 +101,19 @@ def register_user(user_data: UserRegister, db: Session = Depends(get_db)):
     - **password**: Plain password (will be hashed)
     """
     
-    # Check if email already exists
-    existing_email = db.query(User).filter(User.email == user_data.email).first()
-    if existing_email:
+    # Check if email or username already exists
+    error = await check_new_user(user_data.email, user_data.username)
+    if error:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email sudah terdaftar. Gunakan email lain atau login."
+            detail=error
         )
     
-    # Check if username already exists
-    existing_username = db.query(User).filter(User.username == user_data.username).first()
-    if existing_username:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username sudah digunakan. Pilih username lain."
-        )
-    
-    # Hash password
-    hashed_password = get_password_hash(user_data.password)
+    # Hash password (process pool, tidak memblokir event loop/threadpool)
+    hashed_password = await run_hashing(HASHING_POOL.hash_password, user_data.password)
     
     # Create new user
-    new_user = User(
-        email=user_data.email,
-        username=user_data.username,
-        hashed_password=hashed_password,
-        is_active=True
-    )
-    
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    new_user = await create_user(user_data.email, user_data.username, hashed_password)
     
     return {
         "success": True,
@@ -78,7 +127,7 @@ def register_user(user_data: UserRegister, db: Session = Depends(get_db)):
 
 # ==================== LOGIN ENDPOINT ====================
 @router.post("/token", response_model=Token)
-def login(user_data: UserLogin, db: Session = Depends(get_db)):
+async def login(user_data: UserLogin):
     """
     Login and get access token
     
@@ -89,7 +138,7 @@ def login(user_data: UserLogin, db: Session = Depends(get_db)):
     """
     
     # Find user by username
-    user = db.query(User).filter(User.username == user_data.username).first()
+    user = await find_user(user_data.username)
     
     if not user:
         raise HTTPException(
@@ -98,8 +147,8 @@ def login(user_data: UserLogin, db: Session = Depends(get_db)):
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Verify password
-    if not verify_password(user_data.password, user.hashed_password):
+    # Verify password (process pool)
+    if not await run_hashing(HASHING_POOL.verify_password, user_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Username atau password salah",
@@ -121,9 +170,23 @@ def login(user_data: UserLogin, db: Session = Depends(get_db)):
         "token_type": "bearer"
     }
 
+# ==================== LOGOUT ENDPOINT ====================
+@router.post("/logout")
+async def logout(token: str = Depends(oauth2_scheme)):
+    """
+    Logout: revoke access token yang sedang dipakai
+    
+    Token tidak bisa dipakai lagi walaupun belum kadaluarsa.
+    """
+    revoke_token(token)
+    return {
+        "success": True,
+        "message": "Logout berhasil."
+    }
+
 # ==================== FORGOT PASSWORD ENDPOINT ====================
 @router.post("/forgot-password")
-def forgot_password(request: ForgotPassword, db: Session = Depends(get_db)):
+async def forgot_password(request: ForgotPassword, db: AsyncSession = Depends(get_async_db)):
     """
     Request password reset email
     
@@ -133,7 +196,7 @@ def forgot_password(request: ForgotPassword, db: Session = Depends(get_db)):
     """
     
     # Find user by email
-    user = db.query(User).filter(User.email == request.email).first()
+    user = await db.scalar(select(User).where(User.email == request.email))
     
     # For security: always return success even if email not found
     # This prevents email enumeration attacks
@@ -146,7 +209,7 @@ def forgot_password(request: ForgotPassword, db: Session = Depends(get_db)):
     # Generate reset token
     reset_token = generate_password_reset_token(user.email)
     
-    # Send email
+    # Masukkan email ke antrian (dikirim worker di background)
     email_sent = send_reset_password_email(user.email, reset_token)
     
     if email_sent:
@@ -158,7 +221,7 @@ def forgot_password(request: ForgotPassword, db: Session = Depends(get_db)):
     else:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Gagal mengirim email. Periksa konfigurasi SMTP."
+            detail="Gagal memasukkan email ke antrian. Periksa konfigurasi mail queue."
         )
 
 # ==================== HEALTH CHECK ====================
@@ -171,6 +234,11 @@ def auth_health():
         "endpoints": [
             "POST /auth/register",
             "POST /auth/token",
+            "POST /auth/logout",
             "POST /auth/forgot-password"
-        ]
+        ],
+        "hashing_pool": HASHING_POOL.stats(),
+        "token_cache": TOKEN_CACHE.stats(),
+        "mail_queue": MAIL_QUEUE.stats(),
+        "rate_limit": RATE_LIMITER.stats()
     }
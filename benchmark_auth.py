@@ -0,0 +1,170 @@
+"""
+Prescient - Predictive Lead Scoring
+Auth Throughput Benchmark
+
+Mengukur throughput dan latency /auth/register dan /auth/token dengan
+request bersamaan (asyncio + httpx):
+
+- register : N user baru, concurrency C
+- login    : N login untuk user yang baru dibuat
+- race     : C register bersamaan dengan username/email yang sama; harus
+             tepat satu 201 dan sisanya 400 (unique constraint), tanpa 500
+
+Default-nya app dijalankan in-process (httpx ASGITransport) dengan database
+SQLite sementara, jadi prescient.db tidak tersentuh. Dengan --url benchmark
+dijalankan ke server yang sedang berjalan.
+
+Usage:
+    python benchmark_auth.py
+    python benchmark_auth.py --requests 500 --concurrency 16,64
+    python benchmark_auth.py --url http://localhost:8000 --output benchmark_results/auth.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+import numpy as np
+
+DEFAULT_REQUESTS = 200
+DEFAULT_CONCURRENCY = [1, 8, 32]
+PASSWORD = "bench-password-123"
+
+def build_app():
+    """App minimal berisi auth router saja (tanpa load model)"""
+    from fastapi import FastAPI
+    from auth_routes import router
+
+    app = FastAPI()
+    app.include_router(router)
+    return app
+
+async def run_phase(client, name, payloads, path, concurrency):
+    """Kirim semua payload dengan maksimal `concurrency` request bersamaan"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    statuses = {}
+
+    async def one(payload):
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post(path, json=payload)
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(payload) for payload in payloads))
+    elapsed = time.perf_counter() - started
+
+    latencies_ms = np.array(latencies) * 1000
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+    return {
+        "phase": name,
+        "concurrency": concurrency,
+        "requests": len(payloads),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(payloads) / elapsed, 1),
+        "latency_ms": {"p50": round(float(p50), 2), "p95": round(float(p95), 2),
+                       "p99": round(float(p99), 2), "max": round(float(latencies_ms.max()), 2)},
+        "status": {str(code): count for code, count in sorted(statuses.items())},
+    }
+
+async def run_benchmark(client, requests, concurrency):
+    prefix = uuid.uuid4().hex[:8]
+    users = [
+        {"email": f"bench-{prefix}-{concurrency}-{i}@example.com",
+         "username": f"bench_{prefix}_{concurrency}_{i}",
+         "password": PASSWORD}
+        for i in range(requests)
+    ]
+    logins = [{"username": user["username"], "password": PASSWORD} for user in users]
+    race = [{"email": f"race-{prefix}-{concurrency}@example.com",
+             "username": f"race_{prefix}_{concurrency}",
+             "password": PASSWORD}] * max(concurrency, 2)
+
+    return [
+        await run_phase(client, "register", users, "/auth/register", concurrency),
+        await run_phase(client, "login", logins, "/auth/token", concurrency),
+        await run_phase(client, "race", race, "/auth/register", concurrency),
+    ]
+
+async def run_all(args):
+    import httpx
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=60)
+        app = None
+    else:
+        app = build_app()
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+
+    results = []
+    try:
+        async with client:
+            for concurrency in args.concurrency:
+                for result in await run_benchmark(client, args.requests, concurrency):
+                    print_result(result)
+                    results.append(result)
+    finally:
+        if app is not None:
+            from database import async_engine
+            from hashing_pool import HASHING_POOL
+            HASHING_POOL.shutdown()
+            await async_engine.dispose()
+    return results
+
+def print_result(result):
+    latency = result["latency_ms"]
+    print(f"  {result['phase']:<9} c={result['concurrency']:<4} "
+          f"{result['throughput_rps']:>8.1f} req/s   p50 {latency['p50']:>8.2f} ms   "
+          f"p95 {latency['p95']:>8.2f} ms   status {result['status']}")
+
+def parse_concurrency(value):
+    return [int(v) for v in value.split(',') if v.strip()]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark throughput register/login Prescient.')
+    parser.add_argument('--requests', type=int, default=DEFAULT_REQUESTS, help='Jumlah request per fase')
+    parser.add_argument('--concurrency', type=parse_concurrency, default=DEFAULT_CONCURRENCY,
+                        help='Daftar concurrency, dipisah koma (default: 1,8,32)')
+    parser.add_argument('--url', help='Base URL server yang sedang berjalan (default: in-process)')
+    parser.add_argument('--output', help='Tulis hasil sebagai JSON')
+    args = parser.parse_args(argv)
+
+    if not args.url:
+        # Database sementara supaya prescient.db tidak berisi user benchmark
+        tmpdir = tempfile.mkdtemp(prefix='prescient-auth-bench-')
+        os.environ["PRESCIENT_DB_PATH"] = os.path.join(tmpdir, "auth_bench.db")
+        os.environ.setdefault("PRESCIENT_MAIL_QUEUE_DB", os.path.join(tmpdir, "mail_queue.db"))
+
+    print("\n" + "="*60)
+    print(f"🔐 AUTH BENCHMARK ({args.url or 'in-process'}, {args.requests} request per fase)")
+    print("="*60)
+    results = asyncio.run(run_all(args))
+
+    race_errors = [r for r in results if r["phase"] == "race" and (r["status"].get("201", 0) != 1 or "500" in r["status"])]
+    if race_errors:
+        print("❌ Register bersamaan tidak menghasilkan tepat satu 201:", [r["status"] for r in race_errors])
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                "generated_at": datetime.now().isoformat(timespec='seconds'),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "target": args.url or "in-process",
+                "results": results,
+            }, f, indent=2)
+        print(f"💾 Hasil ditulis ke {args.output}")
+
+    return 1 if race_errors else 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,116 @@
+"""
+Prescient - Predictive Lead Scoring
+Columnar Batch Scoring Benchmark
+
+Membandingkan rows/detik batch scoring in-process (model asli):
+
+- json     : POST /predict/batch (list LeadInput, validasi Pydantic per baris)
+- framed   : POST /predict/columnar dengan typed-array framing
+- arrow    : POST /predict/columnar dengan Arrow IPC (jika pyarrow terpasang)
+
+Payload dibuat sekali sebelum timing (biaya encode di sisi client tidak
+dihitung); yang diukur adalah request penuh: decode, validasi, predict_proba,
+encode response. Skor dari ketiga jalur dicek sama.
+
+Usage:
+    python benchmark_columnar.py
+    python benchmark_columnar.py --rows 1000,10000,100000 --repeat 5
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import time
+
+import numpy as np
+
+DEFAULT_SOURCE = 'bank-full.csv'
+DEFAULT_ROWS = [1_000, 10_000, 100_000]
+
+def make_frame(source, rows, seed=42):
+    """Resample data prospek ke `rows` baris (kolom FEATURE_COLUMNS)"""
+    from lead_io import LEAD_SCHEMA, load_csv
+    from scoring import FEATURE_COLUMNS
+
+    df = load_csv(source, schema=LEAD_SCHEMA)[FEATURE_COLUMNS]
+    return df.sample(n=rows, replace=True, random_state=seed).reset_index(drop=True)
+
+def build_payloads(df):
+    from columnar import ARROW_MEDIA_TYPE, FRAMED_MEDIA_TYPE, HAS_PYARROW, encode_arrow, encode_framed
+
+    records = df.astype({c: object for c in df.columns if str(df[c].dtype) == 'category'}).to_dict('records')
+    for record in records:
+        record['Saldo'] = float(record['Saldo'])
+    columns = {c: df[c] for c in df.columns}
+    payloads = {
+        "json": ("/predict/batch", "application/json", json.dumps(records).encode('utf-8')),
+        "framed": ("/predict/columnar", FRAMED_MEDIA_TYPE, encode_framed(columns)),
+    }
+    if HAS_PYARROW:
+        arrow_columns = {c: (df[c].array if str(df[c].dtype) == 'category' else df[c].to_numpy()) for c in df.columns}
+        payloads["arrow"] = ("/predict/columnar", ARROW_MEDIA_TYPE, encode_arrow(arrow_columns))
+    return payloads
+
+def response_scores(name, content):
+    from columnar import decode_arrow, decode_framed
+
+    if name == "json":
+        return np.array([row['prediction_score'] for row in json.loads(content)])
+    _, columns = (decode_arrow if name == "arrow" else decode_framed)(content)
+    return np.asarray(columns['prediction_score'])
+
+def run(sizes, source, repeat):
+    from fastapi.testclient import TestClient
+    import main
+    from auth import create_access_token
+
+    token = create_access_token(data={'sub': 'benchmark'})
+    results = []
+    with contextlib.redirect_stdout(io.StringIO()), TestClient(main.app) as client:
+        for rows in sizes:
+            payloads = build_payloads(make_frame(source, rows))
+            scores = {}
+            for name, (path, media_type, body) in payloads.items():
+                headers = {"Authorization": f"Bearer {token}", "Content-Type": media_type}
+                timings = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    response = client.post(path, content=body, headers=headers)
+                    timings.append(time.perf_counter() - started)
+                    response.raise_for_status()
+                scores[name] = response_scores(name, response.content)
+                best = min(timings)
+                results.append({"rows": rows, "format": name, "payload_bytes": len(body),
+                                "seconds": best, "rows_per_s": rows / best})
+            reference = scores["json"]
+            for name, values in scores.items():
+                assert np.allclose(values, reference), f"Skor {name} berbeda dari json"
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark batch scoring JSON vs kolumnar.')
+    parser.add_argument('--source', default=DEFAULT_SOURCE, help='CSV prospek untuk resampling')
+    parser.add_argument('--rows', default=','.join(str(r) for r in DEFAULT_ROWS),
+                        help='Ukuran batch, dipisah koma')
+    parser.add_argument('--repeat', type=int, default=3, help='Jumlah pengulangan (diambil yang tercepat)')
+    args = parser.parse_args(argv)
+    sizes = [int(r) for r in args.rows.split(',') if r.strip()]
+
+    # Batas batch dan rate limit tidak boleh memotong benchmark
+    os.environ["PRESCIENT_RATE_LIMIT"] = "0"
+    os.environ["PRESCIENT_MAX_BATCH_SIZE"] = str(max(sizes))
+
+    print("\n" + "="*60)
+    print("📦 BATCH SCORING: JSON vs KOLUMNAR")
+    print("="*60)
+    results = run(sizes, args.source, args.repeat)
+    baseline = {r["rows"]: r["rows_per_s"] for r in results if r["format"] == "json"}
+    for r in results:
+        print(f"  {r['rows']:>9,} rows  {r['format']:<7} {r['payload_bytes'] / 1e6:8.2f} MB  "
+              f"{r['seconds'] * 1000:9.1f} ms  {r['rows_per_s']:>12,.0f} rows/s  "
+              f"({r['rows_per_s'] / baseline[r['rows']]:.1f}x)")
+
+if __name__ == '__main__':
+    main()
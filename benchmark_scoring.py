@@ -0,0 +1,269 @@
+"""
+Prescient - Scoring Micro-Benchmarks
+
+Micro-benchmark kernel scoring yang dijalankan lewat pytest:
+
+- encode_row   : satu lead (dict) -> input classifier
+- predict      : skor untuk batch 1, 10, 100, 10k dan 1M lead (kolom numpy)
+- label        : assignment Hot/Warm/Cold untuk 10k skor
+- serialize    : response /predict (satu skor) dan /predict/batch (1000 skor)
+
+Setiap benchmark dijalankan untuk semua backend scoring yang tersedia untuk
+model default: pipeline (DataFrame + predict_proba), encoder (LeadEncoder)
+dan lut (LookupTableScorer; di-skip jika model tidak bisa dikompilasi).
+
+Hasil setiap run ditambahkan ke history JSON. Median setiap benchmark
+dibandingkan dengan median dari PRESCIENT_BENCH_BASELINE_RUNS run terakhir
+di mesin yang sama; test gagal jika lebih lambat dari
+PRESCIENT_BENCH_REGRESSION persen.
+
+Usage:
+    python -m pytest benchmark_scoring.py -q
+    python -m pytest benchmark_scoring.py -q -k "encoder and not 1000000"
+    PRESCIENT_BENCH_MAX_BATCH=10000 python benchmark_scoring.py
+
+Environment:
+    PRESCIENT_BENCH_HISTORY         file history (default benchmark_results/scoring_history.json)
+    PRESCIENT_BENCH_REGRESSION      toleransi regresi dalam persen (default 25)
+    PRESCIENT_BENCH_BASELINE_RUNS   jumlah run terakhir untuk baseline (default 5)
+    PRESCIENT_BENCH_MIN_TIME        waktu ukur minimum per benchmark, detik (default 0.5)
+    PRESCIENT_BENCH_MAX_BATCH       batch predict terbesar yang dijalankan (default 1000000)
+    PRESCIENT_BENCH_SAVE            0 = jangan tulis hasil ke history
+"""
+
+import json
+import os
+import platform
+import statistics
+import time
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from lead_encoder import encoder_for
+from lead_io import LEAD_SCHEMA, load_csv
+from lead_table import tier_codes
+from lut_scorer import lut_for
+from model_registry import ModelRegistry
+from scoring import FEATURE_COLUMNS, RECOMMENDATIONS, encode_prediction, encode_predictions, label_for_score
+
+HISTORY_PATH = os.environ.get("PRESCIENT_BENCH_HISTORY", os.path.join("benchmark_results", "scoring_history.json"))
+REGRESSION = float(os.environ.get("PRESCIENT_BENCH_REGRESSION", "25")) / 100
+BASELINE_RUNS = int(os.environ.get("PRESCIENT_BENCH_BASELINE_RUNS", "5"))
+MIN_TIME = float(os.environ.get("PRESCIENT_BENCH_MIN_TIME", "0.5"))
+MAX_BATCH = int(os.environ.get("PRESCIENT_BENCH_MAX_BATCH", "1000000"))
+SAVE_HISTORY = os.environ.get("PRESCIENT_BENCH_SAVE", "1") != "0"
+
+MODEL_PATH = "prescient_model.pkl"
+LEADS_PATH = os.environ.get("PRESCIENT_LEADS_PATH", "bank-full.csv")
+
+BACKENDS = ["pipeline", "encoder", "lut"]
+BATCH_SIZES = [1, 10, 100, 10_000, 1_000_000]
+LABEL_SCORES = 10_000
+SERIALIZE_BATCH = 1_000
+MAX_ROUNDS = 1000
+
+# ==================== MEASUREMENT ====================
+
+def measure(fn, min_time=MIN_TIME):
+    """
+    Panggil fn berulang sampai total waktu >= min_time (maksimal MAX_ROUNDS)
+    dan kembalikan statistik mikrodetik per panggilan. Panggilan pertama
+    adalah warm-up, kecuali jika satu panggilan saja sudah >= min_time.
+    """
+    started = time.perf_counter()
+    fn()
+    first = time.perf_counter() - started
+    rounds = [first] if first >= min_time else []
+
+    total = sum(rounds)
+    while total < min_time and len(rounds) < MAX_ROUNDS:
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        rounds.append(elapsed)
+        total += elapsed
+
+    return {
+        "median_us": round(statistics.median(rounds) * 1e6, 3),
+        "min_us": round(min(rounds) * 1e6, 3),
+        "rounds": len(rounds),
+    }
+
+def machine_key():
+    return f"{platform.node()}/{platform.machine()}/{os.cpu_count()}"
+
+def read_history(path=HISTORY_PATH):
+    if not os.path.exists(path):
+        return {"runs": []}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def baseline_medians(history, machine, runs=BASELINE_RUNS):
+    """{benchmark: median dari median_us} untuk `runs` run terakhir di mesin yang sama."""
+    recent = [run for run in history["runs"] if run.get("machine") == machine][-runs:]
+    values = {}
+    for run in recent:
+        for name, result in run["results"].items():
+            values.setdefault(name, []).append(result["median_us"])
+    return {name: statistics.median(medians) for name, medians in values.items()}
+
+def write_history(history, run, path=HISTORY_PATH):
+    history["runs"].append(run)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(history, f, indent=2)
+    print(f"\n💾 {len(run['results'])} hasil benchmark ditambahkan ke {path}")
+
+# ==================== FIXTURES ====================
+
+@pytest.fixture(scope="module")
+def model():
+    """(versi, pipeline) default dari registry, fallback ke prescient_model.pkl."""
+    registry = ModelRegistry()
+    version = registry.default_version()
+    if version is not None:
+        return version, registry.load(version)
+    if not os.path.exists(MODEL_PATH):
+        pytest.skip(f"Model tidak ada di registry maupun {MODEL_PATH}")
+    return "legacy", joblib.load(MODEL_PATH)
+
+@pytest.fixture(scope="module")
+def leads():
+    """Lead dari LEADS_PATH (dtype skema, seperti loadtest.py) yang di-resample sampai batch terbesar."""
+    df = load_csv(LEADS_PATH, schema=LEAD_SCHEMA)[FEATURE_COLUMNS]
+    size = max(n for n in BATCH_SIZES if n <= MAX_BATCH)
+    index = np.random.default_rng(42).integers(len(df), size=size)
+    return df.iloc[index].reset_index(drop=True)
+
+@pytest.fixture(scope="module")
+def bench(model):
+    """
+    bench(name, fn): ukur fn, catat hasilnya, dan gagal jika median lebih
+    lambat dari baseline history melebihi toleransi REGRESSION.
+    """
+    history = read_history()
+    machine = machine_key()
+    baseline = baseline_medians(history, machine)
+    results = {}
+
+    def run(name, fn):
+        result = measure(fn)
+        results[name] = result
+        reference = baseline.get(name)
+        if reference:
+            delta = result["median_us"] / reference - 1
+            result["baseline_us"] = round(reference, 3)
+            if delta > REGRESSION:
+                pytest.fail(f"Regresi {name}: median {result['median_us']:.1f}µs vs baseline "
+                            f"{reference:.1f}µs ({delta * 100:+.0f}%, toleransi {REGRESSION * 100:.0f}%)")
+        return result
+
+    yield run
+
+    if SAVE_HISTORY and results:
+        write_history(history, {
+            "generated_at": datetime.now().isoformat(timespec="seconds"),
+            "machine": machine,
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+            "model_version": model[0],
+            "results": results,
+        })
+
+def scorer(model, backend):
+    """Objek scoring untuk backend, atau skip jika tidak tersedia untuk model ini."""
+    pipeline = model[1]
+    if backend == "pipeline":
+        return pipeline
+    if backend == "encoder":
+        encoder = encoder_for(pipeline)
+        if encoder is None:
+            pytest.skip("Struktur pipeline tidak didukung LeadEncoder")
+        return encoder
+    lut = lut_for(pipeline)
+    if lut is None:
+        pytest.skip("Lookup table tidak tersedia (model tidak didukung atau melebihi PRESCIENT_LUT_MAX_MB)")
+    return lut
+
+def as_columns(df):
+    """Dict kolom seperti /predict/columnar: numpy untuk numerik, pd.Categorical untuk kategori."""
+    return {column: (df[column].to_numpy() if pd.api.types.is_numeric_dtype(df[column]) else pd.Categorical(df[column]))
+            for column in df.columns}
+
+# ==================== BENCHMARKS ====================
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_encode_row(bench, model, leads, backend):
+    target = scorer(model, backend)
+    row = leads.iloc[0].to_dict()
+    if backend == "pipeline":
+        preprocessor = target.steps[0][1]
+        bench(f"encode_row[{backend}]", lambda: preprocessor.transform(pd.DataFrame([row])))
+    elif backend == "encoder":
+        bench(f"encode_row[{backend}]", lambda: target.encode_rows([row]))
+    else:
+        # Lookup table hanya butuh kode kategori dan nilai numerik mentah
+        numeric_columns = target.encoder.numeric_columns
+        bench(f"encode_row[{backend}]",
+              lambda: (target.encoder.row_codes(row), [row[column] for column in numeric_columns]))
+
+@pytest.mark.parametrize("size", BATCH_SIZES)
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_predict_proba(bench, model, leads, backend, size):
+    if size > MAX_BATCH:
+        pytest.skip(f"batch {size} > PRESCIENT_BENCH_MAX_BATCH")
+    target = scorer(model, backend)
+    df = leads.iloc[:size]
+    if backend == "pipeline":
+        result = bench(f"predict_proba[{backend}-{size}]", lambda: target.predict_proba(df)[:, 1])
+    else:
+        columns = as_columns(df)
+        result = bench(f"predict_proba[{backend}-{size}]", lambda: target.predict_columns(columns))
+    result["us_per_row"] = round(result["median_us"] / size, 3)
+
+@pytest.mark.parametrize("method", ["label_for_score", "tier_codes"])
+def test_label_assignment(bench, method):
+    scores = np.random.default_rng(42).random(LABEL_SCORES)
+    if method == "label_for_score":
+        values = scores.tolist()
+        bench(f"label[{method}-{LABEL_SCORES}]", lambda: [label_for_score(score) for score in values])
+    else:
+        bench(f"label[{method}-{LABEL_SCORES}]", lambda: tier_codes(scores))
+
+@pytest.fixture(scope="module")
+def prediction_response():
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from main import PredictionResponse
+
+    def render(scores, batch):
+        """Jalur default FastAPI: PredictionResponse -> validasi response_model -> JSONResponse."""
+        items = []
+        for score in scores:
+            label = label_for_score(score)
+            response = PredictionResponse(prediction_score=round(score, 4), label=label,
+                                          probability_percentage=f"{score * 100:.2f}%",
+                                          recommendation=RECOMMENDATIONS[label])
+            items.append(PredictionResponse.model_validate(response.model_dump()))
+        return JSONResponse(content=jsonable_encoder(items if batch else items[0])).body
+
+    return render
+
+@pytest.mark.parametrize("size", [1, SERIALIZE_BATCH])
+@pytest.mark.parametrize("method", ["pydantic", "fast"])
+def test_serialize(bench, prediction_response, method, size):
+    scores = np.random.default_rng(42).random(size).tolist()
+    if method == "pydantic":
+        bench(f"serialize[{method}-{size}]", lambda: prediction_response(scores, size > 1))
+    elif size == 1:
+        bench(f"serialize[{method}-{size}]", lambda: encode_prediction(scores[0]))
+    else:
+        bench(f"serialize[{method}-{size}]", lambda: encode_predictions(scores))
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
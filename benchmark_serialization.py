@@ -0,0 +1,142 @@
+"""
+Prescient - Predictive Lead Scoring
+Response Serialization Benchmark
+
+Membandingkan overhead serialisasi response /predict:
+
+- pydantic   : PredictionResponse -> validasi ulang response_model ->
+               jsonable_encoder -> JSONResponse (jalur default FastAPI)
+- orjson     : dict -> orjson.dumps (jika orjson terpasang)
+- fast       : scoring.encode_prediction (label/rekomendasi sudah di-encode)
+
+lalu mengukur request /predict end-to-end (in-process, model asli) dengan
+PRESCIENT_FAST_JSON mati dan hidup. Body kedua jalur dicek byte-identik.
+
+Usage:
+    python benchmark_serialization.py
+    python benchmark_serialization.py --iterations 200000 --requests 2000
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import time
+
+import numpy as np
+
+DEFAULT_ITERATIONS = 100_000
+DEFAULT_REQUESTS = 1_000
+
+SAMPLE_LEAD = {
+    "Pekerjaan": "management",
+    "Saldo": 1618.0,
+    "Personal Loan": "yes",
+    "Housing Loan": "yes",
+    "Marital": "single",
+    "Campaign": 1,
+    "duration": 300,
+}
+
+def time_per_call(fn, args_list):
+    """Rata-rata mikrodetik per panggilan fn(arg) untuk semua arg"""
+    started = time.perf_counter()
+    for arg in args_list:
+        fn(arg)
+    return (time.perf_counter() - started) / len(args_list) * 1e6
+
+def run_micro(iterations):
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from main import PredictionResponse
+    from scoring import RECOMMENDATIONS, encode_prediction, label_for_score
+
+    scores = np.random.default_rng(42).random(iterations).tolist()
+
+    def as_dict(score):
+        label = label_for_score(score)
+        return {
+            "prediction_score": round(score, 4),
+            "label": label,
+            "probability_percentage": f"{score * 100:.2f}%",
+            "recommendation": RECOMMENDATIONS[label],
+        }
+
+    def pydantic_path(score):
+        response = PredictionResponse(**as_dict(score))
+        validated = PredictionResponse.model_validate(response.model_dump())
+        return JSONResponse(content=jsonable_encoder(validated)).body
+
+    # Kedua jalur harus menghasilkan bytes yang sama
+    for score in scores[:1000]:
+        assert pydantic_path(score) == encode_prediction(score), score
+
+    results = {
+        "pydantic": time_per_call(pydantic_path, scores),
+        "fast": time_per_call(encode_prediction, scores),
+    }
+    try:
+        import orjson
+        results["orjson"] = time_per_call(lambda score: orjson.dumps(as_dict(score)), scores)
+    except ImportError:
+        results["orjson"] = None
+    return results
+
+def run_end_to_end(requests):
+    from fastapi.testclient import TestClient
+    import main
+    from auth import create_access_token
+
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': 'benchmark'})}"}
+    results = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        with TestClient(main.app) as client:
+            bodies = {}
+            for name, fast in (("default", False), ("fast_json", True)):
+                main.FAST_JSON = fast
+                for _ in range(50):  # warm-up
+                    client.post("/predict", json=SAMPLE_LEAD, headers=headers)
+                latencies = []
+                for _ in range(requests):
+                    started = time.perf_counter()
+                    response = client.post("/predict", json=SAMPLE_LEAD, headers=headers)
+                    latencies.append(time.perf_counter() - started)
+                response.raise_for_status()
+                bodies[name] = response.content
+                latencies = np.array(latencies) * 1000
+                results[name] = {"mean": float(latencies.mean()), "p50": float(np.percentile(latencies, 50)),
+                                 "p95": float(np.percentile(latencies, 95))}
+    results["identical_body"] = bodies["default"] == bodies["fast_json"]
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark serialisasi response /predict.')
+    parser.add_argument('--iterations', type=int, default=DEFAULT_ITERATIONS, help='Jumlah iterasi micro benchmark')
+    parser.add_argument('--requests', type=int, default=DEFAULT_REQUESTS,
+                        help='Jumlah request end-to-end per mode (0 = skip)')
+    args = parser.parse_args(argv)
+
+    # Benchmark tidak boleh kena rate limit /predict
+    os.environ["PRESCIENT_RATE_LIMIT"] = "0"
+
+    print("\n" + "="*60)
+    print(f"⚡ SERIALISASI RESPONSE ({args.iterations:,} skor)")
+    print("="*60)
+    micro = run_micro(args.iterations)
+    for name, us in micro.items():
+        print(f"  {name:<10} {'tidak terpasang' if us is None else f'{us:8.2f} µs/response'}")
+    print(f"  Overhead dihemat per response: {micro['pydantic'] - micro['fast']:.2f} µs "
+          f"({micro['pydantic'] / micro['fast']:.1f}x lebih cepat)")
+
+    if args.requests:
+        print("\n" + "="*60)
+        print(f"🌐 /predict END-TO-END ({args.requests:,} request per mode, in-process)")
+        print("="*60)
+        e2e = run_end_to_end(args.requests)
+        for name in ("default", "fast_json"):
+            r = e2e[name]
+            print(f"  {name:<10} mean {r['mean']:.3f} ms   p50 {r['p50']:.3f} ms   p95 {r['p95']:.3f} ms")
+        print(f"  Body identik: {'✅' if e2e['identical_body'] else '❌'}")
+
+if __name__ == '__main__':
+    main()
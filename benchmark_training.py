@@ -0,0 +1,324 @@
+"""
+Prescient - Predictive Lead Scoring
+Training Benchmark
+
+Membandingkan biaya training dari dua script:
+- train_model.py           : XGBoost/RandomForest dengan dense one-hot
+- train_gradient_model.py  : GradientBoosting (model produksi)
+
+Setiap stage (load CSV, target prep, preprocessing, fit, evaluation, CV,
+save) diukur waktu dan peak RSS-nya. Dataset sintetis dibuat dengan
+resampling bank-full.csv ke ukuran tertentu (10k sampai 10M rows), dan
+hasilnya ditulis sebagai JSON supaya regresi training terlihat saat review.
+
+Usage:
+    python benchmark_training.py
+    python benchmark_training.py --sizes 10000,100000 --trainers gradient
+    python benchmark_training.py --output benchmark_results/training.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+
+import numpy as np
+import pandas as pd
+
+from lead_io import LEAD_SCHEMA, load_csv
+
+DEFAULT_SOURCE = 'bank-full.csv'
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000, 10_000_000]
+DEFAULT_OUTPUT = os.path.join('benchmark_results', 'training.json')
+DEFAULT_DATA_DIR = 'benchmark_data'
+TRAINERS = ('gradient', 'dense')
+STAGES = ('load', 'target_prep', 'preprocess', 'fit', 'evaluate', 'cv', 'save')
+
+# Kolom dataset prospek (sama dengan train_gradient_model.py)
+CATEGORICAL_FEATURES = ['Pekerjaan', 'Personal Loan', 'Housing Loan', 'Marital']
+NUMERICAL_FEATURES = ['Saldo', 'Campaign', 'duration']
+
+# ==================== MEMORY SAMPLING ====================
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+def current_rss_bytes():
+    """RSS proses saat ini (Linux /proc), fallback ke ru_maxrss."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss: kilobytes di Linux, bytes di macOS
+        return maxrss if sys.platform == 'darwin' else maxrss * 1024
+
+class PeakRSSSampler:
+    """
+    Thread background yang mencatat peak RSS per stage.
+
+    ru_maxrss hanya memberi peak seumur proses, jadi untuk angka per stage
+    RSS di-sample secara periodik dan di-reset setiap stage dimulai.
+    """
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.peak = current_rss_bytes()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            rss = current_rss_bytes()
+            if rss > self.peak:
+                self.peak = rss
+
+    def reset(self):
+        self.peak = current_rss_bytes()
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+class StageTimer:
+    """Mencatat durasi dan peak RSS untuk setiap stage training."""
+
+    def __init__(self):
+        self.sampler = PeakRSSSampler().start()
+        self.stages = {}
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        self.sampler.reset()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            peak = max(self.sampler.peak, current_rss_bytes())
+            self.stages[name] = {
+                'seconds': round(elapsed, 4),
+                'peak_rss_mb': round(peak / (1024 * 1024), 1),
+            }
+
+    def skip(self, name, reason):
+        self.stages[name] = {'skipped': reason}
+
+    def close(self):
+        self.sampler.stop()
+
+# ==================== SYNTHETIC DATA ====================
+
+def make_synthetic_dataset(source, rows, path, seed=42, chunk_rows=1_000_000):
+    """
+    Buat dataset sintetis berukuran `rows` dengan resampling baris dari source.
+
+    Kolom numerik diberi noise kecil supaya tree tidak hanya melihat nilai
+    duplikat. Ditulis per chunk sehingga dataset 10M rows tidak perlu
+    dibangun sekaligus di memori.
+    """
+    base = load_csv(source, schema=LEAD_SCHEMA)
+    rng = np.random.default_rng(seed)
+    written = 0
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        while written < rows:
+            n = min(chunk_rows, rows - written)
+            chunk = base.iloc[rng.integers(0, len(base), n)].reset_index(drop=True)
+            chunk['Saldo'] = np.round(chunk['Saldo'] * rng.lognormal(0.0, 0.1, n)).astype(np.int64)
+            chunk['Campaign'] = np.clip(chunk['Campaign'] + rng.integers(-1, 2, n), 1, None)
+            if 'duration' in chunk:
+                chunk['duration'] = np.clip(chunk['duration'] + rng.normal(0, 20, n), 0, 1000).astype(np.int64)
+            chunk.to_csv(f, index=False, header=(written == 0))
+            written += n
+    return path
+
+def ensure_dataset(source, rows, data_dir):
+    """Pakai ulang dataset sintetis yang sudah ada untuk ukuran yang sama."""
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f'leads_{rows}.csv')
+    if not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(source):
+        print(f"🧪 Membuat dataset sintetis {rows:,} rows -> {path}")
+        make_synthetic_dataset(source, rows, path)
+    return path
+
+# ==================== BENCHMARK RUN ====================
+
+def build_trainer(trainer):
+    """Return (preprocessor, classifier, classifier_name) untuk trainer."""
+    if trainer == 'gradient':
+        import train_gradient_model
+        classifier = train_gradient_model.create_classifier()
+        return train_gradient_model.create_preprocessing_pipeline(), classifier, type(classifier).__name__
+
+    import train_model
+    preprocessor = train_model.create_preprocessing_pipeline(
+        categorical_features=CATEGORICAL_FEATURES,
+        numerical_features=NUMERICAL_FEATURES,
+    )
+    pipeline = train_model.create_model_pipeline(preprocessor)
+    classifier = pipeline.named_steps['classifier']
+    return preprocessor, classifier, type(classifier).__name__
+
+def run_benchmark(trainer, dataset_path, rows, cv_folds=3, cv_max_rows=1_000_000, verbose=False):
+    """
+    Jalankan satu benchmark (trainer x ukuran dataset).
+
+    Dipanggil di proses terpisah agar peak RSS tidak tercampur antar run.
+    """
+    from sklearn.metrics import accuracy_score, roc_auc_score
+    from sklearn.model_selection import cross_val_score, train_test_split
+    from sklearn.pipeline import Pipeline
+    import joblib
+    import train_gradient_model
+
+    timer = StageTimer()
+    log = sys.stdout if verbose else io.StringIO()
+    metrics = {}
+    model_size = None
+
+    try:
+        with contextlib.redirect_stdout(log):
+            with timer.stage('load'):
+                df = load_csv(dataset_path, schema=LEAD_SCHEMA, cache=False)
+
+            with timer.stage('target_prep'):
+                X, y = train_gradient_model.prepare_target(df)
+                del df
+                X_train, X_test, y_train, y_test = train_test_split(
+                    X, y, test_size=0.2, random_state=42, stratify=y
+                )
+
+            preprocessor, classifier, classifier_name = build_trainer(trainer)
+
+            with timer.stage('preprocess'):
+                X_train_t = preprocessor.fit_transform(X_train)
+
+            with timer.stage('fit'):
+                classifier.fit(X_train_t, y_train)
+            del X_train_t
+
+            pipeline = Pipeline([('preprocessor', preprocessor), ('classifier', classifier)])
+
+            with timer.stage('evaluate'):
+                proba = pipeline.predict_proba(X_test)[:, 1]
+                metrics['roc_auc'] = round(float(roc_auc_score(y_test, proba)), 4)
+                metrics['accuracy'] = round(float(accuracy_score(y_test, proba > 0.5)), 4)
+
+            if cv_folds and rows <= cv_max_rows:
+                from sklearn.base import clone
+                with timer.stage('cv'):
+                    cv_scores = cross_val_score(clone(pipeline), X, y, cv=cv_folds, scoring='accuracy')
+                    metrics['cv_accuracy_mean'] = round(float(cv_scores.mean()), 4)
+            else:
+                timer.skip('cv', f'rows > {cv_max_rows}' if cv_folds else 'disabled')
+
+            with tempfile.TemporaryDirectory() as tmp:
+                model_path = os.path.join(tmp, 'model.pkl')
+                with timer.stage('save'):
+                    joblib.dump(pipeline, model_path)
+                model_size = os.path.getsize(model_path)
+    finally:
+        timer.close()
+
+    timed = [s for s in timer.stages.values() if 'seconds' in s]
+    return {
+        'trainer': trainer,
+        'classifier': classifier_name,
+        'rows': rows,
+        'stages': timer.stages,
+        'total_seconds': round(sum(s['seconds'] for s in timed), 4),
+        'peak_rss_mb': max(s['peak_rss_mb'] for s in timed),
+        'metrics': metrics,
+        'model_size_bytes': model_size,
+    }
+
+def run_isolated(*args, **kwargs):
+    """Jalankan run_benchmark di proses baru (spawn) dan kembalikan hasilnya."""
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+        return executor.submit(run_benchmark, *args, **kwargs).result()
+
+# ==================== MAIN ====================
+
+def parse_sizes(value):
+    return [int(float(v)) for v in value.split(',') if v.strip()]
+
+def print_summary(result):
+    stages = result['stages']
+    cells = []
+    for name in STAGES:
+        stage = stages.get(name, {})
+        cells.append(f"{name}={stage['seconds']:.2f}s" if 'seconds' in stage else f"{name}=skip")
+    print(f"   {result['trainer']:<8} {result['rows']:>10,} rows | {' '.join(cells)} "
+          f"| peak {result['peak_rss_mb']:.0f} MB | AUC {result['metrics'].get('roc_auc')}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark biaya training Prescient per stage.')
+    parser.add_argument('--source', default=DEFAULT_SOURCE, help='CSV sumber untuk resampling')
+    parser.add_argument('--sizes', type=parse_sizes, default=DEFAULT_SIZES,
+                        help='Ukuran dataset dipisah koma (default: 10k,100k,1M,10M)')
+    parser.add_argument('--trainers', default=','.join(TRAINERS),
+                        help='Trainer dipisah koma: gradient, dense')
+    parser.add_argument('--cv-folds', type=int, default=3, help='Jumlah fold CV (0 = skip)')
+    parser.add_argument('--cv-max-rows', type=int, default=1_000_000,
+                        help='CV di-skip untuk dataset lebih besar dari ini')
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help='Folder cache dataset sintetis')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='File hasil JSON')
+    parser.add_argument('--verbose', action='store_true', help='Tampilkan log dari script training')
+    args = parser.parse_args(argv)
+
+    trainers = [t.strip() for t in args.trainers.split(',') if t.strip()]
+    unknown = set(trainers) - set(TRAINERS)
+    if unknown:
+        parser.error(f"trainer tidak dikenal: {', '.join(sorted(unknown))}")
+
+    print("\n" + "="*60)
+    print("PRESCIENT - TRAINING BENCHMARK")
+    print("="*60 + "\n")
+
+    runs = []
+    for rows in args.sizes:
+        dataset_path = ensure_dataset(args.source, rows, args.data_dir)
+        for trainer in trainers:
+            print(f"⏱️  {trainer} @ {rows:,} rows...")
+            result = run_isolated(trainer, dataset_path, rows, cv_folds=args.cv_folds,
+                                  cv_max_rows=args.cv_max_rows, verbose=args.verbose)
+            runs.append(result)
+            print_summary(result)
+
+    import sklearn
+    report = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'source': args.source,
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'sklearn': sklearn.__version__,
+        },
+        'runs': runs,
+    }
+
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Hasil benchmark disimpan ke: {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+Prescient - Lead Artifact Pipeline
+
+Membaca dataset bank marketing (bank-full.csv, delimiter ';') SATU kali dan
+membuat semua file turunan dari kolom bersama:
+
+    static/leads_data.json        lead sintetis (LeadGenerator, generate_1000_leads.py)
+    static/real_leads_data.json   150 nasabah y='yes' (sample random_state=42)
+    real_leads_data.js            sample yang sama untuk index.html
+    high_potential_leads.csv      150 nasabah y='yes' pertama (delimiter ';')
+
+Setiap output ditulis ke temp file lalu dibandingkan SHA-256-nya dengan file
+yang ada; output yang tidak berubah dilewati (mtime tidak ikut berubah).
+Durasi tiap stage dicetak di akhir.
+
+Usage:
+    python build_lead_artifacts.py
+    python build_lead_artifacts.py --only real_leads_json real_leads_js
+    python build_lead_artifacts.py --as-of 2025-01-31     # leads_data.json reproducible
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime
+
+from generate_1000_leads import ChunkWriter, LeadGenerator, read_source, select_candidate_pool
+from model_registry import file_sha256
+
+SOURCE_PATH = 'bank-full.csv'
+REAL_LEADS_COUNT = 150
+REAL_LEADS_SEED = 42
+REAL_LEADS_START_ID = 1000
+CHUNK_SIZE = 100_000
+
+ARTIFACTS = {
+    'leads_json': 'static/leads_data.json',
+    'real_leads_json': 'static/real_leads_data.json',
+    'real_leads_js': 'real_leads_data.js',
+    'high_potential_csv': 'high_potential_leads.csv',
+}
+
+REAL_LEAD_COLUMNS = ['age', 'job', 'marital', 'education', 'default', 'balance', 'housing', 'loan',
+                     'contact', 'day', 'month', 'duration', 'campaign', 'pdays', 'previous', 'poutcome']
+INT_COLUMNS = {'age', 'balance', 'day', 'duration', 'campaign', 'pdays', 'previous'}
+
+# Name generators
+first_names = ["Budi", "Siti", "Andi", "Dewi", "Eko", "Fajar", "Gita", "Hendra", "Iwan", "Joko",
+               "Kartika", "Lina", "Maya", "Nina", "Oscar", "Putri", "Rina", "Surya", "Tina", "Umar",
+               "Vina", "Wawan", "Yanti", "Zainal", "Rudi", "Sari", "Hadi", "Fitri", "Yoga", "Dian"]
+last_names = ["Santoso", "Aminah", "Pratama", "Lestari", "Kurniawan", "Nugraha", "Pertiwi",
+              "Wijaya", "Saputra", "Susanto", "Hidayat", "Kusuma", "Wibowo", "Sari", "Utami",
+              "Cahyani", "Mulyadi", "Setiawan", "Permana", "Hakim"]
+
+JS_TEMPLATE = """// REAL CUSTOMER DATA FROM BANK-FULL.CSV
+// 150 customers who SUCCESSFULLY made deposits (y='yes')
+// These are HIGH-POTENTIAL leads with >50% prediction probability
+
+const REAL_HIGH_POTENTIAL_LEADS = {leads};
+
+// Function to use real data instead of generating random
+function loadRealLeads() {{
+    return REAL_HIGH_POTENTIAL_LEADS.map(lead => ({{
+        ...lead,
+        score: null,  // Will be filled by API
+        prediction: null,
+        label: null,
+        apiData: {{
+{api_fields}
+        }}
+    }}));
+}}
+"""
+
+# ==================== STAGES ====================
+
+class StageTimings:
+    """Catat durasi setiap stage pipeline."""
+
+    def __init__(self):
+        self.stages = []
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append((name, time.perf_counter() - start))
+
+    def report(self):
+        total = sum(seconds for _, seconds in self.stages)
+        print("\n⏱️  Stage timings:")
+        for name, seconds in self.stages:
+            print(f"   {name:<24} {seconds:8.3f}s")
+        print(f"   {'total':<24} {total:8.3f}s")
+
+def real_lead_records(sample):
+    """
+    Record nasabah asli dengan nama/kontak Indonesia (dipakai oleh JSON
+    dan JS, sehingga kedua file berisi orang yang sama).
+    """
+    rng = random.Random(REAL_LEADS_SEED)
+    columns = {column: sample[column].tolist() for column in REAL_LEAD_COLUMNS}
+    records = []
+    for i in range(len(sample)):
+        fname = rng.choice(first_names)
+        lname = rng.choice(last_names)
+        record = {"id": f"CUST-{REAL_LEADS_START_ID + i}", "name": f"{fname} {lname}"}
+        for column in REAL_LEAD_COLUMNS:
+            value = columns[column][i]
+            record[column] = int(value) if column in INT_COLUMNS else value
+        record["phone"] = f"6281{rng.randint(100000000, 999999999)}"
+        record["email"] = f"{fname.lower()}.{lname.lower()}@example.com"
+        records.append(record)
+    return records
+
+def render_real_leads_js(records):
+    leads = [dict(record, status="pending") for record in records]
+    api_fields = ",\n".join(f"            {column}: lead.{column}" for column in REAL_LEAD_COLUMNS)
+    return JS_TEMPLATE.format(leads=json.dumps(leads, indent=4), api_fields=api_fields)
+
+# ==================== OUTPUT ====================
+
+def publish(path, write):
+    """
+    Panggil write(tmp_path), lalu ganti `path` hanya jika isinya berubah.
+
+    Return True jika file ditulis, False jika dilewati (hash sama).
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.artifact-')
+    os.close(fd)
+    try:
+        write(tmp_path)
+        if os.path.exists(path) and file_sha256(path) == file_sha256(tmp_path):
+            os.remove(tmp_path)
+            return False
+        os.chmod(tmp_path, 0o644)  # mkstemp membuat file 0600
+        os.replace(tmp_path, path)
+        return True
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def write_text(text):
+    def write(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+    return write
+
+# ==================== MAIN ====================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Bangun semua file lead turunan dari bank-full.csv.')
+    parser.add_argument('--source', default=SOURCE_PATH, help="Dataset bank marketing (delimiter ';')")
+    parser.add_argument('--only', nargs='+', choices=sorted(ARTIFACTS), help='Hanya bangun artifact ini')
+    parser.add_argument('--rows', type=int, default=1000, help='Jumlah lead sintetis (leads_data.json)')
+    parser.add_argument('--seed', type=int, default=42, help='Seed lead sintetis')
+    parser.add_argument('--as-of', type=lambda s: datetime.strptime(s, '%Y-%m-%d').date(),
+                        help='Tanggal acuan last_contact (YYYY-MM-DD, default: hari ini)')
+    args = parser.parse_args(argv)
+    selected = args.only or list(ARTIFACTS)
+
+    print("\n" + "="*60)
+    print("PRESCIENT - BUILD LEAD ARTIFACTS")
+    print("="*60 + "\n")
+
+    timings = StageTimings()
+    outputs = {}
+
+    with timings.stage('read source'):
+        df = read_source(args.source)
+    print(f"📂 {len(df)} rows dari {args.source}")
+
+    # Kolom bersama: nasabah yang berhasil deposit
+    with timings.stage('shared columns'):
+        converted = df[df['y'] == 'yes']
+    print(f"✅ {len(converted)} nasabah y='yes'")
+
+    if 'real_leads_json' in selected or 'real_leads_js' in selected:
+        with timings.stage('real leads sample'):
+            sample = converted.sample(n=min(REAL_LEADS_COUNT, len(converted)), random_state=REAL_LEADS_SEED)
+            records = real_lead_records(sample)
+        if 'real_leads_json' in selected:
+            with timings.stage('real_leads_data.json'):
+                text = json.dumps(records, indent=2, ensure_ascii=False)
+                outputs['real_leads_json'] = publish(ARTIFACTS['real_leads_json'], write_text(text))
+        if 'real_leads_js' in selected:
+            with timings.stage('real_leads_data.js'):
+                text = render_real_leads_js(records)
+                outputs['real_leads_js'] = publish(ARTIFACTS['real_leads_js'], write_text(text))
+
+    if 'high_potential_csv' in selected:
+        with timings.stage('high_potential_leads.csv'):
+            text = converted.head(REAL_LEADS_COUNT).to_csv(sep=';', index=False)
+            outputs['high_potential_csv'] = publish(ARTIFACTS['high_potential_csv'], write_text(text))
+
+    if 'leads_json' in selected:
+        with timings.stage('leads_data.json'):
+            pool = select_candidate_pool(df, args.rows)
+            generator = LeadGenerator(pool, args.rows, seed=args.seed, as_of=args.as_of)
+
+            def write_leads(tmp_path):
+                writer = ChunkWriter(tmp_path, 'json')
+                try:
+                    for chunk in generator.chunks(CHUNK_SIZE):
+                        writer.write(chunk)
+                finally:
+                    writer.close()
+
+            outputs['leads_json'] = publish(ARTIFACTS['leads_json'], write_leads)
+
+    print("\n📦 Artifacts:")
+    for name in selected:
+        status = "written" if outputs[name] else "unchanged (skipped)"
+        print(f"   {'✓' if outputs[name] else '⏭️ '} {ARTIFACTS[name]:<30} {status}")
+
+    timings.report()
+    print()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""
+Prescient - Columnar Batch Payloads
+
+Format biner kolumnar untuk POST /predict/columnar (scoring backend-to-backend),
+supaya jutaan lead tidak perlu di-parse sebagai JSON dan divalidasi satu per
+satu oleh Pydantic. Dua format didukung:
+
+1. Arrow IPC stream (Content-Type: application/vnd.apache.arrow.stream),
+   jika pyarrow terpasang.
+
+2. Typed-array framing (Content-Type: application/x-prescient-columns),
+   tanpa dependency. Semua angka little-endian:
+
+       header   : magic b"PLC1" | uint32 n_rows | uint16 n_columns
+       kolom    : uint16 name_len | name (utf-8) | uint8 type | data
+       data     : diawali padding nol sampai offset kelipatan 8, lalu
+                  type 1 (FLOAT64) : n_rows x float64
+                  type 2 (INT32)   : n_rows x int32
+                  type 3 (DICT)    : uint16 n_values | n_values x (uint16 len | utf-8)
+                                     | padding ke kelipatan 8 | n_rows x uint8 kode
+
+   Kolom string dikirim sebagai dictionary (vocabulary + kode uint8), jadi
+   string hanya di-decode sekali per nilai unik, bukan per baris.
+
+Kolom numerik dan kode dictionary dibaca dengan np.frombuffer (view tanpa
+copy ke body request), dan kolom string menjadi pd.Categorical dari kode
+tersebut. Response memakai format yang sama dengan kolom prediction_score
+(float64), label dan recommendation (dictionary).
+"""
+
+import struct
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+FRAMED_MEDIA_TYPE = "application/x-prescient-columns"
+
+MAGIC = b"PLC1"
+FLOAT64 = 1
+INT32 = 2
+DICT = 3
+
+_HEADER = struct.Struct("<4sIH")
+_U16 = struct.Struct("<H")
+_U8 = struct.Struct("<B")
+_NUMERIC_DTYPES = {FLOAT64: np.dtype("<f8"), INT32: np.dtype("<i4")}
+
+class PayloadError(ValueError):
+    """Payload kolumnar tidak valid."""
+
+def _padding(offset):
+    return -offset % 8
+
+# ==================== TYPED-ARRAY FRAMING ====================
+
+def encode_framed(columns):
+    """
+    Encode dict nama -> kolom ke typed-array framing.
+
+    Kolom float/int menjadi FLOAT64/INT32; kolom string/category menjadi DICT.
+    """
+    n_rows = None
+    parts = []
+    size = _HEADER.size
+
+    def append(chunk):
+        nonlocal size
+        parts.append(chunk)
+        size += len(chunk)
+
+    for name, values in columns.items():
+        values = pd.Series(values) if not isinstance(values, pd.Series) else values
+        if n_rows is None:
+            n_rows = len(values)
+        elif len(values) != n_rows:
+            raise PayloadError(f"Kolom '{name}' berisi {len(values)} baris, seharusnya {n_rows}")
+
+        encoded_name = name.encode("utf-8")
+        append(_U16.pack(len(encoded_name)) + encoded_name)
+
+        if isinstance(values.dtype, pd.CategoricalDtype) or values.dtype == object:
+            categorical = values.astype("category")
+            categories = [str(c) for c in categorical.cat.categories]
+            if len(categories) > 255:
+                raise PayloadError(f"Kolom '{name}' punya {len(categories)} nilai unik (maksimal 255)")
+            append(_U8.pack(DICT) + _U16.pack(len(categories)))
+            for category in categories:
+                encoded = category.encode("utf-8")
+                append(_U16.pack(len(encoded)) + encoded)
+            append(b"\0" * _padding(size))
+            append(categorical.cat.codes.to_numpy().astype(np.uint8).tobytes())
+        else:
+            kind = INT32 if np.issubdtype(values.dtype, np.integer) else FLOAT64
+            append(_U8.pack(kind))
+            append(b"\0" * _padding(size))
+            append(values.to_numpy().astype(_NUMERIC_DTYPES[kind], copy=False).tobytes())
+
+    header = _HEADER.pack(MAGIC, n_rows or 0, len(columns))
+    return header + b"".join(parts)
+
+def decode_framed(body):
+    """Decode typed-array framing ke dict nama -> numpy array / pd.Categorical (tanpa copy)."""
+    buffer = memoryview(body)
+    try:
+        magic, n_rows, n_columns = _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise PayloadError("Magic bytes bukan PLC1")
+        offset = _HEADER.size
+        columns = {}
+        for _ in range(n_columns):
+            (name_len,) = _U16.unpack_from(buffer, offset)
+            offset += _U16.size
+            name = bytes(buffer[offset:offset + name_len]).decode("utf-8")
+            offset += name_len
+            (kind,) = _U8.unpack_from(buffer, offset)
+            offset += _U8.size
+
+            if kind == DICT:
+                (n_values,) = _U16.unpack_from(buffer, offset)
+                offset += _U16.size
+                categories = []
+                for _ in range(n_values):
+                    (length,) = _U16.unpack_from(buffer, offset)
+                    offset += _U16.size
+                    categories.append(bytes(buffer[offset:offset + length]).decode("utf-8"))
+                    offset += length
+                offset += _padding(offset)
+                codes = np.frombuffer(buffer, dtype=np.uint8, count=n_rows, offset=offset)
+                offset += n_rows
+                if n_rows and codes.max() >= n_values:
+                    raise PayloadError(f"Kolom '{name}' berisi kode di luar dictionary")
+                columns[name] = pd.Categorical.from_codes(codes, categories=categories)
+            elif kind in _NUMERIC_DTYPES:
+                dtype = _NUMERIC_DTYPES[kind]
+                offset += _padding(offset)
+                columns[name] = np.frombuffer(buffer, dtype=dtype, count=n_rows, offset=offset)
+                offset += n_rows * dtype.itemsize
+            else:
+                raise PayloadError(f"Tipe kolom tidak dikenal: {kind}")
+    except (struct.error, UnicodeDecodeError) as e:
+        raise PayloadError(f"Payload terpotong atau rusak: {e}")
+    except ValueError as e:
+        if isinstance(e, PayloadError):
+            raise
+        raise PayloadError(f"Payload terpotong atau rusak: {e}")
+
+    if offset != len(buffer):
+        raise PayloadError(f"{len(buffer) - offset} byte sisa di akhir payload")
+    return n_rows, columns
+
+# ==================== ARROW IPC ====================
+
+def decode_arrow(body):
+    """Decode Arrow IPC stream ke dict nama -> numpy array / pd.Categorical."""
+    try:
+        table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+    except pa.ArrowInvalid as e:
+        raise PayloadError(f"Arrow IPC tidak valid: {e}")
+
+    columns = {}
+    try:
+        for name in table.column_names:
+            column = table.column(name).combine_chunks()
+            if column.null_count:
+                raise PayloadError(f"Kolom '{name}' berisi null")
+            if pa.types.is_dictionary(column.type):
+                indices = column.indices.to_numpy(zero_copy_only=False)
+                if len(indices) and (indices.min() < 0 or indices.max() >= len(column.dictionary)):
+                    raise PayloadError(f"Kolom '{name}' berisi kode di luar dictionary")
+                columns[name] = pd.Categorical.from_codes(indices, categories=column.dictionary.to_pylist())
+            elif pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+                columns[name] = pd.Categorical(column.to_numpy(zero_copy_only=False))
+            else:
+                # Numerik tanpa null: view langsung ke buffer Arrow
+                columns[name] = column.to_numpy(zero_copy_only=True)
+    except PayloadError:
+        raise
+    except (pa.ArrowException, ValueError) as e:
+        # Misalnya dictionary dengan kategori duplikat/null, atau tipe kolom non-primitif
+        raise PayloadError(f"Kolom Arrow tidak valid: {e}")
+    return table.num_rows, columns
+
+def encode_arrow(columns):
+    """Encode dict nama -> kolom ke Arrow IPC stream (kolom string sebagai dictionary)."""
+    arrays = []
+    for values in columns.values():
+        if isinstance(values, pd.Categorical):
+            arrays.append(pa.DictionaryArray.from_arrays(
+                pa.array(values.codes, type=pa.int8()), pa.array(list(values.categories), type=pa.string())))
+        else:
+            arrays.append(pa.array(values))
+    batch = pa.RecordBatch.from_arrays(arrays, names=list(columns))
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+# ==================== PUBLIC API ====================
+
+def decode_payload(media_type, body):
+    """Decode body request sesuai Content-Type. Return (n_rows, columns)."""
+    if media_type == FRAMED_MEDIA_TYPE:
+        return decode_framed(body)
+    if media_type == ARROW_MEDIA_TYPE:
+        if not HAS_PYARROW:
+            raise NotImplementedError("pyarrow tidak terpasang di server")
+        return decode_arrow(body)
+    raise NotImplementedError(f"Content-Type tidak didukung: {media_type}")
+
+def encode_payload(media_type, columns):
+    """Encode kolom response dengan format yang sama dengan request."""
+    if media_type == ARROW_MEDIA_TYPE:
+        return encode_arrow(columns)
+    return encode_framed(columns)
+
+def to_feature_frame(n_rows, columns, feature_columns):
+    """DataFrame input model; kolom wajib dicek, kolom lain diabaikan."""
+    missing = [column for column in feature_columns if column not in columns]
+    if missing:
+        raise PayloadError(f"Kolom wajib hilang: {', '.join(missing)}")
+    for column in feature_columns:
+        if len(columns[column]) != n_rows:
+            raise PayloadError(f"Kolom '{column}' berisi {len(columns[column])} baris, seharusnya {n_rows}")
+    return pd.DataFrame({column: columns[column] for column in feature_columns}, copy=False)
@@ -1,23 +1,73 @@
 """
 Database configuration for Prescient Authentication System
 SQLite database with SQLAlchemy ORM
+
+Dua engine ke file yang sama:
+- engine / SessionLocal           : sync, untuk script (retrain) dan route sync
+- async_engine / AsyncSessionLocal: async (aiosqlite) untuk auth_routes.py,
+  dengan connection pool yang bisa di-tune lewat environment
+
+SQLite dijalankan dalam mode WAL (pembaca tidak diblokir penulis) dengan
+pragma yang diset di setiap koneksi baru.
 """
 
-from sqlalchemy import create_engine, Column, Integer, String, Boolean
+import os
+from datetime import datetime
+from sqlalchemy import create_engine, event, Column, Integer, String, Boolean, Float, DateTime
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 # SQLite Database URL
-SQLALCHEMY_DATABASE_URL = "sqlite:///./prescient.db"
+DATABASE_PATH = os.environ.get("PRESCIENT_DB_PATH", "./prescient.db")
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
+ASYNC_DATABASE_URL = f"sqlite+aiosqlite:///{DATABASE_PATH}"
+
+# Connection pool async engine
+DB_POOL_SIZE = int(os.environ.get("PRESCIENT_DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.environ.get("PRESCIENT_DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.environ.get("PRESCIENT_DB_POOL_TIMEOUT", "10"))
+BUSY_TIMEOUT_MS = 5000
+
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",        # aman dengan WAL, fsync hanya saat checkpoint
+    f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}",
+    "PRAGMA foreign_keys=ON",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",         # 16 MB page cache per koneksi
+    "PRAGMA mmap_size=134217728",       # 128 MB
+)
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Set pragma SQLite di setiap koneksi baru (sync dan aiosqlite)"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
 
 # Create engine
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL, 
     connect_args={"check_same_thread": False}  # Needed for SQLite
 )
+event.listen(engine, "connect", set_sqlite_pragmas)
+
+# Async engine (aiosqlite) dengan pool terbatas
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    connect_args={"timeout": BUSY_TIMEOUT_MS / 1000},
+)
+event.listen(async_engine.sync_engine, "connect", set_sqlite_pragmas)
 
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 # Base class for models
 Base = declarative_base()
@@ -32,6 +82,24 @@ class User(Base):
     hashed_password = Column(String, nullable=False)
     is_active = Column(Boolean, default=True)
 
+# Lead Outcome Model (feedback dari dashboard untuk retraining)
+class LeadOutcome(Base):
+    __tablename__ = "lead_outcomes"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    lead_id = Column(String, index=True, nullable=False)
+    pekerjaan = Column(String, nullable=False)
+    saldo = Column(Float, nullable=False)
+    personal_loan = Column(String, nullable=False)
+    housing_loan = Column(String, nullable=False)
+    marital = Column(String, nullable=False)
+    campaign = Column(Integer, nullable=False)
+    duration = Column(Integer, nullable=False)
+    converted = Column(Boolean, nullable=False)
+    prediction_score = Column(Float, nullable=True)
+    model_version = Column(String, nullable=True)
+    recorded_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
 # Create all tables
 def init_db():
     Base.metadata.create_all(bind=engine)
@@ -43,3 +111,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# Async dependency
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
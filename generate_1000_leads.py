@@ -1,17 +1,27 @@
 """
-Generate 1000 leads with >50% conversion probability
+Generate synthetic leads with >50% conversion probability
 Using real data from bank-full.csv + random names/contacts
+
+Semua kolom dibuat secara vectorized dengan NumPy (seed tetap) dan ditulis
+ke disk per chunk, sehingga memori tetap datar walaupun jumlah lead jutaan.
+Hasil identik untuk seed, --as-of, dan --rows yang sama, berapapun --chunk-size.
+
+Usage:
+    python generate_1000_leads.py                                   # 1000 leads -> static/leads_data.json
+    python generate_1000_leads.py --rows 1000000 --output leads.ndjson
+    python generate_1000_leads.py --rows 5000000 --output leads.csv --chunk-size 250000
+    python generate_1000_leads.py --rows 1000000 --output leads.parquet   # butuh pyarrow
 """
 
-import pandas as pd
+import argparse
 import json
-import random
-from datetime import datetime, timedelta
+import os
+from datetime import date, datetime, timedelta
 
-# Read bank-full.csv
-print("Reading bank-full.csv...")
-df = pd.read_csv('bank-full.csv', sep=';')
-print(f"Total rows in CSV: {len(df)}")
+import numpy as np
+import pandas as pd
+
+from lead_io import BANK_SCHEMA, load_csv
 
 # Indonesian names database
 first_names_male = [
@@ -41,183 +51,271 @@ last_names = [
     "Ismail", "Rizki", "Aditya", "Bayu", "Cahya", "Darmawan", "Eka", "Fajar", "Galih", "Hendra"
 ]
 
-# Generate Indonesian names
-def generate_name():
-    if random.choice([True, False]):
-        first = random.choice(first_names_male)
-    else:
-        first = random.choice(first_names_female)
-    last = random.choice(last_names)
-    return f"{first} {last}"
-
-# Generate phone number (Indonesian format)
-def generate_phone():
-    prefix = random.choice(['0811', '0812', '0813', '0821', '0822', '0823', '0852', '0853', '0856'])
-    number = ''.join([str(random.randint(0, 9)) for _ in range(8)])
-    return f"{prefix}-{number[:4]}-{number[4:]}"
-
-# Generate email
-def generate_email(name):
-    domains = ['gmail.com', 'yahoo.com', 'hotmail.com', 'outlook.com', 'mail.com']
-    clean_name = name.lower().replace(' ', '.')
-    number = random.randint(1, 999)
-    return f"{clean_name}{number}@{random.choice(domains)}"
-
-# Filter for high-probability leads (>50%)
-# We'll use rows that are more likely to convert based on features
-print("\nFiltering high-probability leads...")
-
-# Create features that typically lead to higher conversion
-high_prob_conditions = (
-    # Good balance
-    (df['balance'] > 0) &
-    # Has housing loan (engagement indicator)
-    ((df['housing'] == 'yes') | (df['loan'] == 'yes')) &
-    # Not student or retired (active workers)
-    (~df['job'].isin(['student', 'unemployed'])) &
-    # Not too many campaigns
-    (df['campaign'] <= 3) &
-    # Educated
-    (df['education'].isin(['secondary', 'tertiary']))
-)
-
-# Get high probability subset
-high_prob_df = df[high_prob_conditions].copy()
-print(f"High probability leads found: {len(high_prob_df)}")
-
-# If not enough, relax conditions
-if len(high_prob_df) < 1000:
-    print("Relaxing conditions to get 1000 leads...")
+PHONE_PREFIXES = ['0811', '0812', '0813', '0821', '0822', '0823', '0852', '0853', '0856']
+EMAIL_DOMAINS = ['gmail.com', 'yahoo.com', 'hotmail.com', 'outlook.com', 'mail.com']
+STATUSES = ["New", "Contacted", "Follow Up", "Pending"]
+
+SOURCE_COLUMNS = ['age', 'job', 'marital', 'education', 'default', 'balance', 'housing', 'loan',
+                  'contact', 'day', 'month', 'duration', 'campaign', 'pdays', 'previous',
+                  'poutcome', 'y']
+
+OUTPUT_COLUMNS = ['id', 'name', 'phone', 'email'] + SOURCE_COLUMNS + [
+    'prediction_score', 'category', 'status', 'last_contact']
+
+# Satu stream random per kolom: hasil tidak bergantung pada ukuran chunk
+STREAMS = ('sample', 'gender', 'male', 'female', 'last', 'phone_prefix', 'phone_number',
+           'email_number', 'email_domain', 'score_noise', 'status', 'last_contact')
+
+# ==================== SOURCE POOL ====================
+
+def read_source(source):
+    """Baca dataset bank marketing (delimiter ';') dan cek kolomnya."""
+    try:
+        return load_csv(source, schema=BANK_SCHEMA)
+    except ValueError as e:
+        raise SystemExit(f"❌ {e}")
+
+def load_candidate_pool(source, rows):
+    """
+    Ambil baris high-probability dari bank-full.csv (dataset bank marketing,
+    delimiter ';'). Kondisi dilonggarkan jika kandidat kurang dari `rows`.
+    """
+    df = read_source(source)
+    print(f"Total rows in CSV: {len(df)}")
+    return select_candidate_pool(df, rows)
+
+def select_candidate_pool(df, rows):
+    """Filter high-probability dari DataFrame sumber yang sudah dibaca."""
+    print("\nFiltering high-probability leads...")
     high_prob_conditions = (
-        (df['balance'] > -100) &
+        # Good balance
+        (df['balance'] > 0) &
+        # Has housing loan (engagement indicator)
+        ((df['housing'] == 'yes') | (df['loan'] == 'yes')) &
+        # Not student or retired (active workers)
         (~df['job'].isin(['student', 'unemployed'])) &
-        (df['campaign'] <= 5)
+        # Not too many campaigns
+        (df['campaign'] <= 3) &
+        # Educated
+        (df['education'].isin(['secondary', 'tertiary']))
     )
-    high_prob_df = df[high_prob_conditions].copy()
-    print(f"After relaxing: {len(high_prob_df)}")
-
-# Sample 1000 leads
-if len(high_prob_df) >= 1000:
-    selected_df = high_prob_df.sample(n=1000, random_state=42)
-else:
-    # If still not enough, sample with replacement
-    selected_df = high_prob_df.sample(n=1000, replace=True, random_state=42)
-
-print(f"\nSelected {len(selected_df)} leads")
-
-# Generate JSON data
-print("\nGenerating JSON with Indonesian names and contacts...")
-leads_data = []
-
-# Assign scores based on features
-def calculate_score(row):
-    """Calculate prediction score (0.5 to 0.95 for high probability)"""
-    score = 0.50  # Base score
-    
+    pool = df[high_prob_conditions]
+    print(f"High probability leads found: {len(pool)}")
+
+    if len(pool) < rows:
+        print(f"Relaxing conditions to get {rows} leads...")
+        high_prob_conditions = (
+            (df['balance'] > -100) &
+            (~df['job'].isin(['student', 'unemployed'])) &
+            (df['campaign'] <= 5)
+        )
+        pool = df[high_prob_conditions]
+        print(f"After relaxing: {len(pool)}")
+
+    return pool[SOURCE_COLUMNS].reset_index(drop=True)
+
+# ==================== VECTORIZED COLUMNS ====================
+
+def calculate_scores(chunk, noise):
+    """Prediction score (0.5 - 0.95) untuk seluruh chunk sekaligus."""
+    balance = chunk['balance'].to_numpy()
+    job = chunk['job'].to_numpy()
+    score = np.full(len(chunk), 0.50)
+
     # Balance contribution
-    if row['balance'] > 5000:
-        score += 0.15
-    elif row['balance'] > 1000:
-        score += 0.10
-    elif row['balance'] > 0:
-        score += 0.05
-    
+    score += np.select([balance > 5000, balance > 1000, balance > 0], [0.15, 0.10, 0.05], 0.0)
+
     # Job contribution
-    if row['job'] in ['management', 'entrepreneur', 'self-employed']:
-        score += 0.10
-    elif row['job'] in ['technician', 'admin.']:
-        score += 0.05
-    
+    score += np.where(np.isin(job, ['management', 'entrepreneur', 'self-employed']), 0.10,
+                      np.where(np.isin(job, ['technician', 'admin.']), 0.05, 0.0))
+
     # Education contribution
-    if row['education'] == 'tertiary':
-        score += 0.10
-    elif row['education'] == 'secondary':
-        score += 0.05
-    
+    education = chunk['education'].to_numpy()
+    score += np.where(education == 'tertiary', 0.10, np.where(education == 'secondary', 0.05, 0.0))
+
     # Marital status
-    if row['marital'] == 'married':
-        score += 0.05
-    
+    score += np.where(chunk['marital'].to_numpy() == 'married', 0.05, 0.0)
+
     # Housing/Loan (engagement)
-    if row['housing'] == 'yes':
-        score += 0.05
-    if row['loan'] == 'yes':
-        score += 0.03
-    
+    score += np.where(chunk['housing'].to_numpy() == 'yes', 0.05, 0.0)
+    score += np.where(chunk['loan'].to_numpy() == 'yes', 0.03, 0.0)
+
     # Campaign efficiency
-    if row['campaign'] <= 2:
-        score += 0.05
-    
-    # Add some randomness
-    score += random.uniform(-0.05, 0.05)
-    
-    # Ensure score is between 0.50 and 0.95
-    return max(0.50, min(0.95, score))
-
-# Generate data
-for idx, (_, row) in enumerate(selected_df.iterrows(), 1):
-    name = generate_name()
-    score = calculate_score(row)
-    
-    # Determine category
-    if score >= 0.80:
-        category = "Hot Lead"
-    elif score >= 0.50:
-        category = "Warm Lead"
-    else:
-        category = "Cold Lead"
-    
-    lead = {
-        "id": idx,
-        "name": name,
-        "phone": generate_phone(),
-        "email": generate_email(name),
-        "age": int(row['age']),
-        "job": str(row['job']),
-        "marital": str(row['marital']),
-        "education": str(row['education']),
-        "default": str(row['default']),
-        "balance": int(row['balance']),
-        "housing": str(row['housing']),
-        "loan": str(row['loan']),
-        "contact": str(row['contact']),
-        "day": int(row['day']),
-        "month": str(row['month']),
-        "duration": int(row['duration']),
-        "campaign": int(row['campaign']),
-        "pdays": int(row['pdays']),
-        "previous": int(row['previous']),
-        "poutcome": str(row['poutcome']),
-        "y": str(row['y']),
-        "prediction_score": round(score, 4),
-        "category": category,
-        "status": random.choice(["New", "Contacted", "Follow Up", "Pending"]),
-        "last_contact": (datetime.now() - timedelta(days=random.randint(0, 30))).strftime("%Y-%m-%d")
-    }
-    
-    leads_data.append(lead)
-
-# Calculate statistics
-hot_leads = [l for l in leads_data if l['category'] == 'Hot Lead']
-warm_leads = [l for l in leads_data if l['category'] == 'Warm Lead']
-cold_leads = [l for l in leads_data if l['category'] == 'Cold Lead']
-
-print(f"\nStatistics:")
-print(f"  Total Leads: {len(leads_data)}")
-print(f"  Hot Leads (≥80%): {len(hot_leads)}")
-print(f"  Warm Leads (50-80%): {len(warm_leads)}")
-print(f"  Cold Leads (<50%): {len(cold_leads)}")
-print(f"\nAverage Score: {sum(l['prediction_score'] for l in leads_data) / len(leads_data):.4f}")
-print(f"Min Score: {min(l['prediction_score'] for l in leads_data):.4f}")
-print(f"Max Score: {max(l['prediction_score'] for l in leads_data):.4f}")
-
-# Save to JSON
-output_file = 'static/leads_data.json'
-with open(output_file, 'w', encoding='utf-8') as f:
-    json.dump(leads_data, f, indent=2, ensure_ascii=False)
-
-print(f"\n✓ Data saved to: {output_file}")
-print(f"✓ Total: {len(leads_data)} leads")
-print(f"✓ All leads have >50% conversion probability!")
-print(f"\nSample lead:")
-print(json.dumps(leads_data[0], indent=2, ensure_ascii=False))
+    score += np.where(chunk['campaign'].to_numpy() <= 2, 0.05, 0.0)
+
+    # Add some randomness, lalu batasi ke 0.50 - 0.95
+    return np.round(np.clip(score + noise, 0.50, 0.95), 4)
+
+class LeadGenerator:
+    """
+    Membuat lead per chunk dari pool kandidat.
+
+    Setiap kolom random memakai generator sendiri (di-spawn dari seed yang
+    sama), sehingga chunk berturut-turut menghasilkan data yang sama dengan
+    satu chunk besar.
+    """
+
+    def __init__(self, pool, rows, seed=42, as_of=None):
+        self.pool = pool
+        self.rows = rows
+        self.rng = dict(zip(STREAMS, (np.random.default_rng(s)
+                                      for s in np.random.SeedSequence(seed).spawn(len(STREAMS)))))
+        self.replace = len(pool) < rows
+        if not self.replace:
+            # Sample tanpa pengembalian (seperti df.sample) lewat satu permutasi
+            self.sample_index = self.rng['sample'].permutation(len(pool))[:rows]
+
+        as_of = as_of or date.today()
+        self.contact_dates = np.array([(as_of - timedelta(days=d)).strftime("%Y-%m-%d") for d in range(31)])
+        self.male = np.array(first_names_male)
+        self.female = np.array(first_names_female)
+        self.last = np.array(last_names)
+
+    def chunks(self, chunk_size):
+        for start in range(0, self.rows, chunk_size):
+            yield self.make_chunk(start, min(chunk_size, self.rows - start))
+
+    def make_chunk(self, start, n):
+        rng = self.rng
+        if self.replace:
+            index = rng['sample'].integers(0, len(self.pool), n)
+        else:
+            index = self.sample_index[start:start + n]
+        chunk = self.pool.take(index).reset_index(drop=True)
+
+        # Generate Indonesian names
+        first = np.where(rng['gender'].integers(0, 2, n) == 1,
+                         self.male[rng['male'].integers(0, len(self.male), n)],
+                         self.female[rng['female'].integers(0, len(self.female), n)])
+        name = pd.Series(first) + ' ' + pd.Series(self.last[rng['last'].integers(0, len(self.last), n)])
+
+        # Generate phone number (Indonesian format)
+        prefix = pd.Series(np.array(PHONE_PREFIXES)[rng['phone_prefix'].integers(0, len(PHONE_PREFIXES), n)])
+        digits = pd.Series(rng['phone_number'].integers(0, 10**8, n)).astype(str).str.zfill(8)
+        phone = prefix + '-' + digits.str[:4] + '-' + digits.str[4:]
+
+        # Generate email
+        email = (name.str.lower().str.replace(' ', '.', regex=False)
+                 + pd.Series(rng['email_number'].integers(1, 1000, n)).astype(str) + '@'
+                 + pd.Series(np.array(EMAIL_DOMAINS)[rng['email_domain'].integers(0, len(EMAIL_DOMAINS), n)]))
+
+        score = calculate_scores(chunk, rng['score_noise'].uniform(-0.05, 0.05, n))
+        category = np.where(score >= 0.80, "Hot Lead", np.where(score >= 0.50, "Warm Lead", "Cold Lead"))
+
+        chunk.insert(0, 'id', np.arange(start + 1, start + n + 1))
+        chunk.insert(1, 'name', name)
+        chunk.insert(2, 'phone', phone)
+        chunk.insert(3, 'email', email)
+        chunk['prediction_score'] = score
+        chunk['category'] = category
+        chunk['status'] = np.array(STATUSES)[rng['status'].integers(0, len(STATUSES), n)]
+        chunk['last_contact'] = self.contact_dates[rng['last_contact'].integers(0, 31, n)]
+        return chunk[OUTPUT_COLUMNS]
+
+# ==================== CHUNKED WRITERS ====================
+
+class ChunkWriter:
+    """Tulis chunk DataFrame ke JSON array, NDJSON, CSV, atau Parquet."""
+
+    def __init__(self, path, fmt):
+        self.path = path
+        self.fmt = fmt
+        self.count = 0
+        self._parquet = None
+        if fmt != 'parquet':
+            self._file = open(path, 'w', encoding='utf-8', newline='')
+            if fmt == 'json':
+                self._file.write('[\n')
+
+    def write(self, chunk):
+        if self.fmt == 'json':
+            body = chunk.to_json(orient='records', lines=True, force_ascii=False).rstrip('\n')
+            if self.count:
+                self._file.write(',\n')
+            self._file.write(body.replace('\n', ',\n'))
+        elif self.fmt == 'ndjson':
+            self._file.write(chunk.to_json(orient='records', lines=True, force_ascii=False))
+        elif self.fmt == 'csv':
+            chunk.to_csv(self._file, index=False, header=(self.count == 0))
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table)
+        self.count += len(chunk)
+
+    def close(self):
+        if self.fmt == 'parquet':
+            if self._parquet is not None:
+                self._parquet.close()
+            return
+        if self.fmt == 'json':
+            self._file.write('\n]\n')
+        self._file.close()
+
+def output_format(path, fmt=None):
+    if fmt:
+        return fmt
+    ext = os.path.splitext(path)[1].lower()
+    return {'.ndjson': 'ndjson', '.jsonl': 'ndjson', '.csv': 'csv', '.parquet': 'parquet'}.get(ext, 'json')
+
+# ==================== MAIN ====================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate synthetic high-probability leads.')
+    parser.add_argument('--rows', type=int, default=1000, help='Jumlah lead (default: 1000)')
+    parser.add_argument('--source', default='bank-full.csv', help="Dataset bank marketing (delimiter ';')")
+    parser.add_argument('--output', default='static/leads_data.json', help='File output')
+    parser.add_argument('--format', choices=['json', 'ndjson', 'csv', 'parquet'],
+                        help='Format output (default: dari ekstensi file)')
+    parser.add_argument('--chunk-size', type=int, default=100_000, help='Lead per chunk yang ditulis')
+    parser.add_argument('--seed', type=int, default=42, help='Seed random (default: 42)')
+    parser.add_argument('--as-of', type=lambda s: datetime.strptime(s, '%Y-%m-%d').date(),
+                        help='Tanggal acuan last_contact (YYYY-MM-DD, default: hari ini)')
+    args = parser.parse_args(argv)
+
+    print(f"Reading {args.source}...")
+    pool = load_candidate_pool(args.source, args.rows)
+    generator = LeadGenerator(pool, args.rows, seed=args.seed, as_of=args.as_of)
+    print(f"\nGenerating {args.rows:,} leads in chunks of {args.chunk_size:,}...")
+
+    fmt = output_format(args.output, args.format)
+    writer = ChunkWriter(args.output, fmt)
+    counts = {"Hot Lead": 0, "Warm Lead": 0, "Cold Lead": 0}
+    score_sum, score_min, score_max = 0.0, 1.0, 0.0
+    first = None
+    try:
+        for chunk in generator.chunks(args.chunk_size):
+            writer.write(chunk)
+            for category, count in chunk['category'].value_counts().items():
+                counts[category] += int(count)
+            scores = chunk['prediction_score'].to_numpy()
+            score_sum += float(scores.sum())
+            score_min = min(score_min, float(scores.min()))
+            score_max = max(score_max, float(scores.max()))
+            if first is None:
+                first = chunk.iloc[0].to_dict()
+    finally:
+        writer.close()
+
+    # Calculate statistics
+    total = writer.count
+    print(f"\nStatistics:")
+    print(f"  Total Leads: {total}")
+    print(f"  Hot Leads (≥80%): {counts['Hot Lead']}")
+    print(f"  Warm Leads (50-80%): {counts['Warm Lead']}")
+    print(f"  Cold Leads (<50%): {counts['Cold Lead']}")
+    print(f"\nAverage Score: {score_sum / total:.4f}")
+    print(f"Min Score: {score_min:.4f}")
+    print(f"Max Score: {score_max:.4f}")
+
+    print(f"\n✓ Data saved to: {args.output} ({fmt})")
+    print(f"✓ Total: {total} leads")
+    print(f"✓ All leads have >50% conversion probability!")
+    print(f"\nSample lead:")
+    print(json.dumps(first, indent=2, ensure_ascii=False, default=lambda v: v.item()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Prescient - Password Hashing Pool
+
+PBKDF2-SHA256 (100.000 iterasi) sengaja lambat. Supaya lonjakan login tidak
+memakan threadpool FastAPI (yang juga dipakai endpoint lain), hashing
+dijalankan di process pool khusus:
+
+- Jumlah worker dibatasi (PRESCIENT_HASH_WORKERS).
+- Antrian dibatasi (PRESCIENT_HASH_QUEUE). Jika worker + antrian penuh,
+  request langsung ditolak dengan PoolSaturated (route membalas 503 +
+  Retry-After), bukan ikut mengantri tanpa batas.
+- Slot dikembalikan saat task di pool selesai (done-callback future), bukan
+  saat request yang menunggu selesai: request yang dibatalkan (client
+  disconnect) tetap memegang slot selama PBKDF2-nya masih berjalan.
+- Waktu tunggu di antrian dan durasi hashing dicatat untuk /auth/health.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+
+PBKDF2_ITERATIONS = 100000
+DEFAULT_WORKERS = max(1, min(2, os.cpu_count() or 1))
+DEFAULT_QUEUE_SIZE = 32
+LATENCY_WINDOW = 1000
+
+# ==================== PBKDF2 ====================
+
+def hash_password(password):
+    """Hash password dengan salt baru, format salt$hash."""
+    salt = secrets.token_hex(16)
+    password_hash = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'),
+                                        salt.encode('utf-8'), PBKDF2_ITERATIONS)
+    return f"{salt}${password_hash.hex()}"
+
+def check_password(plain_password, hashed_password):
+    """Cocokkan password dengan hash format salt$hash."""
+    try:
+        salt, stored_hash = hashed_password.split('$')
+    except (AttributeError, ValueError):
+        return False
+    password_hash = hashlib.pbkdf2_hmac('sha256', plain_password.encode('utf-8'),
+                                        salt.encode('utf-8'), PBKDF2_ITERATIONS)
+    return hmac.compare_digest(password_hash.hex(), stored_hash)
+
+def _timed(fn, args):
+    """Jalankan fn di worker; kembalikan (hasil, mulai, selesai) dalam monotonic time."""
+    started = time.monotonic()
+    result = fn(*args)
+    return result, started, time.monotonic()
+
+# ==================== POOL ====================
+
+class PoolSaturated(Exception):
+    """Worker dan antrian hashing penuh."""
+
+class HashingPool:
+    """Process pool berukuran tetap dengan antrian terbatas."""
+
+    def __init__(self, workers=DEFAULT_WORKERS, max_queue=DEFAULT_QUEUE_SIZE):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._executor = None
+        self._lock = threading.Lock()
+        self._queue_wait = deque(maxlen=LATENCY_WINDOW)
+        self._hashing = deque(maxlen=LATENCY_WINDOW)
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.failed = 0
+        self.cancelled = 0
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(self.workers, mp_context=get_context("spawn"))
+            return self._executor
+
+    async def run(self, fn, *args):
+        """
+        Jalankan fn(*args) di worker dan tunggu hasilnya tanpa memblokir
+        event loop. Raise PoolSaturated jika tidak ada slot.
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PoolSaturated(f"Hashing pool penuh ({self.workers} worker, antrian {self.max_queue})")
+
+        submitted = time.monotonic()
+        with self._lock:
+            self.submitted += 1
+        try:
+            future = self._get_executor().submit(_timed, fn, args)
+        except BaseException:
+            self._slots.release()
+            with self._lock:
+                self.failed += 1
+            raise
+        future.add_done_callback(lambda done: self._finished(done, submitted))
+
+        result, _, _ = await asyncio.wrap_future(future)
+        return result
+
+    def _finished(self, future, submitted):
+        """Done-callback task pool: kembalikan slot dan catat hasilnya."""
+        self._slots.release()
+        with self._lock:
+            if future.cancelled():
+                self.cancelled += 1
+            elif future.exception() is not None:
+                self.failed += 1
+            else:
+                _, started, finished = future.result()
+                self.completed += 1
+                self._queue_wait.append(max(started - submitted, 0.0))
+                self._hashing.append(finished - started)
+
+    async def hash_password(self, password):
+        return await self.run(hash_password, password)
+
+    async def verify_password(self, plain_password, hashed_password):
+        return await self.run(check_password, plain_password, hashed_password)
+
+    def stats(self):
+        """Counter dan persentil latency (ms) dari LATENCY_WINDOW hashing terakhir."""
+        with self._lock:
+            queue_wait = np.array(self._queue_wait) * 1000
+            hashing = np.array(self._hashing) * 1000
+            stats = {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": self.submitted - self.completed - self.failed - self.cancelled,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "failed": self.failed,
+                "cancelled": self.cancelled,
+            }
+
+        for name, values in (("queue_wait_ms", queue_wait), ("hashing_ms", hashing)):
+            if len(values):
+                p50, p95, p99 = np.percentile(values, [50, 95, 99])
+                stats[name] = {"p50": round(float(p50), 2), "p95": round(float(p95), 2),
+                               "p99": round(float(p99), 2),
+                               "max": round(float(values.max()), 2)}
+            else:
+                stats[name] = None
+        return stats
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+HASHING_POOL = HashingPool(
+    workers=int(os.environ.get("PRESCIENT_HASH_WORKERS", DEFAULT_WORKERS)),
+    max_queue=int(os.environ.get("PRESCIENT_HASH_QUEUE", DEFAULT_QUEUE_SIZE)),
+)
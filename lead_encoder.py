@@ -0,0 +1,212 @@
+"""
+Prescient - Vocabulary & Dense Encoder
+
+Pipeline model (ColumnTransformer: StandardScaler + OneHotEncoder lalu
+classifier) menerima string bebas untuk kolom kategori. Nilai yang salah
+ketik diam-diam menjadi vektor nol karena OneHotEncoder(handle_unknown='ignore'),
+dan setiap panggilan membandingkan string lagi.
+
+LeadEncoder mengekspor vocabulary dari encoder yang sudah di-fit:
+
+- Setiap kolom kategori menjadi dict {nilai (interned): kode}, jadi validasi
+  request adalah lookup O(1) yang langsung menghasilkan kode integer.
+- Nilai di luar vocabulary ditolak (UnknownCategory) atau, dengan
+  PRESCIENT_UNKNOWN_CATEGORIES=count, dihitung dan di-encode seperti
+  handle_unknown='ignore'. Jumlahnya tersedia di unknown_counts().
+- Kode dan kolom numerik dirakit langsung menjadi matriks fitur dense
+  (scaling + one-hot lewat indeks), lalu masuk ke classifier tanpa
+  DataFrame dan ColumnTransformer. Hasilnya identik dengan pipeline.predict_proba.
+
+Pipeline dengan struktur lain (misalnya model XGBoost dari train_model.py)
+tidak punya LeadEncoder (encoder_for() mengembalikan None) dan tetap memakai
+pipeline.predict_proba.
+"""
+
+import os
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+UNKNOWN_POLICY = os.environ.get("PRESCIENT_UNKNOWN_CATEGORIES", "reject")
+UNKNOWN = -1
+
+class UnknownCategory(ValueError):
+    """Nilai kategori di luar vocabulary model."""
+
+    def __init__(self, column, value, allowed):
+        super().__init__(f"Nilai '{value}' tidak dikenal untuk {column}. Pilihan: {', '.join(allowed)}")
+        self.column = column
+        self.value = value
+        self.allowed = allowed
+
+class LeadEncoder:
+    """Vocabulary + encoder dense yang diekspor dari pipeline yang sudah di-fit."""
+
+    def __init__(self, numeric_columns, mean, scale, categorical_columns, categories, classifier,
+                 unknown_policy=UNKNOWN_POLICY):
+        self.numeric_columns = list(numeric_columns)
+        self.categorical_columns = list(categorical_columns)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.categories = {column: [sys.intern(str(value)) for value in values]
+                           for column, values in zip(self.categorical_columns, categories)}
+        self.vocabularies = {column: {value: code for code, value in enumerate(values)}
+                             for column, values in self.categories.items()}
+        self.classifier = classifier
+        self.unknown_policy = unknown_policy
+
+        # Posisi awal blok one-hot tiap kolom di matriks fitur
+        self.offsets = []
+        offset = len(self.numeric_columns)
+        for column in self.categorical_columns:
+            self.offsets.append(offset)
+            offset += len(self.categories[column])
+        self.n_features = offset
+
+        self._lock = threading.Lock()
+        self._unknown = {column: 0 for column in self.categorical_columns}
+
+    @classmethod
+    def from_pipeline(cls, pipeline, unknown_policy=UNKNOWN_POLICY):
+        """
+        LeadEncoder untuk Pipeline([preprocessor, classifier]) dengan
+        ColumnTransformer berisi satu StandardScaler dan satu OneHotEncoder.
+        Return None jika struktur pipeline berbeda.
+        """
+        steps = getattr(pipeline, "steps", None)
+        if not steps or len(steps) != 2 or not isinstance(steps[0][1], ColumnTransformer):
+            return None
+        preprocessor, classifier = steps[0][1], steps[1][1]
+
+        # Blok fitur harus: StandardScaler lalu OneHotEncoder (remainder kosong/drop)
+        fitted = [(transformer, list(columns)) for name, transformer, columns in preprocessor.transformers_
+                  if not (name == "remainder" and (isinstance(transformer, str) or not len(columns)))]
+        if len(fitted) != 2:
+            return None
+        (scaler, numeric_columns), (encoder, categorical_columns) = fitted
+        if not isinstance(scaler, StandardScaler) or not isinstance(encoder, OneHotEncoder):
+            return None
+        if encoder.drop_idx_ is not None or getattr(encoder, "_infrequent_enabled", False):
+            return None
+
+        mean = scaler.mean_ if scaler.with_mean else np.zeros(len(numeric_columns))
+        scale = scaler.scale_ if scaler.with_std else np.ones(len(numeric_columns))
+        return cls(numeric_columns, mean, scale, categorical_columns, encoder.categories_, classifier,
+                   unknown_policy=unknown_policy)
+
+    # ---------- vocabulary ----------
+
+    def _unknown_value(self, column, value):
+        with self._lock:
+            self._unknown[column] += 1
+        if self.unknown_policy != "count":
+            raise UnknownCategory(column, value, self.categories[column])
+        return UNKNOWN
+
+    def row_codes(self, row):
+        """Kode integer kolom kategori untuk satu lead (dict). Raise UnknownCategory."""
+        codes = []
+        for column in self.categorical_columns:
+            value = row[column]
+            code = self.vocabularies[column].get(value)
+            codes.append(self._unknown_value(column, value) if code is None else code)
+        return codes
+
+    def column_codes(self, column, values):
+        """Kode integer untuk satu kolom (list/array/pd.Categorical), vektor."""
+        vocabulary = self.vocabularies[column]
+        categorical = values if isinstance(values, pd.Categorical) else pd.Categorical(values)
+        # Lookup per nilai unik, lalu gather dengan kode kolom
+        lookup = np.array([vocabulary.get(value, UNKNOWN) for value in categorical.categories] + [UNKNOWN],
+                          dtype=np.int64)
+        codes = lookup[categorical.codes]
+        unknown = codes == UNKNOWN
+        if unknown.any():
+            first = categorical[np.argmax(unknown)]
+            with self._lock:
+                self._unknown[column] += int(unknown.sum())
+            if self.unknown_policy != "count":
+                raise UnknownCategory(column, first, self.categories[column])
+        return codes
+
+    def unknown_counts(self):
+        with self._lock:
+            return dict(self._unknown)
+
+    # ---------- encoder ----------
+
+    def dense(self, numeric, codes):
+        """
+        Matriks fitur (n, n_features) dari numerik (n, n_numeric) dan kode
+        kategori (n, n_categorical). Kode UNKNOWN menjadi one-hot nol.
+        """
+        numeric = np.asarray(numeric, dtype=np.float64).reshape(-1, len(self.numeric_columns))
+        codes = np.asarray(codes, dtype=np.int64).reshape(-1, len(self.categorical_columns))
+        n_rows = numeric.shape[0]
+
+        X = np.zeros((n_rows, self.n_features), dtype=np.float64)
+        X[:, :len(self.numeric_columns)] = (numeric - self.mean) / self.scale
+        rows = np.arange(n_rows)
+        for i, offset in enumerate(self.offsets):
+            column_codes = codes[:, i]
+            known = column_codes != UNKNOWN
+            X[rows[known], offset + column_codes[known]] = 1.0
+        return X
+
+    def encode_rows(self, rows):
+        """Matriks fitur untuk list dict lead (validasi vocabulary per baris)."""
+        codes = [self.row_codes(row) for row in rows]
+        numeric = [[row[column] for column in self.numeric_columns] for row in rows]
+        return self.dense(numeric, codes)
+
+    def encode_columns(self, columns):
+        """Matriks fitur untuk dict kolom (numpy array / pd.Categorical)."""
+        codes = np.column_stack([self.column_codes(column, columns[column]) for column in self.categorical_columns])
+        numeric = np.column_stack([np.asarray(columns[column], dtype=np.float64) for column in self.numeric_columns])
+        return self.dense(numeric, codes)
+
+    def predict_rows(self, rows):
+        """Skor kelas positif untuk list dict lead."""
+        return self.classifier.predict_proba(self.encode_rows(rows))[:, 1]
+
+    def predict_columns(self, columns):
+        """Skor kelas positif untuk dict kolom."""
+        return self.classifier.predict_proba(self.encode_columns(columns))[:, 1]
+
+    def field_groups(self):
+        """
+        (fields, groups): nama field input dan, untuk setiap kolom matriks
+        fitur, indeks field asalnya (blok one-hot kembali ke kolom kategorinya).
+        """
+        fields = self.numeric_columns + self.categorical_columns
+        groups = np.empty(self.n_features, dtype=np.int64)
+        groups[:len(self.numeric_columns)] = np.arange(len(self.numeric_columns))
+        for i, (column, offset) in enumerate(zip(self.categorical_columns, self.offsets)):
+            groups[offset:offset + len(self.categories[column])] = len(self.numeric_columns) + i
+        return fields, groups
+
+# Satu LeadEncoder per objek model (model resident tidak berubah setelah dimuat)
+_ENCODERS = {}
+_ENCODERS_LOCK = threading.Lock()
+
+def encoder_for(model):
+    """LeadEncoder untuk model (dibuat sekali dan di-cache), atau None jika tidak didukung."""
+    entry = _ENCODERS.get(id(model))
+    if entry is not None and entry[0] is model:
+        return entry[1]
+    encoder = LeadEncoder.from_pipeline(model)
+    with _ENCODERS_LOCK:
+        # Simpan referensi model supaya id() tidak dipakai ulang objek lain
+        _ENCODERS[id(model)] = (model, encoder)
+    return encoder
+
+def release_encoder(model):
+    """Lepaskan LeadEncoder (dan referensi model) saat model dikeluarkan dari memori."""
+    with _ENCODERS_LOCK:
+        entry = _ENCODERS.get(id(model))
+        if entry is not None and entry[0] is model:
+            del _ENCODERS[id(model)]
@@ -0,0 +1,301 @@
+"""
+Prescient - Schema-driven CSV Ingestion
+
+Satu tempat untuk membaca bank-full.csv dan turunannya. Ada dua skema:
+
+    LEAD_SCHEMA   data prospek (delimiter ',': ID, Nama, Pekerjaan, Saldo, ...)
+    BANK_SCHEMA   dataset bank marketing UCI (delimiter ';': age, job, ..., y)
+
+Skema menentukan delimiter, kolom wajib, vocabulary kategori dan lebar
+dtype numerik, sehingga pandas tidak perlu menebak tipe setiap kali dan
+string kategori disimpan sebagai `category`, bukan object. Skema dikenali
+otomatis dari header.
+
+Hasil parse di-cache sebagai file biner (Feather jika pyarrow tersedia,
+jika tidak kolom `.npy`) di CACHE_DIR. Cache dipakai jika mtime+ukuran file
+sama; jika mtime berubah tapi SHA-256 isinya sama, cache tetap dipakai.
+
+Usage:
+    from lead_io import load_csv
+    df = load_csv('bank-full.csv')                 # skema dari header
+    df = load_csv(path, schema=BANK_SCHEMA, cache=False)
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from model_registry import file_sha256
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+CACHE_DIR = os.environ.get("PRESCIENT_CSV_CACHE", ".lead_cache")
+CACHE_VERSION = 1
+META_FILENAME = "meta.json"
+
+# ==================== VOCABULARIES ====================
+
+JOBS = ['admin.', 'blue-collar', 'entrepreneur', 'housemaid', 'management', 'retired',
+        'self-employed', 'services', 'student', 'technician', 'unemployed', 'unknown']
+MARITAL = ['divorced', 'married', 'single']
+YES_NO = ['no', 'yes']
+EDUCATION = ['primary', 'secondary', 'tertiary', 'unknown']
+CONTACT = ['cellular', 'telephone', 'unknown']
+MONTHS = ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
+POUTCOME = ['failure', 'other', 'success', 'unknown']
+LEAD_LABELS = ['Cold Lead', 'Warm Lead', 'Hot Lead']
+LEAD_STATUSES = ['pending', 'done']
+
+# ==================== SCHEMAS ====================
+
+class Schema:
+    """
+    Deklarasi satu format CSV.
+
+    `columns` memetakan nama kolom ke list vocabulary (kategori), nama dtype
+    numpy (numerik), atau 'string'. `required` adalah kolom yang harus ada.
+    """
+
+    def __init__(self, name, sep, columns, required):
+        self.name = name
+        self.sep = sep
+        self.columns = columns
+        self.required = required
+
+    def dtypes(self, header):
+        """dtype untuk read_csv, hanya untuk kolom yang ada di header."""
+        dtypes = {}
+        for column in header:
+            spec = self.columns.get(column)
+            if isinstance(spec, list):
+                dtypes[column] = 'category'
+            elif spec == 'string':
+                dtypes[column] = object
+            elif spec is not None:
+                dtypes[column] = spec
+        return dtypes
+
+    def apply_vocabularies(self, df, source):
+        """
+        Samakan urutan kategori dengan vocabulary skema (kode stabil antar
+        file). Nilai di luar vocabulary dipertahankan di akhir daftar kategori.
+        """
+        for column, spec in self.columns.items():
+            if not isinstance(spec, list) or column not in df:
+                continue
+            extras = [c for c in df[column].cat.categories if c not in spec]
+            if extras:
+                print(f"⚠️  {source}: kolom '{column}' berisi nilai di luar vocabulary: {extras}")
+            df[column] = df[column].cat.set_categories(spec + extras)
+        return df
+
+LEAD_SCHEMA = Schema(
+    'lead',
+    sep=',',
+    columns={
+        'ID': 'int32',
+        'Nama': 'string',
+        'Pekerjaan': JOBS,
+        'Saldo': 'int32',
+        'Personal Loan': YES_NO,
+        'Housing Loan': YES_NO,
+        'Marital': MARITAL,
+        'Campaign': 'int16',
+        'Skor Probabilitas': 'float64',
+        'Prediksi': LEAD_LABELS,
+        'Status': LEAD_STATUSES,
+        'No Telepon': 'int64',
+        'duration': 'int16',
+        'feature_hash': 'string',
+        'model_version': 'string',
+    },
+    required=['ID', 'Pekerjaan', 'Saldo', 'Personal Loan', 'Housing Loan', 'Marital', 'Campaign'],
+)
+
+BANK_SCHEMA = Schema(
+    'bank',
+    sep=';',
+    columns={
+        'age': 'int16',
+        'job': JOBS,
+        'marital': MARITAL,
+        'education': EDUCATION,
+        'default': YES_NO,
+        'balance': 'int32',
+        'housing': YES_NO,
+        'loan': YES_NO,
+        'contact': CONTACT,
+        'day': 'int8',
+        'month': MONTHS,
+        'duration': 'int16',
+        'campaign': 'int16',
+        'pdays': 'int16',
+        'previous': 'int16',
+        'poutcome': POUTCOME,
+        'y': YES_NO,
+    },
+    required=['age', 'job', 'marital', 'education', 'default', 'balance', 'housing', 'loan',
+              'contact', 'day', 'month', 'duration', 'campaign', 'pdays', 'previous',
+              'poutcome', 'y'],
+)
+
+SCHEMAS = {schema.name: schema for schema in (LEAD_SCHEMA, BANK_SCHEMA)}
+
+def read_header(path, sep):
+    with open(path, 'r', encoding='utf-8') as f:
+        first = f.readline().rstrip('\r\n')
+    return [column.strip().strip('"') for column in first.split(sep)]
+
+def sniff_schema(path):
+    """Kenali skema dari baris header (None jika tidak cocok)."""
+    for schema in SCHEMAS.values():
+        header = read_header(path, schema.sep)
+        if all(column in header for column in schema.required):
+            return schema
+    return None
+
+# ==================== PARSING ====================
+
+def parser_engine():
+    """Engine read_csv tercepat yang tersedia."""
+    return 'pyarrow' if HAS_PYARROW else 'c'
+
+def parse_csv(path, schema):
+    """Parse CSV dengan dtype dari skema."""
+    header = read_header(path, schema.sep)
+    missing = [column for column in schema.required if column not in header]
+    if missing:
+        raise ValueError(f"{path} bukan data {schema.name} (kolom hilang: {', '.join(missing)})")
+
+    df = pd.read_csv(path, sep=schema.sep, dtype=schema.dtypes(header), engine=parser_engine())
+    return schema.apply_vocabularies(df, path)
+
+# ==================== BINARY CACHE ====================
+
+def cache_path(path, schema):
+    key = hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest()[:12]
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(CACHE_DIR, f"{stem}-{schema.name}-{key}")
+
+def _source_info(path):
+    stat = os.stat(path)
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+def _write_cache(directory, df, meta):
+    parent = os.path.dirname(directory) or '.'
+    os.makedirs(parent, exist_ok=True)
+    staging = tempfile.mkdtemp(dir=parent, prefix='.staging-')
+    try:
+        columns = []
+        if HAS_PYARROW:
+            df.to_feather(os.path.join(staging, 'data.feather'))
+            meta["format"] = "feather"
+        else:
+            for i, column in enumerate(df.columns):
+                values = df[column]
+                info = {"name": column, "file": f"{i}.npy"}
+                if isinstance(values.dtype, pd.CategoricalDtype) or values.dtype == object:
+                    # String disimpan sebagai kode + daftar kategori (tanpa pickle)
+                    categorical = values if isinstance(values.dtype, pd.CategoricalDtype) else values.astype('category')
+                    info["categories"] = [str(c) for c in categorical.cat.categories]
+                    info["object"] = values.dtype == object
+                    array = categorical.cat.codes.to_numpy()
+                else:
+                    array = values.to_numpy()
+                np.save(os.path.join(staging, info["file"]), array, allow_pickle=False)
+                columns.append(info)
+            meta["format"] = "npy"
+            meta["columns"] = columns
+
+        with open(os.path.join(staging, META_FILENAME), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(staging, directory)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+def _read_cache(directory, meta):
+    if meta["format"] == "feather":
+        # Kolom hasil konversi zero-copy dari Arrow (kode kategori) read-only;
+        # salin supaya pemanggil bisa menulis ke frame seperti hasil parse_csv
+        return pd.read_feather(os.path.join(directory, 'data.feather')).copy()
+
+    data = {}
+    for info in meta["columns"]:
+        array = np.load(os.path.join(directory, info["file"]), allow_pickle=False)
+        if "categories" in info:
+            values = pd.Categorical.from_codes(array, categories=info["categories"])
+            data[info["name"]] = values.astype(object) if info["object"] else values
+        else:
+            data[info["name"]] = array
+    return pd.DataFrame(data)
+
+def _load_meta(directory):
+    try:
+        with open(os.path.join(directory, META_FILENAME), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+# ==================== PUBLIC API ====================
+
+def load_csv(path, schema=None, cache=True):
+    """
+    Load CSV lead/bank sebagai DataFrame dengan dtype dari skema.
+
+    schema: LEAD_SCHEMA, BANK_SCHEMA, nama skema, atau None (dikenali dari
+    header). cache=False selalu parse ulang dari CSV.
+    """
+    if isinstance(schema, str):
+        schema = SCHEMAS[schema]
+    if schema is None:
+        schema = sniff_schema(path)
+        if schema is None:
+            raise ValueError(f"{path}: header tidak cocok dengan skema {', '.join(SCHEMAS)}")
+
+    if not cache:
+        return parse_csv(path, schema)
+
+    directory = cache_path(path, schema)
+    source = _source_info(path)
+    meta = _load_meta(directory)
+    if meta is not None and meta.get("version") == CACHE_VERSION:
+        if meta["source"] == source:
+            return _read_cache(directory, meta)
+        # mtime/ukuran berubah: cek isi file sebelum membuang cache
+        digest = file_sha256(path)
+        if digest == meta["sha256"]:
+            meta["source"] = source
+            try:
+                with open(os.path.join(directory, META_FILENAME), 'w', encoding='utf-8') as f:
+                    json.dump(meta, f, indent=2)
+            except OSError:
+                pass
+            return _read_cache(directory, meta)
+    else:
+        digest = None
+
+    df = parse_csv(path, schema)
+    try:
+        _write_cache(directory, df, {
+            "version": CACHE_VERSION,
+            "schema": schema.name,
+            "path": os.path.abspath(path),
+            "source": source,
+            "sha256": digest or file_sha256(path),
+        })
+    except OSError as e:
+        # Filesystem read-only (serverless): tetap kembalikan hasil parse
+        print(f"⚠️  Cache CSV tidak bisa ditulis ({e})")
+    return df
@@ -0,0 +1,214 @@
+"""
+Prescient - Columnar Lead Table
+
+Menyimpan daftar prospek di memori dalam bentuk kolom NumPy:
+- kolom kategori di-dictionary-encode (kode integer + vocabulary)
+- kolom numerik memakai dtype sempit
+- skor dan status disimpan per baris
+
+Aggregate (jumlah per tier Hot/Warm/Cold, per status, sum/sum kuadrat
+skor, min/max) dipelihara secara incremental, sehingga GET /leads/stats
+menjawab dalam O(1) dan tetap konsisten saat skor atau status berubah.
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+from scoring import FEATURE_COLUMNS, HOT_THRESHOLD, WARM_THRESHOLD, HOT_LEAD, WARM_LEAD, COLD_LEAD
+
+# Kode tier mengikuti np.searchsorted([WARM, HOT], score): 0=Cold, 1=Warm, 2=Hot
+TIERS = (COLD_LEAD, WARM_LEAD, HOT_LEAD)
+_TIER_EDGES = np.array([WARM_THRESHOLD, HOT_THRESHOLD])
+
+CATEGORICAL_COLUMNS = ['Pekerjaan', 'Personal Loan', 'Housing Loan', 'Marital']
+NUMERIC_DTYPES = {'Saldo': np.float64, 'Campaign': np.int16, 'duration': np.int16}
+DEFAULT_STATUSES = ['pending', 'done']
+
+def tier_codes(scores):
+    """Kode tier (0=Cold, 1=Warm, 2=Hot) untuk array skor, satu pass."""
+    return np.searchsorted(_TIER_EDGES, np.asarray(scores, dtype=np.float64), side='left')
+
+def tier_counts(scores):
+    """Jumlah lead per tier dalam satu pass: dict label -> count."""
+    counts = np.bincount(tier_codes(scores), minlength=len(TIERS))
+    return {label: int(counts[code]) for code, label in enumerate(TIERS)}
+
+def _tier_code(score):
+    if score > HOT_THRESHOLD:
+        return 2
+    if score > WARM_THRESHOLD:
+        return 1
+    return 0
+
+class LeadTable:
+    """Tabel lead kolumnar dengan aggregate yang dipelihara incremental."""
+
+    def __init__(self, ids, categoricals, numerics, scores, statuses):
+        self.ids = np.asarray(ids)
+        self.row_of = {str(lead_id): row for row, lead_id in enumerate(self.ids.tolist())}
+
+        # Dictionary encoding: kode integer kecil + vocabulary
+        self.codes = {}
+        self.vocab = {}
+        for column, values in categoricals.items():
+            codes, uniques = pd.factorize(pd.Series(values, dtype=object), sort=True)
+            self.codes[column] = codes.astype(np.int8)
+            self.vocab[column] = [str(u) for u in uniques]
+
+        self.numerics = {column: np.asarray(values, dtype=NUMERIC_DTYPES.get(column, np.float64))
+                         for column, values in numerics.items()}
+
+        status_values = pd.Series(statuses, dtype=object).fillna('pending').astype(str)
+        self.status_vocab = list(DEFAULT_STATUSES)
+        for status in status_values.unique():
+            if status not in self.status_vocab:
+                self.status_vocab.append(status)
+        self.status_index = {status: code for code, status in enumerate(self.status_vocab)}
+        self.status = status_values.map(self.status_index).to_numpy(dtype=np.int8)
+
+        self.scores = np.asarray(scores, dtype=np.float64)
+        self.tier = tier_codes(self.scores).astype(np.int8)
+
+        self._lock = threading.Lock()
+        self._recompute()
+
+    @classmethod
+    def from_frame(cls, df):
+        """Bangun tabel dari DataFrame bank-full.csv (skema prospek)."""
+        scores = df['Skor Probabilitas'] if 'Skor Probabilitas' in df else np.zeros(len(df))
+        statuses = df['Status'] if 'Status' in df else ['pending'] * len(df)
+        return cls(
+            ids=df['ID'].to_numpy(),
+            categoricals={column: df[column].to_numpy() for column in CATEGORICAL_COLUMNS},
+            numerics={column: df[column].to_numpy() for column in NUMERIC_DTYPES if column in df},
+            scores=pd.Series(scores).fillna(0.0).to_numpy(),
+            statuses=statuses,
+        )
+
+    # ---------- aggregates ----------
+
+    def _recompute(self):
+        """Hitung ulang semua aggregate dari kolom (dipakai saat load/bulk update)."""
+        n = len(self.scores)
+        self.count = n
+        self.score_sum = float(self.scores.sum())
+        self.score_sumsq = float(np.dot(self.scores, self.scores))
+        self.score_min = float(self.scores.min()) if n else None
+        self.score_max = float(self.scores.max()) if n else None
+        self._extremes_stale = False
+        # Matriks tier x status (baris: tier, kolom: status)
+        self.tier_status = np.zeros((len(TIERS), len(self.status_vocab)), dtype=np.int64)
+        np.add.at(self.tier_status, (self.tier, self.status), 1)
+
+    def _refresh_extremes(self):
+        # Hanya terjadi jika nilai min/max lama diganti; jarang, O(n)
+        self.score_min = float(self.scores.min()) if self.count else None
+        self.score_max = float(self.scores.max()) if self.count else None
+        self._extremes_stale = False
+
+    # ---------- updates ----------
+
+    def row(self, lead_id):
+        try:
+            return self.row_of[str(lead_id)]
+        except KeyError:
+            raise KeyError(f"Lead '{lead_id}' tidak ditemukan")
+
+    def update_status(self, lead_id, status):
+        """
+        Ubah status satu lead (O(1)). ValueError jika status di luar
+        vocabulary (vocabulary tidak bertambah lewat update, kode status int8).
+        """
+        row = self.row(lead_id)
+        code = self.status_index.get(status)
+        if code is None:
+            raise ValueError(f"Status '{status}' tidak dikenal. Pilihan: {', '.join(self.status_vocab)}")
+        with self._lock:
+            old = self.status[row]
+            if old != code:
+                self.tier_status[self.tier[row], old] -= 1
+                self.tier_status[self.tier[row], code] += 1
+                self.status[row] = code
+
+    def update_score(self, lead_id, score):
+        """Ubah skor satu lead dan perbarui aggregate (O(1))."""
+        row = self.row(lead_id)
+        score = float(score)
+        with self._lock:
+            old = float(self.scores[row])
+            self.scores[row] = score
+            self.score_sum += score - old
+            self.score_sumsq += score * score - old * old
+
+            tier = _tier_code(score)
+            if tier != self.tier[row]:
+                status = self.status[row]
+                self.tier_status[self.tier[row], status] -= 1
+                self.tier_status[tier, status] += 1
+                self.tier[row] = tier
+
+            if score <= self.score_min:
+                self.score_min = score
+            elif old == self.score_min:
+                self._extremes_stale = True
+            if score >= self.score_max:
+                self.score_max = score
+            elif old == self.score_max:
+                self._extremes_stale = True
+
+    def set_scores(self, scores):
+        """Ganti semua skor sekaligus (misalnya setelah rescore model baru)."""
+        scores = np.asarray(scores, dtype=np.float64)
+        if scores.shape != self.scores.shape:
+            raise ValueError("Jumlah skor tidak sama dengan jumlah lead")
+        with self._lock:
+            self.scores = scores.copy()
+            self.tier = tier_codes(self.scores).astype(np.int8)
+            self._recompute()
+
+    # ---------- queries ----------
+
+    def feature_frame(self):
+        """DataFrame input model yang direkonstruksi dari kolom tabel."""
+        data = {}
+        for column in FEATURE_COLUMNS:
+            if column in self.codes:
+                data[column] = np.asarray(self.vocab[column], dtype=object)[self.codes[column]]
+            else:
+                data[column] = self.numerics[column]
+        return pd.DataFrame(data, columns=FEATURE_COLUMNS)
+
+    def stats(self):
+        """Statistik distribusi skor dari aggregate (tanpa scan data)."""
+        with self._lock:
+            if self._extremes_stale:
+                self._refresh_extremes()
+            n = self.count
+            tier_totals = self.tier_status.sum(axis=1)
+            status_totals = self.tier_status.sum(axis=0)
+            mean = self.score_sum / n if n else 0.0
+            variance = max(self.score_sumsq / n - mean * mean, 0.0) if n else 0.0
+
+            tiers = {}
+            for code in reversed(range(len(TIERS))):
+                count = int(tier_totals[code])
+                tiers[TIERS[code]] = {
+                    "count": count,
+                    "percentage": round(count / n * 100, 2) if n else 0.0,
+                    "by_status": {status: int(self.tier_status[code, s])
+                                  for s, status in enumerate(self.status_vocab)},
+                }
+
+            return {
+                "total": n,
+                "tiers": tiers,
+                "score": {
+                    "mean": round(mean, 4),
+                    "std": round(variance ** 0.5, 4),
+                    "min": round(self.score_min, 4) if n else None,
+                    "max": round(self.score_max, 4) if n else None,
+                },
+                "status": {status: int(status_totals[s]) for s, status in enumerate(self.status_vocab)},
+            }
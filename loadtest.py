@@ -0,0 +1,326 @@
+"""
+Prescient - Predictive Lead Scoring
+HTTP Load Test
+
+Load test closed-loop (asyncio + httpx) terhadap server HTTP sungguhan.
+Default-nya server dijalankan lokal lewat serve.py di port bebas, dengan
+database, mail queue dan job queue sementara (prescient.db tidak tersentuh)
+dan rate limit dimatikan. Dengan --url load test dijalankan ke server yang
+sudah berjalan.
+
+Skenario (setiap langkah concurrency berjalan --duration detik; setiap
+virtual user mengirim request berikutnya setelah response sebelumnya):
+
+    predict    POST /predict, satu lead per request, concurrency naik bertahap
+    batch      POST /predict/batch, --batch-size lead per request
+    login      POST /auth/token berulang untuk user load test (PBKDF2)
+    dashboard  GET /, /static/leads_data.json, /leads/stats, /health bergiliran
+
+Laporan per langkah: RPS, latency p50/p95/p99 dan error rate (status >= 400
+atau error koneksi). Hasil dibandingkan dengan baseline (--baseline); langkah
+yang RPS-nya turun atau p95-nya naik lebih dari --tolerance, atau error
+rate-nya naik, dianggap regresi dan exit code menjadi 1.
+
+Usage:
+    python loadtest.py                                   # server lokal, semua skenario
+    python loadtest.py --scenarios predict --concurrency 1,8,32,128 --duration 10
+    python loadtest.py --save-baseline                   # simpan hasil sebagai baseline
+    python loadtest.py --url http://localhost:8000 --output benchmark_results/loadtest.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+import numpy as np
+
+DEFAULT_SOURCE = 'bank-full.csv'
+DEFAULT_BASELINE = os.path.join('benchmark_results', 'loadtest_baseline.json')
+DEFAULT_CONCURRENCY = {
+    "predict": [1, 8, 32, 128],
+    "batch": [1, 4],
+    "login": [1, 8],
+    "dashboard": [1, 16],
+}
+SCENARIOS = list(DEFAULT_CONCURRENCY)
+DASHBOARD_PATHS = ["/", "/static/leads_data.json", "/leads/stats", "/health"]
+PASSWORD = "loadtest-password-123"
+SERVER_START_TIMEOUT = 120
+
+# ==================== LOCAL SERVER ====================
+
+def free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+class LocalServer:
+    """serve.py di subprocess dengan state sementara"""
+
+    def __init__(self, workers, rate_limit=False):
+        self.workers = workers
+        self.rate_limit = rate_limit
+        self.port = free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.tmpdir = tempfile.mkdtemp(prefix='prescient-loadtest-')
+        self.process = None
+
+    def __enter__(self):
+        env = dict(os.environ)
+        env.update({
+            "PRESCIENT_DB_PATH": os.path.join(self.tmpdir, "prescient.db"),
+            "PRESCIENT_MAIL_QUEUE_DB": os.path.join(self.tmpdir, "mail_queue.db"),
+            "PRESCIENT_JOBS_DB": os.path.join(self.tmpdir, "scoring_jobs.db"),
+            "PRESCIENT_JOBS_DIR": os.path.join(self.tmpdir, "scoring_jobs"),
+            "PRESCIENT_RATE_LIMIT": "1" if self.rate_limit else "0",
+        })
+        self.process = subprocess.Popen(
+            [sys.executable, "serve.py", "--host", "127.0.0.1", "--port", str(self.port),
+             "--workers", str(self.workers), "--log-level", "warning"],
+            env=env, stdout=subprocess.DEVNULL,
+        )
+        self._wait_ready()
+        return self
+
+    def _wait_ready(self):
+        import httpx
+
+        deadline = time.monotonic() + SERVER_START_TIMEOUT
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"Server berhenti saat start (exit {self.process.returncode})")
+            try:
+                if httpx.get(f"{self.url}/health", timeout=1).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.5)
+        raise RuntimeError(f"Server tidak siap dalam {SERVER_START_TIMEOUT} detik")
+
+    def __exit__(self, *exc):
+        if self.process.poll() is None:
+            # SIGTERM: serve.py menghentikan worker secara graceful
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=40)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+# ==================== SCENARIOS ====================
+
+def load_leads(source, rows=1000, seed=42):
+    """Payload LeadInput dari data prospek"""
+    from lead_io import LEAD_SCHEMA, load_csv
+    from scoring import FEATURE_COLUMNS
+
+    df = load_csv(source, schema=LEAD_SCHEMA)[FEATURE_COLUMNS]
+    df = df.sample(n=min(rows, len(df)), random_state=seed)
+    records = df.astype({c: object for c in df.columns if str(df[c].dtype) == 'category'}).to_dict('records')
+    for record in records:
+        record['Saldo'] = float(record['Saldo'])
+        record['Campaign'] = int(record['Campaign'])
+        record['duration'] = int(record['duration'])
+    return records
+
+def build_scenarios(leads, token, user, batch_size):
+    """Nama skenario -> fungsi i -> (method, path, kwargs) untuk request ke-i"""
+    auth = {"Authorization": f"Bearer {token}"}
+    batches = [leads[i:i + batch_size] for i in range(0, len(leads) - batch_size + 1, batch_size)] or [leads]
+    login = {"username": user["username"], "password": user["password"]}
+    return {
+        "predict": lambda i: ("POST", "/predict", {"json": leads[i % len(leads)], "headers": auth}),
+        "batch": lambda i: ("POST", "/predict/batch", {"json": batches[i % len(batches)], "headers": auth}),
+        "login": lambda i: ("POST", "/auth/token", {"json": login}),
+        "dashboard": lambda i: ("GET", DASHBOARD_PATHS[i % len(DASHBOARD_PATHS)], {}),
+    }
+
+async def create_user(client):
+    """Daftarkan user load test dan ambil access token"""
+    suffix = uuid.uuid4().hex[:8]
+    user = {"email": f"loadtest-{suffix}@example.com", "username": f"loadtest_{suffix}", "password": PASSWORD}
+    response = await client.post("/auth/register", json=user)
+    response.raise_for_status()
+    response = await client.post("/auth/token", json={"username": user["username"], "password": PASSWORD})
+    response.raise_for_status()
+    return user, response.json()["access_token"]
+
+# ==================== RUNNER ====================
+
+async def run_step(client, scenario, make_request, concurrency, duration, warmup):
+    """Closed loop `concurrency` virtual user selama warmup + duration detik (warmup tidak dihitung)"""
+    import httpx
+
+    latencies = []
+    statuses = {}
+    errors = 0
+    measure_from = time.perf_counter() + warmup
+    deadline = measure_from + duration
+
+    async def virtual_user(index):
+        nonlocal errors
+        i = index
+        while time.perf_counter() < deadline:
+            method, path, kwargs = make_request(i)
+            i += concurrency
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, **kwargs)
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            if started < measure_from:
+                continue
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+            if not status.isdigit() or int(status) >= 400:
+                errors += 1
+
+    await asyncio.gather(*(virtual_user(i) for i in range(concurrency)))
+
+    latencies_ms = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+    return {
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "duration_s": duration,
+        "rps": round(len(latencies) / duration, 1),
+        "error_rate": round(errors / len(latencies), 4) if latencies else 1.0,
+        "latency_ms": {"p50": round(float(p50), 2), "p95": round(float(p95), 2),
+                       "p99": round(float(p99), 2), "max": round(float(latencies_ms.max()), 2)},
+        "status": dict(sorted(statuses.items())),
+    }
+
+async def run_all(url, scenarios, concurrency, args):
+    import httpx
+
+    max_concurrency = max(max(concurrency[name]) for name in scenarios)
+    limits = httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency)
+    results = []
+    async with httpx.AsyncClient(base_url=url, timeout=60, limits=limits) as client:
+        user, token = await create_user(client)
+        requests = build_scenarios(load_leads(args.source), token, user, args.batch_size)
+        for name in scenarios:
+            for level in concurrency[name]:
+                result = await run_step(client, name, requests[name], level, args.duration, args.warmup)
+                print_result(result)
+                results.append(result)
+    return results
+
+# ==================== REPORT & BASELINE ====================
+
+def print_result(result):
+    latency = result["latency_ms"]
+    print(f"  {result['scenario']:<10} c={result['concurrency']:<4} {result['rps']:>9.1f} req/s   "
+          f"p50 {latency['p50']:>8.2f}   p95 {latency['p95']:>8.2f}   p99 {latency['p99']:>8.2f} ms   "
+          f"err {result['error_rate'] * 100:5.1f}%")
+
+def compare_with_baseline(results, baseline, tolerance):
+    """Cetak selisih terhadap baseline; return list regresi"""
+    reference = {(r["scenario"], r["concurrency"]): r for r in baseline["results"]}
+    regressions = []
+    print("\n📊 Dibandingkan dengan baseline "
+          f"({baseline.get('generated_at', '?')}, toleransi {tolerance * 100:.0f}%):")
+    for result in results:
+        base = reference.get((result["scenario"], result["concurrency"]))
+        if base is None:
+            continue
+        rps_delta = result["rps"] / base["rps"] - 1 if base["rps"] else 0.0
+        p95_delta = result["latency_ms"]["p95"] / base["latency_ms"]["p95"] - 1 if base["latency_ms"]["p95"] else 0.0
+        problems = []
+        if rps_delta < -tolerance:
+            problems.append(f"RPS {rps_delta * 100:+.0f}%")
+        if p95_delta > tolerance:
+            problems.append(f"p95 {p95_delta * 100:+.0f}%")
+        if result["error_rate"] > base["error_rate"] + 0.01:
+            problems.append(f"error rate {base['error_rate'] * 100:.1f}% -> {result['error_rate'] * 100:.1f}%")
+        marker = "❌" if problems else "✅"
+        print(f"  {marker} {result['scenario']:<10} c={result['concurrency']:<4} "
+              f"RPS {rps_delta * 100:+6.1f}%   p95 {p95_delta * 100:+6.1f}%   {', '.join(problems)}")
+        if problems:
+            regressions.append({"scenario": result["scenario"], "concurrency": result["concurrency"],
+                                "problems": problems})
+    return regressions
+
+def write_json(path, results, target):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            "generated_at": datetime.now().isoformat(timespec='seconds'),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "target": target,
+            "results": results,
+        }, f, indent=2)
+
+def parse_concurrency(value):
+    return [int(v) for v in value.split(',') if v.strip()]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load test HTTP Prescient API.')
+    parser.add_argument('--url', help='Base URL server yang sedang berjalan (default: jalankan serve.py lokal)')
+    parser.add_argument('--workers', type=int, default=1, help='Jumlah worker server lokal')
+    parser.add_argument('--rate-limit', action='store_true', help='Jangan matikan rate limit di server lokal')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help=f"Dipisah koma: {', '.join(SCENARIOS)}")
+    parser.add_argument('--concurrency', type=parse_concurrency,
+                        help='Daftar concurrency untuk semua skenario (default per skenario)')
+    parser.add_argument('--duration', type=float, default=5.0, help='Detik per langkah concurrency')
+    parser.add_argument('--warmup', type=float, default=1.0, help='Detik warmup per langkah (tidak dihitung)')
+    parser.add_argument('--batch-size', type=int, default=100, help='Lead per request skenario batch')
+    parser.add_argument('--source', default=DEFAULT_SOURCE, help='CSV prospek untuk payload')
+    parser.add_argument('--output', help='Tulis hasil sebagai JSON')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='File baseline untuk perbandingan')
+    parser.add_argument('--save-baseline', action='store_true', help='Simpan hasil run ini sebagai baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Toleransi regresi RPS/p95 (0.2 = 20%%)')
+    args = parser.parse_args(argv)
+
+    scenarios = [s.strip() for s in args.scenarios.split(',') if s.strip()]
+    unknown = [s for s in scenarios if s not in DEFAULT_CONCURRENCY]
+    if unknown:
+        parser.error(f"Skenario tidak dikenal: {', '.join(unknown)}")
+    concurrency = {name: args.concurrency or DEFAULT_CONCURRENCY[name] for name in scenarios}
+
+    print("\n" + "="*60)
+    print(f"🚀 LOAD TEST ({args.url or f'serve.py lokal, {args.workers} worker'}, {args.duration:g}s per langkah)")
+    print("="*60)
+
+    if args.url:
+        target = args.url
+        results = asyncio.run(run_all(args.url, scenarios, concurrency, args))
+    else:
+        with LocalServer(args.workers, rate_limit=args.rate_limit) as server:
+            target = f"local serve.py ({args.workers} worker)"
+            results = asyncio.run(run_all(server.url, scenarios, concurrency, args))
+
+    if args.output:
+        write_json(args.output, results, target)
+        print(f"💾 Hasil ditulis ke {args.output}")
+
+    regressions = []
+    if args.save_baseline:
+        write_json(args.baseline, results, target)
+        print(f"💾 Baseline ditulis ke {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare_with_baseline(results, json.load(f), args.tolerance)
+    else:
+        print(f"\nℹ️  Baseline {args.baseline} belum ada (jalankan dengan --save-baseline)")
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} langkah lebih lambat dari baseline")
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
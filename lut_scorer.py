@@ -0,0 +1,196 @@
+"""
+Prescient - Lookup-Table Scorer
+
+Input model hanya tujuh field: empat kategori dengan sedikit nilai dan tiga
+numerik (Saldo, Campaign, duration). GradientBoosting adalah jumlah pohon
+dengan split sejajar sumbu, jadi untuk satu kombinasi kategori skornya
+konstan di setiap sel grid yang dibentuk threshold split numerik.
+
+LookupTableScorer mengompilasi grid itu sekali per model:
+
+- Untuk setiap kombinasi kategori, hanya leaf yang bisa dicapai yang
+  dipakai; threshold numeriknya menjadi sumbu grid.
+- Nilai sel dijumlahkan leaf demi leaf dengan urutan pohon yang sama seperti
+  sklearn (init + scale * value per pohon), lalu expit, jadi hasilnya
+  bit-identik dengan predict_proba. Ini dicek ulang pada sampel sel setelah
+  kompilasi.
+- Prediksi = lookup vocabulary + satu binary search per sumbu + index array.
+
+Jika total grid melebihi PRESCIENT_LUT_MAX_MB (atau struktur model tidak
+didukung), lut_for() mengembalikan None dan scoring kembali ke traversal
+pohon lewat LeadEncoder. Kategori di luar vocabulary dalam mode count juga
+di-skor lewat traversal pohon.
+"""
+
+import itertools
+import os
+import threading
+
+import numpy as np
+from scipy.special import expit
+from sklearn.ensemble import GradientBoostingClassifier
+
+from lead_encoder import UNKNOWN, encoder_for
+from tree_shap import flatten_tree
+
+LUT_MAX_BYTES = int(float(os.environ.get("PRESCIENT_LUT_MAX_MB", "64")) * 1024 * 1024)
+VERIFY_SAMPLES = 2000
+
+class LookupTableScorer:
+    """Grid skor per kombinasi kategori untuk pipeline LeadEncoder + GradientBoostingClassifier."""
+
+    def __init__(self, encoder, thresholds, tables):
+        self.encoder = encoder
+        self.classifier = encoder.classifier
+        self.thresholds = thresholds   # per kombinasi: list array threshold per kolom numerik
+        self.tables = tables           # per kombinasi: array probabilitas (sel per sumbu)
+        self.radix = [len(encoder.categories[column]) for column in encoder.categorical_columns]
+        self.nbytes = sum(table.nbytes for table in tables) + sum(t.nbytes for axes in thresholds for t in axes)
+
+    # ---------- compile ----------
+
+    @classmethod
+    def compile(cls, encoder, max_bytes=LUT_MAX_BYTES):
+        """Kompilasi grid, atau None jika model tidak didukung / grid melebihi max_bytes."""
+        classifier = encoder.classifier
+        if (max_bytes <= 0 or not isinstance(classifier, GradientBoostingClassifier)
+                or classifier.estimators_.shape[1] != 1 or not hasattr(classifier, "_raw_predict_init")):
+            return None
+
+        n_numeric = len(encoder.numeric_columns)
+        leaves = []   # (value, lower[n_features], upper[n_features]) urut pohon
+        for tree in classifier.estimators_[:, 0]:
+            for value, path in flatten_tree(tree, classifier.learning_rate):
+                lower = np.full(encoder.n_features, -np.inf)
+                upper = np.full(encoder.n_features, np.inf)
+                for feature, (low, high, _) in path.items():
+                    lower[feature], upper[feature] = low, high
+                leaves.append((value, lower, upper))
+        values = np.array([leaf[0] for leaf in leaves])
+        lowers = np.array([leaf[1] for leaf in leaves])
+        uppers = np.array([leaf[2] for leaf in leaves])
+        init_value = float(classifier._raw_predict_init(np.zeros((1, encoder.n_features)))[0, 0])
+
+        # Sumbu grid per kombinasi (cek ukuran total sebelum mengisi)
+        combos = []
+        total_bytes = 0
+        for codes in itertools.product(*[range(len(encoder.categories[c])) for c in encoder.categorical_columns]):
+            onehot = encoder.dense(np.zeros(n_numeric), codes)[0, n_numeric:]
+            reachable = np.flatnonzero(np.all(
+                (lowers[:, n_numeric:] < onehot) & (onehot <= uppers[:, n_numeric:]), axis=1))
+            axes = []
+            for i in range(n_numeric):
+                bounds = np.concatenate([lowers[reachable, i], uppers[reachable, i]])
+                axes.append(np.unique(bounds[np.isfinite(bounds)]))
+            total_bytes += 8 * int(np.prod([len(axis) + 1 for axis in axes]))
+            if total_bytes > max_bytes:
+                return None
+            combos.append((reachable, axes))
+
+        thresholds, tables = [], []
+        for reachable, axes in combos:
+            grid = np.full([len(axis) + 1 for axis in axes], init_value)
+            # Sel k pada satu sumbu = (axis[k-1], axis[k]]; leaf (lower, upper] = sel start..stop-1
+            starts = [np.where(np.isfinite(lowers[reachable, i]),
+                               np.searchsorted(axes[i], lowers[reachable, i]) + 1, 0) for i in range(n_numeric)]
+            stops = [np.where(np.isfinite(uppers[reachable, i]),
+                              np.searchsorted(axes[i], uppers[reachable, i]) + 1, len(axes[i]) + 1)
+                     for i in range(n_numeric)]
+            # Leaf satu pohon tidak beririsan, jadi setiap sel ditambah sekali per pohon, urut pohon
+            for j, leaf in enumerate(reachable):
+                grid[tuple(slice(start[j], stop[j]) for start, stop in zip(starts, stops))] += values[leaf]
+            thresholds.append(axes)
+            tables.append(expit(grid))
+
+        scorer = cls(encoder, thresholds, tables)
+        return scorer if scorer._verify() else None
+
+    def _verify(self, n_samples=VERIFY_SAMPLES, seed=0):
+        """Bandingkan dengan predict_proba pada titik acak di tengah dan di batas sel."""
+        rng = np.random.default_rng(seed)
+        encoder = self.encoder
+        combos = rng.integers(len(self.tables), size=n_samples)
+        codes = np.array(np.unravel_index(combos, self.radix)).T
+        scaled = np.empty((n_samples, len(encoder.numeric_columns)))
+        for row, combo in enumerate(combos):
+            for i, axis in enumerate(self.thresholds[combo]):
+                if not len(axis):
+                    scaled[row, i] = rng.normal()
+                elif row % 2:
+                    scaled[row, i] = axis[rng.integers(len(axis))]
+                else:
+                    scaled[row, i] = rng.uniform(axis[0] - 1, axis[-1] + 1)
+        numeric = scaled * encoder.scale + encoder.mean
+        expected = self.classifier.predict_proba(encoder.dense(numeric, codes))[:, 1]
+        return np.array_equal(self.predict_codes(numeric, codes), expected)
+
+    # ---------- predict ----------
+
+    def predict_codes(self, numeric, codes):
+        """Skor untuk numerik (n, n_numeric) dan kode kategori (n, n_categorical)."""
+        encoder = self.encoder
+        numeric = np.asarray(numeric, dtype=np.float64).reshape(-1, len(encoder.numeric_columns))
+        codes = np.asarray(codes, dtype=np.int64).reshape(-1, len(encoder.categorical_columns))
+        scores = np.empty(len(numeric))
+
+        # Kategori di luar vocabulary (mode count) tidak punya grid
+        unknown = (codes == UNKNOWN).any(axis=1)
+        if unknown.any():
+            scores[unknown] = self.classifier.predict_proba(encoder.dense(numeric[unknown], codes[unknown]))[:, 1]
+            known = ~unknown
+            numeric, codes = numeric[known], codes[known]
+        else:
+            known = slice(None)
+
+        # Sama dengan pohon sklearn: fitur di-scale lalu dibandingkan sebagai float32
+        scaled = ((numeric - encoder.mean) / encoder.scale).astype(np.float32).astype(np.float64)
+        combos = np.ravel_multi_index(codes.T, self.radix)
+        known_scores = np.empty(len(combos))
+        for combo in np.unique(combos):
+            rows = np.flatnonzero(combos == combo) if len(combos) > 1 else slice(None)
+            index = tuple(np.searchsorted(axis, scaled[rows, i]) for i, axis in enumerate(self.thresholds[combo]))
+            known_scores[rows] = self.tables[combo][index]
+        scores[known] = known_scores
+        return scores
+
+    def predict_rows(self, rows):
+        """Skor kelas positif untuk list dict lead (validasi vocabulary lewat LeadEncoder)."""
+        codes = [self.encoder.row_codes(row) for row in rows]
+        numeric = [[row[column] for column in self.encoder.numeric_columns] for row in rows]
+        return self.predict_codes(numeric, codes)
+
+    def predict_columns(self, columns):
+        """Skor kelas positif untuk dict kolom (numpy array / pd.Categorical)."""
+        codes = np.column_stack([self.encoder.column_codes(c, columns[c]) for c in self.encoder.categorical_columns])
+        numeric = np.column_stack([np.asarray(columns[c], dtype=np.float64) for c in self.encoder.numeric_columns])
+        return self.predict_codes(numeric, codes)
+
+    def stats(self):
+        return {
+            "combinations": len(self.tables),
+            "cells": int(sum(table.size for table in self.tables)),
+            "megabytes": round(self.nbytes / 1024 / 1024, 2),
+        }
+
+_SCORERS = {}
+_SCORERS_LOCK = threading.Lock()
+
+def lut_for(model, max_bytes=LUT_MAX_BYTES):
+    """LookupTableScorer untuk model (dikompilasi sekali), atau None (pakai traversal pohon)."""
+    entry = _SCORERS.get(id(model))
+    if entry is not None and entry[0] is model:
+        return entry[1]
+    with _SCORERS_LOCK:
+        entry = _SCORERS.get(id(model))
+        if entry is None or entry[0] is not model:
+            encoder = encoder_for(model)
+            entry = (model, LookupTableScorer.compile(encoder, max_bytes) if encoder is not None else None)
+            _SCORERS[id(model)] = entry
+    return entry[1]
+
+def release_lut(model):
+    """Lepaskan LookupTableScorer (dan referensi model) saat model dikeluarkan dari memori."""
+    with _SCORERS_LOCK:
+        entry = _SCORERS.get(id(model))
+        if entry is not None and entry[0] is model:
+            del _SCORERS[id(model)]
@@ -0,0 +1,329 @@
+"""
+Prescient - Outbound Mail Queue
+
+Email (reset password) tidak lagi dikirim di dalam request. Route hanya
+memasukkan pesan ke outbox lalu langsung return; worker thread di belakang
+yang mengirim:
+
+- Outbox persisten di SQLite (PRESCIENT_MAIL_QUEUE_DB), jadi pesan yang
+  belum terkirim tidak hilang saat server restart.
+- Setiap worker memegang satu koneksi SMTP yang dipakai ulang (STARTTLS +
+  login sekali per koneksi) dan mengirim beberapa pesan per batch.
+- Gagal kirim dicoba ulang dengan exponential backoff sampai MAX_ATTEMPTS,
+  setelah itu status pesan menjadi 'failed'.
+- stats() melaporkan kedalaman antrian dan latency kirim (untuk /auth/health).
+- Outbox bisa dipakai beberapa proses sekaligus (worker serve.py). Pesan yang
+  di-claim dicatat dengan claimed_by/claimed_at dan claimed_at diperbarui
+  sebelum setiap kirim; hanya claim yang berhenti diperbarui selama
+  STALE_CLAIM_SECONDS (prosesnya mati) yang dikembalikan ke antrian, jadi
+  worker yang (re)start tidak mengirim ulang pesan yang sedang dikirim
+  worker lain.
+
+Test lokal tanpa Gmail:
+    python -m smtpd -n -c DebuggingServer localhost:1025   (Python <= 3.11)
+    PRESCIENT_SMTP_HOST=localhost PRESCIENT_SMTP_PORT=1025 PRESCIENT_SMTP_STARTTLS=0 \\
+        PRESCIENT_SMTP_USER= python main.py
+"""
+
+import os
+import smtplib
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+import numpy as np
+
+MAIL_QUEUE_DB = os.environ.get("PRESCIENT_MAIL_QUEUE_DB", "mail_queue.db")
+DEFAULT_WORKERS = int(os.environ.get("PRESCIENT_SMTP_POOL", "2"))
+BATCH_SIZE = 20
+MAX_ATTEMPTS = 5
+BACKOFF_BASE_SECONDS = 2.0
+BACKOFF_MAX_SECONDS = 300.0
+IDLE_TIMEOUT_SECONDS = 60.0
+POLL_SECONDS = 5.0
+STALE_CLAIM_SECONDS = 300.0
+LATENCY_WINDOW = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    recipient       TEXT NOT NULL,
+    subject         TEXT NOT NULL,
+    html            TEXT NOT NULL,
+    status          TEXT NOT NULL DEFAULT 'pending',
+    attempts        INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    created_at      REAL NOT NULL,
+    sent_at         REAL,
+    last_error      TEXT,
+    claimed_by      TEXT,
+    claimed_at      REAL
+);
+CREATE INDEX IF NOT EXISTS ix_outbox_due ON outbox (status, next_attempt_at);
+"""
+
+class SMTPConfig:
+    """Konfigurasi server SMTP (default dari environment)."""
+
+    def __init__(self, host, port, user=None, password=None, starttls=True, sender=None, timeout=30):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.starttls = starttls
+        self.sender = sender or user or "prescient@localhost"
+        self.timeout = timeout
+
+class SMTPConnection:
+    """Satu koneksi SMTP yang dipakai ulang oleh satu worker."""
+
+    def __init__(self, config):
+        self.config = config
+        self._smtp = None
+        self._last_used = 0.0
+
+    def _connect(self):
+        config = self.config
+        smtp = smtplib.SMTP(config.host, config.port, timeout=config.timeout)
+        if config.starttls:
+            smtp.starttls()
+        if config.user:
+            smtp.login(config.user, config.password)
+        self._smtp = smtp
+
+    def send(self, message):
+        # Koneksi lama bisa sudah diputus server; coba sambung ulang sekali
+        for attempt in range(2):
+            if self._smtp is None:
+                self._connect()
+            try:
+                self._smtp.send_message(message)
+                self._last_used = time.monotonic()
+                return
+            except smtplib.SMTPServerDisconnected:
+                self._smtp = None
+                if attempt:
+                    raise
+
+    def close_if_idle(self, idle_timeout):
+        if self._smtp is not None and time.monotonic() - self._last_used > idle_timeout:
+            self.close()
+
+    def close(self):
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+        self._smtp = None
+
+class MailQueue:
+    """Outbox persisten + worker thread dengan koneksi SMTP yang di-pool."""
+
+    def __init__(self, config, path=MAIL_QUEUE_DB, workers=DEFAULT_WORKERS, batch_size=BATCH_SIZE,
+                 max_attempts=MAX_ATTEMPTS, backoff_base=BACKOFF_BASE_SECONDS):
+        self.config = config
+        self.path = path
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+
+        self._db_lock = threading.Lock()
+        self._conn = None
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads = []
+        self._start_lock = threading.Lock()
+        self._worker_id = None
+        self._send_latency = deque(maxlen=LATENCY_WINDOW)
+        self._queue_latency = deque(maxlen=LATENCY_WINDOW)
+
+    # ---------- storage ----------
+
+    def _db(self):
+        if self._conn is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            # Outbox dari versi sebelum claim per worker
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(outbox)")}
+            for column, kind in (("claimed_by", "TEXT"), ("claimed_at", "REAL")):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE outbox ADD COLUMN {column} {kind}")
+            self._conn = conn
+        return self._conn
+
+    @property
+    def worker_id(self):
+        """Id pemilik claim: unik per proses (dibuat ulang setelah fork)."""
+        if self._worker_id is None or not self._worker_id.startswith(f"{os.getpid()}-"):
+            self._worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        return self._worker_id
+
+    def enqueue(self, recipient, subject, html):
+        """Simpan pesan ke outbox dan bangunkan worker. Return id pesan."""
+        now = time.time()
+        with self._db_lock:
+            cursor = self._db().execute(
+                "INSERT INTO outbox (recipient, subject, html, next_attempt_at, created_at) VALUES (?, ?, ?, ?, ?)",
+                (recipient, subject, html, now, now),
+            )
+        self.start()
+        self._wakeup.set()
+        return cursor.lastrowid
+
+    def _claim_batch(self):
+        """Ambil sampai batch_size pesan yang sudah jatuh tempo (atomik, juga antar proses)."""
+        now = time.time()
+        with self._db_lock:
+            db = self._db()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                # Claim dari proses yang mati (claimed_at tidak diperbarui lagi) dikembalikan ke antrian
+                db.execute(
+                    "UPDATE outbox SET status = 'pending', claimed_by = NULL WHERE status = 'sending' "
+                    "AND (claimed_at IS NULL OR claimed_at < ?)",
+                    (now - STALE_CLAIM_SECONDS,),
+                )
+                rows = db.execute(
+                    "SELECT id, recipient, subject, html, attempts, created_at FROM outbox "
+                    "WHERE status = 'pending' AND next_attempt_at <= ? ORDER BY next_attempt_at LIMIT ?",
+                    (now, self.batch_size),
+                ).fetchall()
+                if rows:
+                    db.executemany(
+                        "UPDATE outbox SET status = 'sending', claimed_by = ?, claimed_at = ? WHERE id = ?",
+                        [(self.worker_id, now, row[0]) for row in rows],
+                    )
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        return rows
+
+    def _heartbeat(self, message_ids):
+        """Perbarui claimed_at pesan yang belum dikirim dari batch ini."""
+        with self._db_lock:
+            self._db().executemany(
+                "UPDATE outbox SET claimed_at = ? WHERE id = ? AND claimed_by = ?",
+                [(time.time(), message_id, self.worker_id) for message_id in message_ids],
+            )
+
+    def _mark_sent(self, message_id):
+        with self._db_lock:
+            self._db().execute(
+                "UPDATE outbox SET status = 'sent', sent_at = ?, last_error = NULL, claimed_by = NULL WHERE id = ?",
+                (time.time(), message_id))
+
+    def _mark_failed(self, message_id, attempts, error):
+        attempts += 1
+        if attempts >= self.max_attempts:
+            status, next_attempt = 'failed', time.time()
+        else:
+            delay = min(self.backoff_base * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS)
+            status, next_attempt = 'pending', time.time() + delay
+        with self._db_lock:
+            self._db().execute(
+                "UPDATE outbox SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ?, claimed_by = NULL "
+                "WHERE id = ?",
+                (status, attempts, next_attempt, str(error)[:500], message_id),
+            )
+
+    def _next_due_in(self):
+        with self._db_lock:
+            row = self._db().execute(
+                "SELECT MIN(next_attempt_at) FROM outbox WHERE status = 'pending'").fetchone()
+        if row[0] is None:
+            return POLL_SECONDS
+        return min(max(row[0] - time.time(), 0.0), POLL_SECONDS)
+
+    # ---------- worker ----------
+
+    def _build_message(self, recipient, subject, html):
+        message = MIMEMultipart("alternative")
+        message["Subject"] = subject
+        message["From"] = self.config.sender
+        message["To"] = recipient
+        message.attach(MIMEText(html, "html"))
+        return message
+
+    def _worker(self):
+        connection = SMTPConnection(self.config)
+        try:
+            while not self._stopping.is_set():
+                batch = self._claim_batch()
+                if not batch:
+                    connection.close_if_idle(IDLE_TIMEOUT_SECONDS)
+                    self._wakeup.wait(self._next_due_in())
+                    self._wakeup.clear()
+                    continue
+
+                for position, (message_id, recipient, subject, html, attempts, created_at) in enumerate(batch):
+                    self._heartbeat([row[0] for row in batch[position:]])
+                    started = time.monotonic()
+                    try:
+                        connection.send(self._build_message(recipient, subject, html))
+                    except (smtplib.SMTPException, OSError) as e:
+                        print(f"❌ Error sending email ke {recipient} (attempt {attempts + 1}): {e}")
+                        connection.close()
+                        self._mark_failed(message_id, attempts, e)
+                        continue
+                    self._send_latency.append(time.monotonic() - started)
+                    self._queue_latency.append(time.time() - created_at)
+                    self._mark_sent(message_id)
+        finally:
+            connection.close()
+
+    def start(self):
+        """Jalankan worker thread (idempotent)."""
+        with self._start_lock:
+            if self._threads or self._stopping.is_set():
+                return self
+            self._db()
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f"mail-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        return self
+
+    def stop(self, timeout=10):
+        """Hentikan worker; pesan yang belum terkirim tetap di outbox."""
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        self._stopping.clear()
+
+    # ---------- monitoring ----------
+
+    def stats(self):
+        """Jumlah pesan per status dan latency (ms): waktu SMTP dan enqueue -> terkirim."""
+        with self._db_lock:
+            counts = dict(self._db().execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall())
+        stats = {
+            "workers": self.workers,
+            "running": bool(self._threads),
+            "queue_depth": counts.get('pending', 0) + counts.get('sending', 0),
+            "pending": counts.get('pending', 0),
+            "sending": counts.get('sending', 0),
+            "sent": counts.get('sent', 0),
+            "failed": counts.get('failed', 0),
+        }
+        for name, values in (("send_ms", self._send_latency), ("enqueue_to_sent_ms", self._queue_latency)):
+            values = np.array(values) * 1000
+            if len(values):
+                p50, p95 = np.percentile(values, [50, 95])
+                stats[name] = {"p50": round(float(p50), 2), "p95": round(float(p95), 2),
+                               "max": round(float(values.max()), 2)}
+            else:
+                stats[name] = None
+        return stats
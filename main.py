@@ -5,19 +5,39 @@ FastAPI Backend Server
 Server API untuk melayani prediksi lead scoring secara real-time.
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Depends, Header, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-from pydantic import BaseModel, Field
+from fastapi.responses import FileResponse, PlainTextResponse
+from pydantic import BaseModel, Field, ValidationError
+import numpy as np
 import pandas as pd
 import joblib
 import uvicorn
-from typing import Optional
+from typing import Dict, List, Literal, Optional
+from sqlalchemy.orm import Session
 import os
+import threading
 
 # Import authentication routes
+from auth import MAIL_QUEUE, TokenData, get_current_admin, get_current_user
 from auth_routes import router as auth_router
+from columnar import ARROW_MEDIA_TYPE, FRAMED_MEDIA_TYPE, PayloadError, decode_payload, encode_payload, to_feature_frame
+from database import get_db, LeadOutcome
+from hashing_pool import HASHING_POOL
+from lead_encoder import UnknownCategory, encoder_for, release_encoder
+from lead_io import LEAD_SCHEMA, load_csv
+from lut_scorer import lut_for, release_lut
+from lead_table import TIERS, LeadTable, tier_codes
+from model_registry import ModelRegistry
+from profiling import PROFILER, ProfilingMiddleware
+from rate_limit import RATE_LIMITER, RateLimitMiddleware
+from scoring_jobs import MAX_UPLOAD_BYTES, JobLimitError, ScoringJobs
+from scoring import FEATURE_COLUMNS, RECOMMENDATIONS, encode_prediction, encode_predictions, label_for_score
+from shadow_scoring import ShadowScorer
+from shared_state import SHARED_STATE
+from tree_shap import ExplanationCache, explain_cached, explainer_for, release_explainer
 
 # ==================== PYDANTIC MODEL ====================
 
@@ -57,6 +77,55 @@ class PredictionResponse(BaseModel):
     probability_percentage: str = Field(..., description="Persentase probabilitas")
     recommendation: str = Field(..., description="Rekomendasi aksi")
 
+class ExplanationResponse(PredictionResponse):
+    """
+    Response schema untuk /predict/explain: prediksi + kontribusi TreeSHAP
+    """
+    base_value: float = Field(..., description="Nilai harapan model (log-odds)")
+    contributions: Dict[str, float] = Field(
+        ..., description="Kontribusi per field input (log-odds); base_value + jumlahnya = logit(prediction_score)"
+    )
+
+class JobSourceRequest(BaseModel):
+    """
+    Request schema untuk job scoring dari file yang sudah ada di server
+    """
+    source: str = Field(..., example="leads_2024.csv", description="Path CSV relatif terhadap PRESCIENT_JOBS_SOURCE_DIR")
+
+class OutcomeInput(BaseModel):
+    """
+    Outcome (hasil follow-up) untuk satu lead yang sudah di-skor
+    """
+    lead_id: str = Field(..., example="96", description="ID lead di dashboard")
+    lead: LeadInput = Field(..., description="Data lead yang di-skor")
+    converted: bool = Field(..., example=True, description="Apakah lead akhirnya deposit (label outcome)")
+    prediction_score: Optional[float] = Field(None, example=0.6186, description="Skor saat lead di-skor")
+    model_version: Optional[str] = Field(None, example="v2", description="Versi model yang memberi skor")
+
+class OutcomeBatch(BaseModel):
+    """
+    Request schema untuk mencatat outcome beberapa lead sekaligus
+    """
+    outcomes: List[OutcomeInput] = Field(..., min_length=1)
+
+class ModelVersionRequest(BaseModel):
+    """
+    Request schema untuk memilih versi model (default atau shadow)
+    """
+    version: str = Field(..., example="v2", description="Versi model di registry")
+
+class LeadStatusUpdate(BaseModel):
+    """
+    Request schema untuk mengubah status follow-up lead
+    """
+    status: Literal["pending", "done"] = Field(..., example="done", description="Status lead (pending/done)")
+
+class LeadScoreUpdate(BaseModel):
+    """
+    Request schema untuk mengubah skor satu lead
+    """
+    score: float = Field(..., ge=0, le=1, example=0.82, description="Skor probabilitas baru")
+
 # ==================== FASTAPI APP ====================
 
 app = FastAPI(
@@ -65,6 +134,18 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# ==================== RATE LIMITING ====================
+
+# Token bucket per IP/username (lihat rate_limit.py). Ditambahkan sebelum CORS
+# supaya response 429 tetap mendapat header CORS.
+app.add_middleware(RateLimitMiddleware, limiter=RATE_LIMITER)
+
+# ==================== PROFILING ====================
+
+# Profil per request (header X-Profile-Token) dan sampling kontinu /predict,
+# keduanya mati kecuali diaktifkan lewat env (lihat profiling.py)
+app.add_middleware(ProfilingMiddleware, profiler=PROFILER)
+
 # ==================== CORS MIDDLEWARE ====================
 
 app.add_middleware(
@@ -90,22 +171,416 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 MODEL = None
 MODEL_PATH = "prescient_model.pkl"
 
+# Model registry: beberapa versi disimpan resident di memori sekaligus,
+# sehingga routing per request dan rollback hanya memindahkan pointer.
+REGISTRY = ModelRegistry()
+MODELS = {}
+DEFAULT_VERSION = None
+RESIDENT_MODELS = int(os.environ.get("PRESCIENT_RESIDENT_MODELS", "3"))
+LEGACY_VERSION = "legacy"
+
+# Shadow scoring: model kandidat menilai salinan request di proses terpisah.
+# Satu ShadowScorer per server (di serve.py dibuat parent sebelum fork dan
+# prosesnya dijalankan parent); versinya disimpan di SharedState.
+SHADOW = None
+SHADOW_VERSION = None
+SHADOW_KEY = "shadow"
+SHADOW_STATS_KEY = "shadow_stats"
+SHADOW_PUBLISHED = None
+SHADOW_QUEUE_SIZE = int(os.environ.get("PRESCIENT_SHADOW_QUEUE", "1000"))
+SHADOW_NICE = int(os.environ.get("PRESCIENT_SHADOW_NICE", "10"))
+SHADOW_CPUS = {int(c) for c in os.environ.get("PRESCIENT_SHADOW_CPUS", "").split(",") if c.strip()}
+
+# Fast path JSON /predict: response dirakit dari potongan yang sudah di-encode,
+# tanpa validasi ulang response_model (skema OpenAPI tetap sama)
+FAST_JSON = os.environ.get("PRESCIENT_FAST_JSON", "0") == "1"
+
+# Batas jumlah lead per request /predict/batch
+MAX_BATCH_SIZE = int(os.environ.get("PRESCIENT_MAX_BATCH_SIZE", "1000"))
+
+# Batas jumlah baris per request /predict/columnar
+MAX_COLUMNAR_ROWS = int(os.environ.get("PRESCIENT_MAX_COLUMNAR_ROWS", "1000000"))
+# Batas ukuran body /predict/columnar, dicek sebelum decode (default 128 byte per baris)
+MAX_COLUMNAR_BYTES = int(float(os.environ.get("PRESCIENT_MAX_COLUMNAR_MB", MAX_COLUMNAR_ROWS * 128 / (1024 * 1024)))
+                         * 1024 * 1024)
+
+# Batas lead per request /predict/explain dan ukuran cache penjelasan (LRU)
+MAX_EXPLAIN_BATCH = int(os.environ.get("PRESCIENT_MAX_EXPLAIN_BATCH", "100"))
+EXPLANATIONS = ExplanationCache(int(os.environ.get("PRESCIENT_EXPLAIN_CACHE", "10000")))
+
+# Tabel lead kolumnar (bank-full.csv) untuk statistik dashboard
+LEADS = None
+LEADS_PATH = os.environ.get("PRESCIENT_LEADS_PATH", "bank-full.csv")
+
+# State bersama antar worker serve.py (shared_state.py): pointer model default
+# dan log perubahan LeadTable. Worker lain mengikutinya lewat listener sync().
+# serve.py mengeset PREFORK_WORKER sebelum fork; tugas sekali-per-server
+# (reset state bersama) lalu dijalankan parent, bukan setiap worker.
+PREFORK_WORKER = False
+DEFAULT_MODEL_KEY = "default_model"
+MODEL_LOADS = set()          # versi default dari worker lain yang sedang dimuat
+LEADS_APPLIED = 0            # id lead_updates terakhir yang sudah diterapkan ke LEADS
+LEADS_SYNC_LOCK = threading.Lock()
+
+def load_models():
+    """
+    Load model ke MODELS (hanya sekali per proses)
+    
+    Versi terbaru dari registry (maksimal RESIDENT_MODELS, ditambah versi
+    default) dimuat semua. Jika registry masih kosong, fallback ke MODEL_PATH.
+    serve.py memanggil ini di proses parent sebelum fork, sehingga worker
+    berbagi halaman memori model (copy-on-write) dan tidak memuat ulang.
+    """
+    global MODEL, DEFAULT_VERSION
+    
+    if MODELS:
+        return
+    
+    versions = REGISTRY.list_versions()
+    if versions:
+        default_version = REGISTRY.default_version()
+        resident = versions[-RESIDENT_MODELS:] if RESIDENT_MODELS > 0 else []
+        if default_version not in resident:
+            resident.append(default_version)
+        
+        for version in resident:
+            print(f"📦 Loading model {version} dari registry: {REGISTRY.model_path(version)}")
+            MODELS[version] = REGISTRY.load(version)
+        DEFAULT_VERSION = default_version
+    else:
+        if not os.path.exists(MODEL_PATH):
+            raise FileNotFoundError(
+                f"❌ Model file '{MODEL_PATH}' tidak ditemukan!\n"
+                "   Jalankan 'python train_model.py' terlebih dahulu untuk membuat model."
+            )
+        
+        print(f"📦 Loading model dari: {MODEL_PATH}")
+        MODELS[LEGACY_VERSION] = joblib.load(MODEL_PATH)
+        DEFAULT_VERSION = LEGACY_VERSION
+    
+    # Vocabulary + encoder dense per model (ikut dibagi copy-on-write di serve.py)
+    for version, model in MODELS.items():
+        if encoder_for(model) is None:
+            print(f"ℹ️  Model {version}: struktur pipeline tidak didukung LeadEncoder, memakai predict_proba pipeline")
+        # Flatten pohon untuk TreeSHAP dan kompilasi lookup table sekali di sini (bukan di request pertama)
+        explainer_for(model)
+        lut = lut_for(model)
+        if lut is not None:
+            print(f"⚡ Model {version}: lookup table {lut.stats()['megabytes']} MB")
+        elif encoder_for(model) is not None:
+            print(f"ℹ️  Model {version}: grid lookup table melebihi PRESCIENT_LUT_MAX_MB, memakai traversal pohon")
+    
+    MODEL = MODELS[DEFAULT_VERSION]
+    print(f"✅ Model berhasil dimuat dan siap digunakan! (default: {DEFAULT_VERSION}, resident: {list(MODELS)})")
+
 @app.on_event("startup")
 async def load_model():
     """
-    Load model saat aplikasi startup (hanya sekali)
+    Load model saat aplikasi startup (dilewati jika sudah di-preload serve.py),
+    lalu jalankan worker shadow, tabel lead dan mail queue
+    """
+    load_models()
+    if not PREFORK_WORKER:
+        init_shared_state()
+        apply_shadow_config()
+    
+    load_leads()
+    
+    # Kirim sisa email di outbox dari run sebelumnya, lanjutkan job scoring yang antri
+    MAIL_QUEUE.start()
+    JOBS.start()
+    PROFILER.start()
+
+@app.on_event("shutdown")
+async def stop_shadow_worker():
+    """
+    Hentikan worker shadow, hashing pool, mail queue, job scoring dan sampler profil saat server berhenti
+    """
+    if not PREFORK_WORKER:
+        owner_shutdown()
+    HASHING_POOL.shutdown()
+    MAIL_QUEUE.stop()
+    JOBS.stop()
+    PROFILER.stop()
+
+def init_shared_state():
+    """
+    Mulai state bersama untuk run server ini (sekali per server): pointer
+    default = hasil load_models, log perubahan lead dikosongkan (sama seperti
+    sebelumnya, perubahan lead tidak bertahan setelah server restart), versi
+    shadow dari PRESCIENT_SHADOW_VERSION, dan queue shadow dibuat
+    """
+    global SHADOW, SHADOW_VERSION
+    
+    SHARED_STATE.set(DEFAULT_MODEL_KEY, DEFAULT_VERSION)
+    SHARED_STATE.clear_lead_updates()
+    
+    shadow_version = os.environ.get("PRESCIENT_SHADOW_VERSION") or None
+    if shadow_version:
+        REGISTRY.get_metadata(shadow_version)  # KeyError jika versi tidak ada
+    SHARED_STATE.set(SHADOW_KEY, shadow_version)
+    SHARED_STATE.set(SHADOW_STATS_KEY, None)
+    SHADOW_VERSION = shadow_version
+    if SHADOW is None:
+        SHADOW = ShadowScorer(max_queue=SHADOW_QUEUE_SIZE, nice=SHADOW_NICE, cpus=SHADOW_CPUS or None)
+
+def switch_default_model(version: str):
+    """
+    Pindahkan pointer default ke versi yang sudah resident
+    """
+    global MODEL, DEFAULT_VERSION
+    
+    evict_resident_models(keep={version, DEFAULT_VERSION})
+    DEFAULT_VERSION = version
+    MODEL = MODELS[version]
+    print(f"🔀 Default model dipindah ke: {version}")
+
+def sync_default_model():
+    """
+    Listener SharedState: ikuti pointer default yang dipindah worker lain
+    
+    Versi yang belum resident dimuat di thread background; sampai selesai,
+    request tetap memakai default lama.
+    """
+    version = SHARED_STATE.get(DEFAULT_MODEL_KEY)
+    if version is None or version == DEFAULT_VERSION:
+        return
+    if version in MODELS:
+        switch_default_model(version)
+    elif version not in MODEL_LOADS:
+        MODEL_LOADS.add(version)
+        threading.Thread(target=load_shared_default, args=(version,), name=f"load-{version}", daemon=True).start()
+
+def load_shared_default(version: str):
+    try:
+        MODELS.setdefault(version, load_registry_model(version))
+    except Exception as e:
+        print(f"⚠️  Gagal memuat model default {version} dari registry: {e}")
+        return
+    finally:
+        MODEL_LOADS.discard(version)
+    if SHARED_STATE.get(DEFAULT_MODEL_KEY) == version:
+        switch_default_model(version)
+    else:
+        evict_resident_models(keep={DEFAULT_VERSION})
+
+def apply_lead_updates():
+    """
+    Listener SharedState: terapkan log lead_updates yang belum diterapkan
+    ke LEADS, urut id (update status/skor idempotent, jadi aman diulang)
+    """
+    global LEADS_APPLIED
+    
+    if LEADS is None:
+        return
+    with LEADS_SYNC_LOCK:
+        for update_id, lead_id, field, value in SHARED_STATE.lead_updates(LEADS_APPLIED):
+            try:
+                if field == "status":
+                    LEADS.update_status(lead_id, value)
+                elif field == "score":
+                    LEADS.update_score(lead_id, float(value))
+                elif field == "scores":
+                    LEADS.set_scores(np.frombuffer(value, dtype=np.float64))
+            except (KeyError, ValueError) as e:
+                print(f"⚠️  Update lead #{update_id} dilewati: {e.args[0]}")
+            LEADS_APPLIED = update_id
+
+def record_lead_update(lead_id, field, value):
+    """
+    Catat perubahan lead (yang sudah divalidasi dan diterapkan lokal) untuk
+    worker lain, lalu putar log sampai id ini supaya urutan perubahan dari
+    semua worker sama
+    """
+    update_id = SHARED_STATE.append_lead_update(lead_id, field, value)
+    if field == "scores":
+        SHARED_STATE.compact_lead_scores(update_id)
+    apply_lead_updates()
+
+def sync_shadow_version():
+    """
+    Listener SharedState: versi shadow yang diubah worker lain (menentukan
+    apakah /predict menyalin request ke queue shadow)
+    """
+    global SHADOW_VERSION
+    
+    SHADOW_VERSION = SHARED_STATE.get(SHADOW_KEY)
+
+SHARED_STATE.subscribe(sync_default_model)
+SHARED_STATE.subscribe(apply_lead_updates)
+SHARED_STATE.subscribe(sync_shadow_version)
+
+def apply_shadow_config():
+    """
+    Pemilik shadow (parent serve.py, atau proses tunggal): jalankan atau
+    hentikan worker shadow sesuai versi di SharedState
+    """
+    version = SHARED_STATE.get(SHADOW_KEY)
+    running_version = SHADOW.version if SHADOW.running() else None
+    if version == running_version:
+        return
+    if version is None:
+        SHADOW.stop()
+        print("👥 Shadow scoring dimatikan")
+        return
+    SHADOW.start(version, REGISTRY.model_path(version))
+    print(f"👥 Shadow scoring aktif untuk model {version}")
+
+def publish_shadow_stats():
+    """
+    Pemilik shadow: simpan snapshot statistik di SharedState untuk dibaca
+    worker (hanya jika berubah, supaya worker tidak sync tanpa perlu)
+    """
+    global SHADOW_PUBLISHED
+    
+    stats = SHADOW.stats() if SHADOW.version is not None else None
+    if stats != SHADOW_PUBLISHED:
+        SHARED_STATE.set(SHADOW_STATS_KEY, stats)
+        SHADOW_PUBLISHED = stats
+
+def current_shadow_stats():
     """
-    global MODEL
+    Statistik shadow dari pemiliknya: langsung di proses tunggal, snapshot
+    terakhir di worker serve.py (tertinggal maksimal satu tick parent)
+    """
+    if not PREFORK_WORKER:
+        return SHADOW.stats()
+    stats = SHARED_STATE.get(SHADOW_STATS_KEY)
+    if stats is None or stats["version"] != SHADOW_VERSION:
+        return {"version": SHADOW_VERSION, "running": False}
+    return stats
+
+def owner_tick():
+    """
+    Tugas berkala pemilik state bersama (dipanggil loop parent serve.py)
+    """
+    apply_shadow_config()
+    publish_shadow_stats()
+
+def owner_shutdown():
+    if SHADOW is not None:
+        SHADOW.stop()
+
+def start_shadow(version: str):
+    """
+    Aktifkan shadow scoring untuk version dari registry
     
-    if not os.path.exists(MODEL_PATH):
-        raise FileNotFoundError(
-            f"❌ Model file '{MODEL_PATH}' tidak ditemukan!\n"
-            "   Jalankan 'python train_model.py' terlebih dahulu untuk membuat model."
+    Di serve.py parent menjalankan workernya pada tick berikutnya.
+    """
+    global SHADOW_VERSION
+    
+    REGISTRY.get_metadata(version)  # KeyError jika versi tidak ada
+    SHARED_STATE.set(SHADOW_KEY, version)
+    SHADOW_VERSION = version
+    if not PREFORK_WORKER:
+        apply_shadow_config()
+
+def stop_shadow():
+    """
+    Matikan shadow scoring dan kembalikan statistik terakhir (None jika tidak aktif)
+    """
+    global SHADOW_VERSION
+    
+    if SHADOW_VERSION is None:
+        return None
+    final_stats = current_shadow_stats()
+    SHARED_STATE.set(SHADOW_KEY, None)
+    SHADOW_VERSION = None
+    if not PREFORK_WORKER:
+        apply_shadow_config()
+        final_stats = SHADOW.stats()
+    return final_stats
+
+def load_leads():
+    """
+    Muat data prospek ke LeadTable (kolom NumPy + aggregate incremental)
+    """
+    global LEADS, LEADS_APPLIED
+    
+    if not os.path.exists(LEADS_PATH):
+        print(f"⚠️  Data lead '{LEADS_PATH}' tidak ditemukan - /leads/stats tidak aktif")
+        return
+    try:
+        LEADS = LeadTable.from_frame(load_csv(LEADS_PATH, schema=LEAD_SCHEMA))
+    except ValueError as e:
+        print(f"⚠️  {e} - /leads/stats tidak aktif")
+        return
+    # Perubahan yang sudah dibuat worker lain sebelum worker ini (re)start
+    LEADS_APPLIED = 0
+    apply_lead_updates()
+    print(f"📋 {LEADS.count} leads dimuat dari {LEADS_PATH}")
+
+def get_leads():
+    """
+    Ambil LeadTable, 503 jika data lead belum dimuat
+    """
+    SHARED_STATE.sync()
+    if LEADS is None:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Data lead belum dimuat ({LEADS_PATH})"
         )
+    return LEADS
+
+def get_model(version: Optional[str] = None):
+    """
+    Ambil model resident untuk version (atau default)
     
-    print(f"📦 Loading model dari: {MODEL_PATH}")
-    MODEL = joblib.load(MODEL_PATH)
-    print("✅ Model berhasil dimuat dan siap digunakan!")
+    Return tuple (version, model).
+    """
+    SHARED_STATE.sync()
+    if version is None:
+        version = DEFAULT_VERSION
+    model = MODELS.get(version)
+    if model is None:
+        if version is None:
+            raise HTTPException(
+                status_code=503,
+                detail="Model belum dimuat. Silakan restart server."
+            )
+        raise HTTPException(
+            status_code=404,
+            detail=f"Model version '{version}' tidak resident. Tersedia: {', '.join(MODELS)}"
+        )
+    return version, model
+
+def fast_scorer(model):
+    """LookupTableScorer jika grid-nya muat, LeadEncoder jika pipeline didukung, atau None"""
+    return lut_for(model) or encoder_for(model)
+
+def score_rows(model, rows):
+    """
+    Skor kelas positif untuk list dict lead
+    
+    Lewat lookup table atau LeadEncoder (vocabulary lookup + matriks dense)
+    jika struktur pipeline didukung; raise UnknownCategory untuk kategori di
+    luar vocabulary.
+    """
+    scorer = fast_scorer(model)
+    if scorer is not None:
+        return scorer.predict_rows(rows)
+    return model.predict_proba(pd.DataFrame(rows, columns=FEATURE_COLUMNS))[:, 1]
+
+def score_columns(model, columns, input_df):
+    """Seperti score_rows, untuk kolom hasil decode payload kolumnar"""
+    scorer = fast_scorer(model)
+    if scorer is not None:
+        return scorer.predict_columns(columns)
+    return model.predict_proba(input_df)[:, 1]
+
+def score_job_chunk(version, df):
+    """Skor satu chunk job (dipanggil dari worker thread scoring_jobs)"""
+    model = MODELS.get(version)
+    if model is None:
+        raise ValueError(f"Model version '{version}' tidak resident")
+    columns = {c: (df[c].array if isinstance(df[c].dtype, pd.CategoricalDtype) else df[c].to_numpy()) for c in df}
+    return score_columns(model, columns, df)
+
+# Job scoring asinkron (antrian SQLite + worker thread lokal)
+JOBS = ScoringJobs(score_job_chunk)
+
+def unknown_category_error(e):
+    return HTTPException(status_code=422, detail=e.args[0])
 
 # ==================== ENDPOINTS ====================
 
@@ -128,6 +603,9 @@ async def root():
         "endpoints": {
             "dashboard": "/ (GET)",
             "predict": "/predict (POST)",
+            "models": "/models (GET)",
+            "shadow": "/models/shadow (GET/PUT/DELETE)",
+            "outcomes": "/leads/outcomes (POST)",
             "docs": "/docs",
             "health": "/health"
         }
@@ -138,55 +616,277 @@ async def health_check():
     """
     Health check endpoint
     """
+    SHARED_STATE.sync()
     model_loaded = MODEL is not None
     return {
         "status": "healthy" if model_loaded else "unhealthy",
-        "model_loaded": model_loaded
+        "model_loaded": model_loaded,
+        "default_model": DEFAULT_VERSION,
+        # Kategori di luar vocabulary per model resident (ditolak atau dihitung)
+        "unknown_categories": {
+            version: encoder.unknown_counts()
+            for version, encoder in ((v, encoder_for(m)) for v, m in MODELS.items())
+            if encoder is not None
+        },
+        "explanations": EXPLANATIONS.stats(),
+        "jobs": JOBS.stats(),
+        "profiling": PROFILER.stats(),
+        "lookup_tables": {
+            version: lut.stats() for version, lut in ((v, lut_for(m)) for v, m in MODELS.items()) if lut is not None
+        }
+    }
+
+@app.get("/models")
+async def list_models():
+    """
+    Daftar versi model di registry beserta status resident
+    """
+    SHARED_STATE.sync()
+    versions = []
+    for version in REGISTRY.list_versions():
+        metadata = REGISTRY.get_metadata(version)
+        metadata["resident"] = version in MODELS
+        versions.append(metadata)
+    return {
+        "default": DEFAULT_VERSION,
+        "resident": list(MODELS),
+        "versions": versions
+    }
+
+def require_registry_version(version: str):
+    """
+    404 jika version tidak terdaftar di registry (dicek sebelum menyentuh
+    filesystem, jadi nama versi dari request tidak pernah menjadi path)
+    """
+    if version not in REGISTRY.list_versions():
+        raise HTTPException(
+            status_code=404,
+            detail=f"Model version '{version}' tidak ada di registry"
+        )
+
+def load_registry_model(version: str):
+    """
+    Load versi dari registry dan siapkan encoder, TreeSHAP dan lookup table
+    (dipanggil di threadpool)
+    """
+    model = REGISTRY.load(version)
+    explainer_for(model)
+    lut_for(model)
+    return model
+
+def evict_resident_models(keep):
+    """
+    Buang model resident terlama di luar `keep` sampai jumlahnya kembali
+    ke RESIDENT_MODELS (versi di `keep` tidak pernah dibuang)
+    """
+    limit = max(RESIDENT_MODELS, len(keep))
+    for version in list(MODELS):
+        if len(MODELS) <= limit:
+            break
+        if version not in keep:
+            model = MODELS.pop(version)
+            release_encoder(model)
+            release_explainer(model)
+            release_lut(model)
+            print(f"♻️  Model {version} dikeluarkan dari memori (PRESCIENT_RESIDENT_MODELS={RESIDENT_MODELS})")
+
+@app.put("/models/default")
+async def set_default_model(update: ModelVersionRequest, current_user: TokenData = Depends(get_current_admin)):
+    """
+    Pindahkan pointer model default (promote/rollback), khusus admin
+    
+    Jika versi sudah resident, perpindahan tanpa biaya reload. Versi baru
+    dimuat di threadpool supaya event loop tidak terblokir. Pointer juga
+    disimpan di SharedState sehingga worker serve.py lain ikut pindah.
+    """
+    version = update.version
+    if version not in MODELS:
+        require_registry_version(version)
+        try:
+            model = await run_in_threadpool(load_registry_model, version)
+        except KeyError as e:
+            raise HTTPException(status_code=404, detail=e.args[0])
+        MODELS[version] = model
+    if version in REGISTRY.list_versions():
+        REGISTRY.set_default(version)
+    
+    switch_default_model(version)
+    SHARED_STATE.set(DEFAULT_MODEL_KEY, version)
+    return {"default": DEFAULT_VERSION, "resident": list(MODELS)}
+
+@app.get("/models/shadow")
+async def shadow_stats():
+    """
+    Statistik shadow scoring: delta skor, label flip rate, dan jumlah drop
+    """
+    SHARED_STATE.sync()
+    if SHADOW_VERSION is None:
+        return {"enabled": False}
+    return {"enabled": True, **current_shadow_stats()}
+
+@app.put("/models/shadow")
+async def set_shadow_model(update: ModelVersionRequest, current_user: TokenData = Depends(get_current_admin)):
+    """
+    Aktifkan shadow scoring untuk versi model kandidat, khusus admin
+    """
+    require_registry_version(update.version)
+    try:
+        start_shadow(update.version)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+    return {"enabled": True, **current_shadow_stats()}
+
+@app.delete("/models/shadow")
+async def disable_shadow_model(current_user: TokenData = Depends(get_current_admin)):
+    """
+    Matikan shadow scoring dan kembalikan statistik akhirnya, khusus admin
+    """
+    final_stats = stop_shadow()
+    return {"enabled": False, "final": final_stats}
+
+@app.post("/leads/outcomes", status_code=201)
+def record_outcomes(
+    batch: OutcomeBatch,
+    db: Session = Depends(get_db),
+    current_user: TokenData = Depends(get_current_user)
+):
+    """
+    Catat outcome lead yang sudah dihubungi (label untuk retraining)
+    
+    Data ini dipakai oleh retrain_incremental.py untuk menambah trees
+    pada model boosting tanpa training ulang dari nol.
+    """
+    rows = [
+        LeadOutcome(
+            lead_id=outcome.lead_id,
+            pekerjaan=outcome.lead.Pekerjaan,
+            saldo=outcome.lead.Saldo,
+            personal_loan=outcome.lead.Personal_Loan,
+            housing_loan=outcome.lead.Housing_Loan,
+            marital=outcome.lead.Marital,
+            campaign=outcome.lead.Campaign,
+            duration=outcome.lead.duration,
+            converted=outcome.converted,
+            prediction_score=outcome.prediction_score,
+            model_version=outcome.model_version
+        )
+        for outcome in batch.outcomes
+    ]
+    db.add_all(rows)
+    db.commit()
+    
+    return {
+        "success": True,
+        "recorded": len(rows),
+        "total_outcomes": db.query(LeadOutcome).count()
     }
 
+@app.get("/leads/stats")
+async def lead_stats():
+    """
+    Distribusi skor lead: jumlah/persentase Hot/Warm/Cold, mean/std/min/max
+    skor dan jumlah per status
+    
+    Dijawab dari aggregate yang dipelihara incremental (O(1), tanpa scan data).
+    """
+    return get_leads().stats()
+
+@app.put("/leads/{lead_id}/status")
+async def update_lead_status(
+    lead_id: str,
+    update: LeadStatusUpdate,
+    current_user: TokenData = Depends(get_current_user)
+):
+    """
+    Ubah status follow-up lead (pending/done)
+    """
+    leads = get_leads()
+    try:
+        leads.update_status(lead_id, update.status)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=e.args[0])
+    record_lead_update(lead_id, "status", update.status)
+    return {"success": True, "lead_id": lead_id, "status": update.status}
+
+@app.put("/leads/{lead_id}/score")
+async def update_lead_score(
+    lead_id: str,
+    update: LeadScoreUpdate,
+    current_user: TokenData = Depends(get_current_user)
+):
+    """
+    Ubah skor satu lead (misalnya hasil /predict terbaru)
+    """
+    leads = get_leads()
+    try:
+        leads.update_score(lead_id, update.score)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+    record_lead_update(lead_id, "score", repr(float(update.score)))
+    return {"success": True, "lead_id": lead_id, "label": label_for_score(update.score)}
+
+@app.post("/leads/rescore")
+def rescore_leads(
+    version: Optional[str] = Query(None, description="Versi model (default jika kosong)"),
+    current_user: TokenData = Depends(get_current_user)
+):
+    """
+    Skor ulang semua lead dengan model (satu predict_proba untuk seluruh tabel)
+    """
+    leads = get_leads()
+    model_version, model = get_model(version)
+    scores = model.predict_proba(leads.feature_frame())[:, 1].astype(np.float64)
+    leads.set_scores(scores)
+    record_lead_update(None, "scores", scores.tobytes())
+    return {"success": True, "model_version": model_version, "stats": leads.stats()}
+
 @app.post("/predict", response_model=PredictionResponse)
-async def predict_lead_score(lead: LeadInput):
+async def predict_lead_score(
+    lead: LeadInput,
+    response: Response,
+    version: Optional[str] = Query(None, description="Versi model (default jika kosong)"),
+    x_model_version: Optional[str] = Header(None, description="Alternatif untuk parameter version"),
+    current_user: TokenData = Depends(get_current_user)
+):
     """
-    Endpoint prediksi lead scoring
+    Endpoint prediksi lead scoring (butuh header Authorization: Bearer <token>)
     
     Menerima data nasabah dan mengembalikan:
     - Skor probabilitas (0-1)
     - Label kategori (Hot/Warm/Cold Lead)
     - Rekomendasi aksi
+    
+    Versi model bisa dipilih lewat query `version` atau header
+    `X-Model-Version`; versi yang dipakai dikembalikan di header yang sama.
     """
+    # Pilih model resident (404 jika versi tidak dikenal)
+    model_version, model = get_model(version or x_model_version)
+    response.headers["X-Model-Version"] = model_version
+    
     try:
-        # Validasi model sudah dimuat
-        if MODEL is None:
-            raise HTTPException(
-                status_code=503,
-                detail="Model belum dimuat. Silakan restart server."
-            )
-        
         # Convert Pydantic model ke dictionary dengan alias
         lead_data = lead.model_dump(by_alias=True)
         
-        # Convert ke Pandas DataFrame (PENTING: nama kolom harus sama dengan training)
-        input_df = pd.DataFrame([lead_data])
+        # Validasi kategori terhadap vocabulary model, lalu prediksi probabilitas
+        # class positif (deposit = yes)
+        score = float(score_rows(model, [lead_data])[0])
         
-        # Prediksi probabilitas
-        prediction_proba = MODEL.predict_proba(input_df)[0]
+        # Logika bisnis untuk labeling (threshold di scoring.py)
+        label = label_for_score(score)
+        recommendation = RECOMMENDATIONS[label]
         
-        # Ambil probabilitas untuk class positif (deposit = yes)
-        score = float(prediction_proba[1])
+        # Salin request ke model shadow (non-blocking, di-drop jika penuh)
+        if SHADOW_VERSION is not None and SHADOW_VERSION != model_version:
+            SHADOW.submit(tuple(lead_data[c] for c in FEATURE_COLUMNS), score)
         
-        # Logika bisnis untuk labeling (threshold sesuai requirement)
-        # Hot Lead: >0.75 (75%)
-        # Warm Lead: >0.45 (45%)
-        # Cold Lead: <=0.45
-        if score > 0.75:
-            label = "Hot Lead"
-            recommendation = "🔥 Call Now - Prioritas tertinggi! Hubungi segera dengan penawaran khusus."
-        elif score > 0.45:
-            label = "Warm Lead"
-            recommendation = "📞 Follow Up Soon - Pendekatan dengan informasi produk yang menarik dalam 1-2 hari."
-        else:
-            label = "Cold Lead"
-            recommendation = "📧 Nurture Campaign - Masukkan ke email campaign untuk warming up."
+        # Log prediksi (untuk monitoring)
+        print(f"✓ Prediction [{model_version}]: Score={score:.4f}, Label={label}")
+        
+        if FAST_JSON:
+            return Response(content=encode_prediction(score, label), media_type="application/json",
+                            headers={"X-Model-Version": model_version})
         
         # Format response
         response = PredictionResponse(
@@ -196,11 +896,10 @@ async def predict_lead_score(lead: LeadInput):
             recommendation=recommendation
         )
         
-        # Log prediksi (untuk monitoring)
-        print(f"✓ Prediction: Score={score:.4f}, Label={label}")
-        
         return response
     
+    except UnknownCategory as e:
+        raise unknown_category_error(e)
     except Exception as e:
         print(f"❌ Error during prediction: {str(e)}")
         raise HTTPException(
@@ -208,6 +907,438 @@ async def predict_lead_score(lead: LeadInput):
             detail=f"Error saat melakukan prediksi: {str(e)}"
         )
 
+@app.post("/predict/batch", response_model=List[PredictionResponse])
+async def predict_lead_scores_batch(
+    leads: List[LeadInput],
+    response: Response,
+    version: Optional[str] = Query(None, description="Versi model (default jika kosong)"),
+    x_model_version: Optional[str] = Header(None, description="Alternatif untuk parameter version"),
+    current_user: TokenData = Depends(get_current_user)
+):
+    """
+    Prediksi banyak lead sekaligus (satu predict_proba untuk seluruh batch)
+    
+    Maksimal PRESCIENT_MAX_BATCH_SIZE lead per request. Urutan hasil sama
+    dengan urutan input.
+    """
+    if len(leads) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch terlalu besar: {len(leads)} lead (maksimal {MAX_BATCH_SIZE})"
+        )
+    
+    model_version, model = get_model(version or x_model_version)
+    response.headers["X-Model-Version"] = model_version
+    if not leads:
+        return []
+    
+    try:
+        rows = [lead.model_dump(by_alias=True) for lead in leads]
+        scores = score_rows(model, rows)
+        
+        if FAST_JSON:
+            if SHADOW_VERSION is not None and SHADOW_VERSION != model_version:
+                for lead_data, score in zip(rows, scores.tolist()):
+                    SHADOW.submit(tuple(lead_data[c] for c in FEATURE_COLUMNS), score)
+            print(f"✓ Batch prediction [{model_version}]: {len(rows)} leads")
+            return Response(content=encode_predictions(scores.tolist()), media_type="application/json",
+                            headers={"X-Model-Version": model_version})
+        
+        results = []
+        for lead_data, score in zip(rows, scores.tolist()):
+            label = label_for_score(score)
+            results.append(PredictionResponse(
+                prediction_score=round(score, 4),
+                label=label,
+                probability_percentage=f"{score * 100:.2f}%",
+                recommendation=RECOMMENDATIONS[label]
+            ))
+            if SHADOW_VERSION is not None and SHADOW_VERSION != model_version:
+                SHADOW.submit(tuple(lead_data[c] for c in FEATURE_COLUMNS), score)
+        
+        print(f"✓ Batch prediction [{model_version}]: {len(results)} leads")
+        return results
+    
+    except UnknownCategory as e:
+        raise unknown_category_error(e)
+    except Exception as e:
+        print(f"❌ Error during batch prediction: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error saat melakukan prediksi: {str(e)}"
+        )
+
+@app.post("/predict/explain", response_model=List[ExplanationResponse])
+async def explain_lead_scores(
+    leads: List[LeadInput],
+    response: Response,
+    version: Optional[str] = Query(None, description="Versi model (default jika kosong)"),
+    x_model_version: Optional[str] = Header(None, description="Alternatif untuk parameter version"),
+    current_user: TokenData = Depends(get_current_user)
+):
+    """
+    Prediksi + kontribusi tiap field input (TreeSHAP eksak, lihat tree_shap.py)
+    
+    Kontribusi dalam log-odds: base_value + jumlah kontribusi = logit skor.
+    Kolom one-hot dijumlahkan kembali ke field kategorinya. Maksimal
+    PRESCIENT_MAX_EXPLAIN_BATCH lead per request; hasil di-cache per versi
+    model dan header X-Explain-Ms-Per-Row berisi waktu per baris yang dihitung.
+    """
+    if len(leads) > MAX_EXPLAIN_BATCH:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch terlalu besar: {len(leads)} lead (maksimal {MAX_EXPLAIN_BATCH})"
+        )
+    
+    model_version, model = get_model(version or x_model_version)
+    explainer = explainer_for(model)
+    if explainer is None:
+        raise HTTPException(
+            status_code=501,
+            detail=f"Model version '{model_version}' tidak mendukung penjelasan TreeSHAP"
+        )
+    response.headers["X-Model-Version"] = model_version
+    if not leads:
+        return []
+    
+    try:
+        rows = [lead.model_dump(by_alias=True) for lead in leads]
+        scores, contributions, seconds_per_row = await run_in_threadpool(
+            explain_cached, EXPLANATIONS, model_version, explainer, rows)
+        if seconds_per_row is not None:
+            response.headers["X-Explain-Ms-Per-Row"] = f"{seconds_per_row * 1000:.3f}"
+        
+        results = []
+        for score, contribution in zip(scores, contributions):
+            label = label_for_score(score)
+            results.append(ExplanationResponse(
+                prediction_score=round(score, 4),
+                label=label,
+                probability_percentage=f"{score * 100:.2f}%",
+                recommendation=RECOMMENDATIONS[label],
+                base_value=explainer.base_value,
+                contributions=contribution
+            ))
+        
+        print(f"✓ Explanation [{model_version}]: {len(results)} leads")
+        return results
+    
+    except UnknownCategory as e:
+        raise unknown_category_error(e)
+    except Exception as e:
+        print(f"❌ Error during explanation: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error saat menghitung penjelasan: {str(e)}"
+        )
+
+async def read_limited_body(request: Request, limit: int):
+    """
+    Baca body request, 413 jika Content-Length atau jumlah byte yang sudah
+    diterima melebihi limit (body tidak pernah dibaca utuh lebih dulu)
+    """
+    too_large = HTTPException(status_code=413, detail=f"Body terlalu besar (maksimal {limit // (1024 * 1024)} MB)")
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > limit:
+        raise too_large
+    chunks = []
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > limit:
+            raise too_large
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+@app.post(
+    "/predict/columnar",
+    response_class=Response,
+    responses={200: {
+        "content": {ARROW_MEDIA_TYPE: {}, FRAMED_MEDIA_TYPE: {}},
+        "description": "Kolom prediction_score, label dan recommendation dalam format yang sama dengan request",
+    }},
+)
+async def predict_lead_scores_columnar(
+    request: Request,
+    version: Optional[str] = Query(None, description="Versi model (default jika kosong)"),
+    x_model_version: Optional[str] = Header(None, description="Alternatif untuk parameter version"),
+    current_user: TokenData = Depends(get_current_user)
+):
+    """
+    Prediksi batch dari payload kolumnar biner (untuk job backend-to-backend)
+    
+    Body berisi kolom FEATURE_COLUMNS sebagai Arrow IPC stream
+    (`application/vnd.apache.arrow.stream`, butuh pyarrow) atau typed-array
+    framing (`application/x-prescient-columns`, lihat columnar.py). Kolom
+    di-decode tanpa copy dan tanpa validasi Pydantic per baris. Maksimal
+    PRESCIENT_MAX_COLUMNAR_ROWS baris dan PRESCIENT_MAX_COLUMNAR_MB (dicek dari
+    Content-Length dan selama body dibaca); decode berjalan di threadpool.
+    Urutan hasil sama dengan urutan input. Worker shadow tidak menerima
+    salinan request ini.
+    """
+    media_type = request.headers.get("content-type", "").split(";")[0].strip()
+    body = await read_limited_body(request, MAX_COLUMNAR_BYTES)
+    
+    try:
+        n_rows, columns = await run_in_threadpool(decode_payload, media_type, body)
+        input_df = to_feature_frame(n_rows, columns, FEATURE_COLUMNS)
+    except NotImplementedError as e:
+        raise HTTPException(status_code=415, detail=e.args[0])
+    except PayloadError as e:
+        raise HTTPException(status_code=400, detail=e.args[0])
+    
+    if n_rows > MAX_COLUMNAR_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch terlalu besar: {n_rows} baris (maksimal {MAX_COLUMNAR_ROWS})"
+        )
+    
+    model_version, model = get_model(version or x_model_version)
+    
+    try:
+        # predict_proba untuk jutaan baris dijalankan di threadpool (event loop tetap responsif)
+        scores = await run_in_threadpool(score_columns, model, columns, input_df) if n_rows else np.empty(0)
+        codes = tier_codes(scores)
+        result = {
+            "prediction_score": np.round(scores, 4),
+            "label": pd.Categorical.from_codes(codes, categories=list(TIERS)),
+            "recommendation": pd.Categorical.from_codes(codes, categories=[RECOMMENDATIONS[t] for t in TIERS]),
+        }
+        print(f"✓ Columnar prediction [{model_version}]: {n_rows} leads")
+        return Response(content=encode_payload(media_type, result), media_type=media_type,
+                        headers={"X-Model-Version": model_version})
+    
+    except UnknownCategory as e:
+        raise unknown_category_error(e)
+    except Exception as e:
+        print(f"❌ Error during columnar prediction: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error saat melakukan prediksi: {str(e)}"
+        )
+
+# ==================== SCORING JOBS ====================
+
+# Tulisan file upload digabung per blok ini (satu lompatan threadpool per blok)
+UPLOAD_WRITE_BYTES = 1024 * 1024
+
+def upload_too_large():
+    return HTTPException(
+        status_code=413,
+        detail=f"File terlalu besar (maksimal {MAX_UPLOAD_BYTES // (1024 * 1024)} MB)"
+    )
+
+async def receive_upload(request: Request):
+    """
+    Stream body CSV ke file upload job baru tanpa memblokir event loop
+    
+    Semua I/O disk (folder, tulis, hapus) jalan di threadpool. Batas
+    MAX_UPLOAD_BYTES dicek dari Content-Length sebelum menulis apa pun, lalu
+    lagi selama streaming (untuk chunked upload). Return (job_id, path).
+    """
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > MAX_UPLOAD_BYTES:
+        raise upload_too_large()
+    
+    job_id, path = await run_in_threadpool(JOBS.new_upload)
+    f = await run_in_threadpool(open, path, "wb")
+    
+    def discard():
+        f.close()
+        JOBS.discard_upload(job_id)
+    
+    try:
+        size = 0
+        pending = []
+        pending_bytes = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > MAX_UPLOAD_BYTES:
+                raise upload_too_large()
+            pending.append(chunk)
+            pending_bytes += len(chunk)
+            if pending_bytes >= UPLOAD_WRITE_BYTES:
+                await run_in_threadpool(f.write, b"".join(pending))
+                pending, pending_bytes = [], 0
+        if pending:
+            await run_in_threadpool(f.write, b"".join(pending))
+        await run_in_threadpool(f.close)
+    except Exception:
+        await run_in_threadpool(discard)
+        raise
+    except BaseException:
+        # Request dibatalkan: tidak bisa await lagi, bersihkan langsung
+        discard()
+        raise
+    return job_id, path
+
+def job_response(job):
+    """Representasi publik satu job (tanpa path file di server)"""
+    total = job["total_rows"]
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "model_version": job["model_version"],
+        "source": "upload" if job["uploaded"] else os.path.basename(job["source"]),
+        "total_rows": total,
+        "processed_rows": job["processed_rows"],
+        "progress": round(job["processed_rows"] / total, 4) if total else (1.0 if job["status"] == "done" else 0.0),
+        "cancel_requested": bool(job["cancel_requested"]),
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+        "error": job["error"],
+        "results_url": f"/jobs/{job['id']}/results",
+    }
+
+def get_job(job_id: str, username: str):
+    job = JOBS.get(job_id, username)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' tidak ditemukan")
+    return job
+
+@app.post("/jobs", status_code=202)
+async def create_scoring_job(
+    request: Request,
+    version: Optional[str] = Query(None, description="Versi model (default jika kosong)"),
+    x_model_version: Optional[str] = Header(None, description="Alternatif untuk parameter version"),
+    current_user: TokenData = Depends(get_current_user)
+):
+    """
+    Buat job scoring asinkron dan langsung return job id
+    
+    Body salah satu dari:
+    - CSV lead (`Content-Type: text/csv`), di-stream ke disk lewat threadpool
+      selama upload (maksimal PRESCIENT_JOB_MAX_UPLOAD_MB)
+    - JSON `{"source": "file.csv"}`: file di PRESCIENT_JOBS_SOURCE_DIR
+    
+    CSV harus berisi kolom FEATURE_COLUMNS. Progress lewat GET /jobs/{id},
+    hasil per halaman lewat GET /jobs/{id}/results.
+    """
+    model_version, _ = get_model(version or x_model_version)
+    media_type = request.headers.get("content-type", "").split(";")[0].strip()
+    
+    if media_type == "application/json":
+        try:
+            source = JobSourceRequest.model_validate_json(await request.body()).source
+            path = await run_in_threadpool(JOBS.resolve_source, source)
+        except ValidationError as e:
+            raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=e.args[0])
+        job_id, uploaded = None, False
+    elif media_type in ("text/csv", "application/octet-stream"):
+        job_id, path = await receive_upload(request)
+        uploaded = True
+    else:
+        raise HTTPException(
+            status_code=415,
+            detail=f"Content-Type tidak didukung: {media_type} (pakai text/csv atau application/json)"
+        )
+    
+    try:
+        job_id = await run_in_threadpool(
+            JOBS.submit, current_user.username, model_version, path, job_id=job_id, uploaded=uploaded
+        )
+    except JobLimitError as e:
+        if uploaded:
+            await run_in_threadpool(JOBS.discard_upload, job_id)
+        raise HTTPException(status_code=429, detail=e.args[0])
+    
+    print(f"✓ Job {job_id} [{model_version}] dibuat oleh {current_user.username}")
+    return job_response(await run_in_threadpool(JOBS.get, job_id))
+
+@app.get("/jobs")
+async def list_scoring_jobs(current_user: TokenData = Depends(get_current_user)):
+    """
+    Job milik user (terbaru dulu)
+    """
+    return [job_response(job) for job in JOBS.list(current_user.username)]
+
+@app.get("/jobs/{job_id}")
+async def get_scoring_job(job_id: str, current_user: TokenData = Depends(get_current_user)):
+    """
+    Status dan progress satu job
+    """
+    return job_response(get_job(job_id, current_user.username))
+
+@app.get("/jobs/{job_id}/results")
+async def get_scoring_job_results(
+    job_id: str,
+    offset: int = Query(0, ge=0, description="Baris pertama (0 = baris data pertama di CSV)"),
+    limit: int = Query(1000, ge=1, le=10000, description="Jumlah baris per halaman"),
+    current_user: TokenData = Depends(get_current_user)
+):
+    """
+    Hasil job per halaman, urut sesuai baris CSV
+    
+    Tersedia untuk baris yang sudah diproses, juga selama job berjalan.
+    """
+    job = get_job(job_id, current_user.username)
+    scores = JOBS.results(job_id, offset, limit).tolist()
+    results = []
+    for row, score in enumerate(scores, start=offset):
+        label = label_for_score(score)
+        results.append({"row": row, "prediction_score": round(score, 4), "label": label,
+                        "recommendation": RECOMMENDATIONS[label]})
+    next_offset = offset + len(scores)
+    return {
+        "job_id": job_id,
+        "status": job["status"],
+        "offset": offset,
+        "processed_rows": job["processed_rows"],
+        "next_offset": next_offset if next_offset < job["processed_rows"] or job["status"] in ("queued", "running") else None,
+        "results": results,
+    }
+
+@app.delete("/jobs/{job_id}")
+async def cancel_scoring_job(job_id: str, current_user: TokenData = Depends(get_current_user)):
+    """
+    Batalkan job (job berjalan berhenti di batas chunk berikutnya)
+    """
+    job = get_job(job_id, current_user.username)
+    if job["status"] not in ("queued", "running"):
+        raise HTTPException(status_code=409, detail=f"Job sudah {job['status']}")
+    JOBS.cancel(job_id)
+    return job_response(JOBS.get(job_id))
+
+# ==================== PROFILING ====================
+
+def require_profile_token(x_profile_token: Optional[str] = Header(None)):
+    """
+    Dependency admin untuk endpoint profil: 404 jika PRESCIENT_PROFILE_TOKEN
+    tidak diset, 403 jika token salah
+    """
+    if not PROFILER.token:
+        raise HTTPException(status_code=404, detail="Profiling tidak aktif (set PRESCIENT_PROFILE_TOKEN)")
+    if not PROFILER.check_token(x_profile_token):
+        raise HTTPException(status_code=403, detail="X-Profile-Token tidak valid")
+
+@app.get("/profiles", dependencies=[Depends(require_profile_token)])
+async def list_profiles():
+    """
+    Daftar file profil per request yang tersimpan (terbaru lebih dulu)
+    """
+    return {"profiles": PROFILER.list_profiles(), **PROFILER.stats()}
+
+@app.get("/profiles/hot", response_class=PlainTextResponse, dependencies=[Depends(require_profile_token)])
+async def hot_stacks(reset: bool = Query(False, description="Kosongkan agregasi setelah dibaca")):
+    """
+    Hot stack dari sampling kontinu (collapsed stacks, untuk flamegraph)
+    """
+    return PlainTextResponse(PROFILER.hot_stacks(reset=reset))
+
+@app.get("/profiles/{profile_id}", dependencies=[Depends(require_profile_token)])
+async def download_profile(profile_id: str):
+    """
+    Unduh file profil: .folded (collapsed stacks) atau .pstats (cProfile)
+    """
+    path = PROFILER.profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"Profil '{profile_id}' tidak ditemukan")
+    media_type = "text/plain" if profile_id.endswith(".folded") else "application/octet-stream"
+    return FileResponse(path, media_type=media_type, filename=profile_id)
+
 # ==================== RUN SERVER ====================
 
 if __name__ == "__main__":
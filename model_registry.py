@@ -0,0 +1,233 @@
+"""
+Prescient - Model Registry
+
+Registry lokal untuk artifact model yang di-version. Setiap versi disimpan
+di folder sendiri bersama metadata (feature schema, hash data training,
+metrics, waktu training, ukuran file):
+
+    models/
+      registry.json          {"default": "v2", "versions": ["v1", "v2"]}
+      v1/model.pkl
+      v1/metadata.json
+      v2/...
+
+Training script mendaftarkan model baru di sini; main.py memuat beberapa
+versi sekaligus dan rollback cukup dengan memindahkan pointer default.
+
+Usage:
+    python model_registry.py list
+    python model_registry.py register prescient_model.pkl --data bank-full.csv
+    python model_registry.py set-default v1
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime
+
+import joblib
+
+REGISTRY_DIR = os.environ.get("PRESCIENT_MODEL_REGISTRY", "models")
+MODEL_FILENAME = "model.pkl"
+METADATA_FILENAME = "metadata.json"
+INDEX_FILENAME = "registry.json"
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """SHA-256 dari isi file (dibaca per chunk)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def feature_schema(pipeline):
+    """
+    Ambil feature schema dari Pipeline (preprocessor ColumnTransformer).
+
+    Return dict berisi kolom numerik dan kategori yang dikenal encoder.
+    """
+    schema = {"numerical": [], "categorical": {}}
+    preprocessor = getattr(pipeline, "named_steps", {}).get("preprocessor")
+    if preprocessor is None or not hasattr(preprocessor, "transformers_"):
+        return schema
+
+    for name, transformer, columns in preprocessor.transformers_:
+        if name == "num":
+            schema["numerical"] = list(columns)
+        elif name == "cat" and hasattr(transformer, "categories_"):
+            schema["categorical"] = {
+                column: [str(c) for c in categories]
+                for column, categories in zip(columns, transformer.categories_)
+            }
+    return schema
+
+def check_version_name(version):
+    """
+    Validasi nama versi sebelum dipakai sebagai nama folder: KeyError jika
+    kosong, mengandung pemisah path, atau '..' (mencegah path traversal ke
+    pickle di luar registry).
+    """
+    if not isinstance(version, str) or version in ("", ".") or any(part in version for part in ("/", "\\", "..")):
+        raise KeyError(f"Nama model version '{version}' tidak valid")
+    return version
+
+class ModelRegistry:
+    """Registry berbasis folder untuk model yang di-version."""
+
+    def __init__(self, root=REGISTRY_DIR):
+        self.root = root
+
+    # ---------- index ----------
+
+    def _index_path(self):
+        return os.path.join(self.root, INDEX_FILENAME)
+
+    def _read_index(self):
+        path = self._index_path()
+        if not os.path.exists(path):
+            return {"default": None, "versions": []}
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_index(self, index):
+        os.makedirs(self.root, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".registry-", suffix=".json")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp_path, self._index_path())
+
+    def _next_version(self, index):
+        numbers = [int(v[1:]) for v in index["versions"] if v[1:].isdigit()]
+        return f"v{max(numbers, default=0) + 1}"
+
+    # ---------- queries ----------
+
+    def list_versions(self):
+        return list(self._read_index()["versions"])
+
+    def default_version(self):
+        return self._read_index()["default"]
+
+    def model_path(self, version):
+        return os.path.join(self.root, check_version_name(version), MODEL_FILENAME)
+
+    def get_metadata(self, version):
+        path = os.path.join(self.root, check_version_name(version), METADATA_FILENAME)
+        if not os.path.exists(path):
+            raise KeyError(f"Model version '{version}' tidak ada di registry")
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def load(self, version=None):
+        """Load pipeline untuk version (default jika None)."""
+        version = version or self.default_version()
+        if version is None:
+            raise KeyError("Registry belum memiliki model default")
+        self.get_metadata(version)
+        return joblib.load(self.model_path(version))
+
+    # ---------- mutations ----------
+
+    def register(self, pipeline, trainer=None, metrics=None, training_data=None,
+                 training_seconds=None, set_default=True, extra=None):
+        """
+        Simpan pipeline sebagai versi baru dan kembalikan metadata-nya.
+
+        Artifact ditulis ke folder sementara lalu di-rename, sehingga versi
+        yang setengah jadi tidak pernah terlihat oleh main.py. `extra` berisi
+        field metadata tambahan dari trainer tertentu.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        index = self._read_index()
+        version = self._next_version(index)
+
+        staging = tempfile.mkdtemp(dir=self.root, prefix=f".{version}-")
+        try:
+            model_path = os.path.join(staging, MODEL_FILENAME)
+            joblib.dump(pipeline, model_path)
+
+            data_info = None
+            if training_data:
+                data_info = {
+                    "path": training_data,
+                    "sha256": file_sha256(training_data),
+                }
+
+            metadata = {
+                "version": version,
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+                "trainer": trainer,
+                "model_class": type(getattr(pipeline, "named_steps", {}).get("classifier", pipeline)).__name__,
+                "feature_schema": feature_schema(pipeline),
+                "training_data": data_info,
+                "metrics": metrics or {},
+                "training_seconds": round(training_seconds, 3) if training_seconds is not None else None,
+                "size_bytes": os.path.getsize(model_path),
+                "sha256": file_sha256(model_path),
+            }
+            if extra:
+                metadata.update(extra)
+            with open(os.path.join(staging, METADATA_FILENAME), "w", encoding="utf-8") as f:
+                json.dump(metadata, f, indent=2)
+
+            os.replace(staging, os.path.join(self.root, version))
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        index["versions"].append(version)
+        if set_default or index["default"] is None:
+            index["default"] = version
+        self._write_index(index)
+        return metadata
+
+    def set_default(self, version):
+        """Pindahkan pointer default ke version (rollback/promote)."""
+        index = self._read_index()
+        if version not in index["versions"]:
+            raise KeyError(f"Model version '{version}' tidak ada di registry")
+        index["default"] = version
+        self._write_index(index)
+
+# ==================== CLI ====================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kelola registry model Prescient.")
+    parser.add_argument("--root", default=REGISTRY_DIR, help="Folder registry")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("list", help="Tampilkan semua versi")
+
+    register = sub.add_parser("register", help="Daftarkan file model yang sudah ada")
+    register.add_argument("path", help="File model (.pkl)")
+    register.add_argument("--data", help="CSV data training (untuk hash)")
+    register.add_argument("--trainer", help="Nama script training")
+    register.add_argument("--no-default", action="store_true", help="Jangan jadikan default")
+
+    set_default = sub.add_parser("set-default", help="Pindahkan pointer default")
+    set_default.add_argument("version")
+
+    args = parser.parse_args(argv)
+    registry = ModelRegistry(args.root)
+
+    if args.command == "list":
+        default = registry.default_version()
+        for version in registry.list_versions():
+            meta = registry.get_metadata(version)
+            marker = "*" if version == default else " "
+            print(f"{marker} {version:<5} {meta['created_at']}  {meta['model_class']:<28} "
+                  f"{meta['size_bytes'] / (1024 * 1024):6.2f} MB  metrics={meta['metrics']}")
+    elif args.command == "register":
+        pipeline = joblib.load(args.path)
+        meta = registry.register(pipeline, trainer=args.trainer, training_data=args.data,
+                                 set_default=not args.no_default)
+        print(f"✓ Registered {meta['version']} ({args.path})")
+    elif args.command == "set-default":
+        registry.set_default(args.version)
+        print(f"✓ Default model: {args.version}")
+
+if __name__ == "__main__":
+    main()
@@ -11,36 +11,29 @@ import time
 # Add parent directories to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
 
-# Simple user storage
+from rate_limit import RATE_LIMITER, client_ip_from_forwarded, retry_after_header
+from user_store import UserStore, UserExists
+
+# User storage (SQLite WAL); users.json lama dimigrasikan saat pertama dibuka
 USERS_FILE = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'users.json')
+USERS_DB = os.environ.get("PRESCIENT_USERS_DB", os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'users.db'))
 SECRET_KEY = "your-secret-key-prescient-2024"
 
-def ensure_data_dir():
-    data_dir = os.path.dirname(USERS_FILE)
-    if not os.path.exists(data_dir):
-        os.makedirs(data_dir)
+_user_store = None
 
-def load_users():
-    ensure_data_dir()
-    if not os.path.exists(USERS_FILE):
-        default_users = {
-            "eiz": {
-                "username": "eiz",
-                "email": "eiz@prescient.com",
-                "password": hash_password("iris"),
-                "is_active": True
-            }
-        }
-        save_users(default_users)
-        return default_users
-    
-    with open(USERS_FILE, 'r') as f:
-        return json.load(f)
+def default_users():
+    return [{
+        "username": "eiz",
+        "email": "eiz@prescient.com",
+        "password": hash_password("iris"),
+        "is_active": True
+    }]
 
-def save_users(users):
-    ensure_data_dir()
-    with open(USERS_FILE, 'w') as f:
-        json.dump(users, f, indent=2)
+def get_user_store():
+    global _user_store
+    if _user_store is None:
+        _user_store = UserStore(USERS_DB, legacy_json=USERS_FILE, default_users=default_users)
+    return _user_store
 
 def hash_password(password):
     salt = b'prescient-salt-2024'
@@ -68,19 +61,44 @@ def handler(event, context):
         }
     
     try:
-        data = json.loads(event['body'])
+        try:
+            data = json.loads(event['body'] or '')
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            return {
+                'statusCode': 400,
+                'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                'body': json.dumps({"detail": "Request body must be a JSON object"})
+            }
         path = event['path']
         
         if '/login' in path or '/token' in path:
-            return handle_login(data)
+            route = '/api/auth/login'
         elif '/register' in path:
-            return handle_register(data)
+            route = '/api/auth/register'
         else:
             return {
                 'statusCode': 404,
                 'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
                 'body': json.dumps({"detail": "Endpoint not found"})
             }
+        
+        # Token bucket per IP/username (berlaku per instance yang warm)
+        headers = event.get('headers') or {}
+        client_ip = headers.get('x-nf-client-connection-ip') or client_ip_from_forwarded(headers.get('x-forwarded-for'), 'unknown')
+        retry_after = RATE_LIMITER.check('POST', route, client_ip, data.get('username'))
+        if retry_after:
+            return {
+                'statusCode': 429,
+                'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*',
+                            'Retry-After': retry_after_header(retry_after)},
+                'body': json.dumps({"detail": "Terlalu banyak request. Coba lagi nanti."})
+            }
+        
+        if route == '/api/auth/login':
+            return handle_login(data)
+        return handle_register(data)
             
     except Exception as e:
         return {
@@ -100,8 +118,7 @@ def handle_login(data):
             'body': json.dumps({"detail": "Username and password required"})
         }
     
-    users = load_users()
-    user = users.get(username)
+    user = get_user_store().get_by_username(username)
     
     if not user or not verify_password(password, user['password']):
         return {
@@ -136,32 +153,16 @@ def handle_register(data):
             'body': json.dumps({"detail": "Email, username, and password required"})
         }
     
-    users = load_users()
-    
-    if username in users:
+    try:
+        get_user_store().create(username, email, hash_password(password))
+    except UserExists as e:
+        detail = "Username sudah digunakan" if e.field == 'username' else "Email sudah terdaftar"
         return {
             'statusCode': 400,
             'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-            'body': json.dumps({"detail": "Username sudah digunakan"})
+            'body': json.dumps({"detail": detail})
         }
     
-    for user in users.values():
-        if user['email'] == email:
-            return {
-                'statusCode': 400,
-                'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-                'body': json.dumps({"detail": "Email sudah terdaftar"})
-            }
-    
-    users[username] = {
-        "username": username,
-        "email": email,
-        "password": hash_password(password),
-        "is_active": True
-    }
-    
-    save_users(users)
-    
     response = {
         "success": True,
         "message": f"Akun berhasil dibuat untuk {username}!",
@@ -0,0 +1,376 @@
+"""
+Prescient - On-Demand Request Profiling
+
+Dua mode, keduanya opt-in lewat environment dan tidak melakukan apa pun
+(satu cek atribut per request) jika tidak diaktifkan:
+
+1. Profil per request. Jika PRESCIENT_PROFILE_TOKEN diset, request dengan
+   header `X-Profile-Token: <token>` (atau query `?profile=<token>`) diprofil:
+
+   - sample (default): thread sampler membaca stack semua thread yang sibuk
+     setiap PRESCIENT_PROFILE_INTERVAL_MS, termasuk threadpool (scoring
+     kolumnar/explain). Disimpan sebagai collapsed stacks (`.folded`,
+     format flamegraph.pl / speedscope / inferno).
+   - cprofile: profiler deterministik (cProfile) pada thread event loop.
+     Disimpan sebagai `.pstats` (snakeviz, flameprof, pstats).
+
+   Mode dipilih lewat header `X-Profile-Mode` atau query `profile_mode`.
+   Response mendapat header `X-Profile-Id`; file profil diambil lewat
+   GET /profiles/{id} (butuh token yang sama). Hanya satu request diprofil
+   pada satu waktu (`X-Profile-Id: busy` jika sedang ada). Token yang salah
+   diabaikan, request diproses normal tanpa profil.
+
+2. Sampling kontinu. Jika PRESCIENT_PROFILE_HZ > 0, satu thread mengambil
+   sampel stack dengan frekuensi rendah, hanya selama ada request ke path
+   PRESCIENT_PROFILE_PATHS (default /predict) yang sedang berjalan, dan
+   mengagregasi hot stack-nya (GET /profiles/hot, collapsed stacks).
+
+Sampel berisi semua thread yang tidak idle, jadi request lain yang berjalan
+bersamaan ikut terlihat. Agregasi kontinu berlaku per proses worker
+(serve.py); file profil per request ditulis ke PRESCIENT_PROFILE_DIR yang
+dipakai bersama.
+
+Environment:
+    PRESCIENT_PROFILE_TOKEN         token admin; kosong = profil per request mati
+    PRESCIENT_PROFILE_DIR           folder file profil (default profiles)
+    PRESCIENT_PROFILE_KEEP          jumlah file profil yang disimpan (default 50)
+    PRESCIENT_PROFILE_INTERVAL_MS   interval sampling per request (default 1)
+    PRESCIENT_PROFILE_HZ            frekuensi sampling kontinu; 0 = mati (default 0)
+    PRESCIENT_PROFILE_PATHS         prefix path untuk sampling kontinu, pisah koma
+"""
+
+import cProfile
+import hmac
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from urllib.parse import parse_qs
+
+PROFILE_TOKEN = os.environ.get("PRESCIENT_PROFILE_TOKEN", "")
+PROFILE_DIR = os.environ.get("PRESCIENT_PROFILE_DIR", "profiles")
+PROFILE_KEEP = int(os.environ.get("PRESCIENT_PROFILE_KEEP", "50"))
+SAMPLE_INTERVAL = float(os.environ.get("PRESCIENT_PROFILE_INTERVAL_MS", "1")) / 1000
+CONTINUOUS_HZ = float(os.environ.get("PRESCIENT_PROFILE_HZ", "0"))
+CONTINUOUS_PATHS = tuple(p.strip() for p in os.environ.get("PRESCIENT_PROFILE_PATHS", "/predict").split(",")
+                         if p.strip())
+
+MODES = {"sample": ".folded", "cprofile": ".pstats"}
+MAX_DEPTH = 128
+MAX_STACKS = 20_000
+TRUNCATED_STACK = "[stack lain]"
+ADMIN_PATH = "/profiles"   # endpoint unduh profil memakai header token yang sama, tidak ikut diprofil
+
+# Frame paling dalam dari thread yang sedang menunggu (lock, queue, event loop kosong)
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("runners.py", "run"),
+    ("base_events.py", "run_forever"),
+    ("connection.py", "_recv"),
+    ("connection.py", "_poll"),
+}
+
+# ==================== STACK SAMPLING ====================
+
+_LABELS = {}
+
+# Thread sampler kontinu tidak ikut diprofil
+SAMPLER_IDENTS = set()
+
+def frame_label(code):
+    """Nama frame untuk collapsed stack: `qualname (folder/file.py:baris)` (di-cache per code object)."""
+    label = _LABELS.get(code)
+    if label is None:
+        path = code.co_filename.replace("\\", "/").rsplit("/", 2)
+        label = f"{code.co_qualname} ({'/'.join(path[-2:])}:{code.co_firstlineno})".replace(";", ":")
+        _LABELS[code] = label
+    return label
+
+def is_idle(frame):
+    code = frame.f_code
+    return (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES
+
+def collapse(frame, thread_name):
+    """Stack dari root ke leaf, dipisah ';' dengan nama thread sebagai root."""
+    labels = []
+    while frame is not None and len(labels) < MAX_DEPTH:
+        labels.append(frame_label(frame.f_code))
+        frame = frame.f_back
+    labels.append(thread_name.replace(";", ":"))
+    return ";".join(reversed(labels))
+
+def sample_stacks(counts, exclude, max_stacks=MAX_STACKS):
+    """Tambahkan stack semua thread yang sibuk (kecuali `exclude`) ke Counter counts."""
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    for ident, frame in sys._current_frames().items():
+        if ident in exclude or is_idle(frame):
+            continue
+        stack = collapse(frame, names.get(ident, f"thread-{ident}"))
+        if stack not in counts and len(counts) >= max_stacks:
+            stack = TRUNCATED_STACK
+        counts[stack] += 1
+
+def format_collapsed(counts):
+    """Collapsed stacks (`stack jumlah` per baris), urut dari yang paling sering."""
+    return "".join(f"{stack} {count}\n" for stack, count in counts.most_common())
+
+# ==================== PER-REQUEST PROFILES ====================
+
+class SampledProfile:
+    """Sampler stack untuk satu request (thread sendiri, interval tetap)."""
+
+    mode = "sample"
+
+    def __init__(self, profile_id, interval=SAMPLE_INTERVAL):
+        self.id = profile_id
+        self.interval = interval
+        self.counts = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def _run(self):
+        exclude = {threading.get_ident()} | SAMPLER_IDENTS
+        while not self._stop.wait(self.interval):
+            sample_stacks(self.counts, exclude)
+            self.samples += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(format_collapsed(self.counts))
+
+class DeterministicProfile:
+    """cProfile pada thread event loop selama request berjalan."""
+
+    mode = "cprofile"
+
+    def __init__(self, profile_id):
+        self.id = profile_id
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+
+    def save(self, path):
+        self.profile.dump_stats(path)
+
+# ==================== PROFILER ====================
+
+class RequestProfiler:
+    """Token admin, profil per request, dan agregasi sampling kontinu."""
+
+    def __init__(self, token=PROFILE_TOKEN, directory=PROFILE_DIR, keep=PROFILE_KEEP,
+                 continuous_hz=CONTINUOUS_HZ, continuous_paths=CONTINUOUS_PATHS):
+        self.token = token.encode("utf-8")
+        self.directory = directory
+        self.keep = keep
+        self.continuous_hz = continuous_hz
+        self.continuous_paths = continuous_paths
+        self.enabled = bool(self.token) or continuous_hz > 0
+
+        self.in_flight = 0          # request yang dilacak sampling kontinu (diubah di event loop)
+        self.profiled = 0
+        self.busy = 0
+        self._profile_lock = threading.Lock()
+        self._counts = Counter()
+        self._counts_lock = threading.Lock()
+        self._samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ---------- admin ----------
+
+    def check_token(self, token):
+        """True jika token cocok dengan PRESCIENT_PROFILE_TOKEN (perbandingan constant-time)."""
+        return bool(self.token) and token is not None and hmac.compare_digest(token.encode("utf-8"), self.token)
+
+    def requested_mode(self, scope):
+        """Mode profil yang diminta request (token valid), atau None."""
+        token = mode = None
+        for name, value in scope["headers"]:
+            if name == b"x-profile-token":
+                token = value.decode("latin-1")
+            elif name == b"x-profile-mode":
+                mode = value.decode("latin-1")
+        query = scope.get("query_string", b"")
+        if token is None and b"profile=" in query:
+            params = parse_qs(query.decode("latin-1"))
+            token = params.get("profile", [None])[0]
+            mode = mode or params.get("profile_mode", [None])[0]
+        if not self.check_token(token):
+            return None
+        return mode if mode in MODES else "sample"
+
+    # ---------- per request ----------
+
+    def begin(self, mode):
+        """Mulai profil baru, atau None jika request lain sedang diprofil."""
+        if not self._profile_lock.acquire(blocking=False):
+            self.busy += 1
+            return None
+        profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        session = SampledProfile(profile_id) if mode == "sample" else DeterministicProfile(profile_id)
+        session.start()
+        return session
+
+    def finish(self, session, method, path):
+        """Hentikan profil, simpan ke PROFILE_DIR, dan buang file lama di luar PROFILE_KEEP."""
+        name = f"{session.id}{MODES[session.mode]}"
+        try:
+            session.stop()
+            os.makedirs(self.directory, exist_ok=True)
+            session.save(os.path.join(self.directory, name))
+            self.profiled += 1
+            print(f"🔬 Profil {session.mode} {method} {path} -> {name}")
+        except OSError as e:
+            # Response sudah terkirim; kegagalan menyimpan profil tidak boleh menggagalkan request
+            print(f"⚠️  Gagal menyimpan profil {name}: {e}")
+            return
+        finally:
+            self._profile_lock.release()
+        self._prune()
+
+    def _prune(self):
+        for old in self.list_profiles()[self.keep:]:
+            try:
+                os.remove(os.path.join(self.directory, old["id"]))
+            except OSError:
+                pass
+
+    def list_profiles(self):
+        """File profil yang tersimpan, terbaru lebih dulu."""
+        if not os.path.isdir(self.directory):
+            return []
+        profiles = []
+        for name in os.listdir(self.directory):
+            mode = next((m for m, suffix in MODES.items() if name.endswith(suffix)), None)
+            if mode is None:
+                continue
+            stat = os.stat(os.path.join(self.directory, name))
+            profiles.append({"id": name, "mode": mode, "bytes": stat.st_size, "created": stat.st_mtime})
+        profiles.sort(key=lambda p: p["created"], reverse=True)
+        return profiles
+
+    def profile_path(self, profile_id):
+        """Path file profil, atau None jika id tidak valid / tidak ada."""
+        if os.path.basename(profile_id) != profile_id or not profile_id.endswith(tuple(MODES.values())):
+            return None
+        path = os.path.join(self.directory, profile_id)
+        return path if os.path.isfile(path) else None
+
+    # ---------- continuous ----------
+
+    def tracks(self, path):
+        return self._thread is not None and path.startswith(self.continuous_paths)
+
+    def start(self):
+        if self.continuous_hz <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample_continuously, name="profile-continuous", daemon=True)
+        self._thread.start()
+        print(f"🔬 Sampling kontinu {self.continuous_hz:g} Hz untuk {', '.join(self.continuous_paths)}")
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        SAMPLER_IDENTS.discard(self._thread.ident)
+        self._thread = None
+
+    def _sample_continuously(self):
+        me = threading.get_ident()
+        SAMPLER_IDENTS.add(me)
+        interval = 1.0 / self.continuous_hz
+        while not self._stop.wait(interval):
+            if self.in_flight <= 0:
+                continue
+            with self._counts_lock:
+                sample_stacks(self._counts, {me})
+                self._samples += 1
+
+    def hot_stacks(self, reset=False):
+        """Collapsed stacks hasil sampling kontinu (opsional reset setelah dibaca)."""
+        with self._counts_lock:
+            text = format_collapsed(self._counts)
+            if reset:
+                self._counts.clear()
+                self._samples = 0
+        return text
+
+    def stats(self):
+        with self._counts_lock:
+            samples, stacks = self._samples, len(self._counts)
+        return {
+            "per_request": bool(self.token),
+            "profiled": self.profiled,
+            "busy": self.busy,
+            "continuous_hz": self.continuous_hz if self._thread is not None else 0,
+            "continuous_samples": samples,
+            "continuous_stacks": stacks,
+        }
+
+PROFILER = RequestProfiler()
+
+# ==================== MIDDLEWARE ====================
+
+class ProfilingMiddleware:
+    """
+    Pure ASGI middleware. Jika profiler tidak aktif, request langsung
+    diteruskan; jika aktif, hanya header yang dipindai.
+    """
+
+    def __init__(self, app, profiler=PROFILER):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        profiler = self.profiler
+        if scope["type"] != "http" or not profiler.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        tracked = profiler.tracks(scope["path"])
+        if tracked:
+            profiler.in_flight += 1
+        try:
+            mode = (profiler.requested_mode(scope)
+                    if profiler.token and not scope["path"].startswith(ADMIN_PATH) else None)
+            if mode is None:
+                await self.app(scope, receive, send)
+            else:
+                await self._profile(scope, receive, send, mode)
+        finally:
+            if tracked:
+                profiler.in_flight -= 1
+
+    async def _profile(self, scope, receive, send, mode):
+        session = self.profiler.begin(mode)
+        profile_id = (f"{session.id}{MODES[session.mode]}" if session is not None else "busy").encode("latin-1")
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message = dict(message)
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id)]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            if session is not None:
+                self.profiler.finish(session, scope["method"], scope["path"])
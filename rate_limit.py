@@ -0,0 +1,373 @@
+"""
+Prescient - Rate Limiting (token bucket)
+
+Setiap login memakan 100.000 iterasi PBKDF2, jadi satu client yang terus
+mencoba password bisa menghabiskan satu core. Limiter ini membatasi request
+per IP dan per username dengan token bucket di memori:
+
+- Aturan per route (method + path), key 'ip' atau 'username'.
+- Cek O(1): satu lookup dict + aritmatika refill.
+- Memori terbatas: bucket disimpan berurutan dari yang paling lama tidak
+  dipakai; bucket yang sudah penuh kembali (idle >= burst / rate) dibuang
+  secara bertahap setiap cek, dan jumlah bucket dibatasi MAX_KEYS.
+- Request yang ditolak mendapat 429 + Retry-After.
+
+Dipakai sebagai ASGI middleware di main.py (RateLimitMiddleware) dan
+langsung lewat RATE_LIMITER.check() di serverless handler (api/auth.py,
+netlify/functions/auth.py). Di serverless, bucket berlaku per instance
+yang sedang warm.
+
+serve.py memanggil RATE_LIMITER.use_shared_buckets() sebelum fork: bucket
+pindah ke tabel hash berukuran tetap di memori bersama (SharedTokenBuckets),
+sehingga batas berlaku untuk seluruh server, bukan dikali jumlah worker.
+
+Di belakang reverse proxy (Render, Heroku, Nginx) semua koneksi datang dari
+IP proxy, sehingga tanpa PRESCIENT_TRUST_PROXY=1 seluruh client berbagi satu
+bucket per aturan. render.yaml dan Procfile menyalakannya. IP client diambil
+dari entri X-Forwarded-For yang ditambahkan proxy kita sendiri (hitung
+PRESCIENT_PROXY_HOPS dari kanan), bukan entri pertama yang bisa dipalsukan
+client.
+
+Environment:
+    PRESCIENT_RATE_LIMIT=0      matikan limiter
+    PRESCIENT_TRUST_PROXY=1     pakai X-Forwarded-For sebagai IP client (wajib di belakang proxy)
+    PRESCIENT_PROXY_HOPS=1      jumlah proxy tepercaya di depan aplikasi
+    PRESCIENT_RATE_LIMIT_SLOTS  slot bucket per aturan di memori bersama (default 16384)
+"""
+
+import hashlib
+import json
+import math
+import mmap
+import os
+import threading
+import time
+from collections import OrderedDict
+from multiprocessing import get_context
+
+RATE_LIMIT_ENABLED = os.environ.get("PRESCIENT_RATE_LIMIT", "1") != "0"
+TRUST_PROXY = os.environ.get("PRESCIENT_TRUST_PROXY", "0") == "1"
+PROXY_HOPS = max(1, int(os.environ.get("PRESCIENT_PROXY_HOPS", "1")))
+MAX_KEYS = 100_000
+MAX_BODY_BYTES = 64 * 1024
+EVICT_PER_CHECK = 8
+SHARED_SLOTS = int(os.environ.get("PRESCIENT_RATE_LIMIT_SLOTS", "16384"))
+PROBE_SLOTS = 16
+
+# ==================== TOKEN BUCKET ====================
+
+class TokenBuckets:
+    """
+    Token bucket per key: kapasitas `burst`, diisi `rate` token per detik.
+
+    Bucket yang idle selama burst / rate detik sudah penuh lagi, jadi
+    membuangnya tidak mengubah perilaku limiter.
+    """
+
+    def __init__(self, rate, burst, max_keys=MAX_KEYS):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.max_keys = max_keys
+        self.idle_ttl = self.burst / self.rate
+        self._buckets = OrderedDict()   # key -> [tokens, last_refill]
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.limited = 0
+
+    def take(self, key, cost=1.0, now=None):
+        """Ambil `cost` token. Return 0.0 jika boleh, atau detik sampai token cukup."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._evict(now)
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = [self.burst, now]
+                self._buckets[key] = bucket
+            else:
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+                self._buckets.move_to_end(key)
+
+            if bucket[0] >= cost:
+                bucket[0] -= cost
+                self.allowed += 1
+                return 0.0
+            self.limited += 1
+            return (cost - bucket[0]) / self.rate
+
+    def _evict(self, now):
+        # Bucket paling depan adalah yang paling lama tidak dipakai
+        buckets = self._buckets
+        for _ in range(EVICT_PER_CHECK):
+            if not buckets:
+                return
+            key, bucket = next(iter(buckets.items()))
+            if now - bucket[1] < self.idle_ttl and len(buckets) < self.max_keys:
+                return
+            del buckets[key]
+
+    def __len__(self):
+        return len(self._buckets)
+
+class SharedTokenBuckets:
+    """
+    Token bucket seperti TokenBuckets, tetapi tabelnya di mmap anonim yang
+    diwarisi lewat fork, jadi semua worker serve.py berbagi bucket yang sama.
+
+    Tabel hash berukuran tetap (open addressing): key di-hash blake2b 64-bit
+    lalu dicari di PROBE_SLOTS slot berikutnya. Slot kosong atau bucket yang
+    sudah penuh kembali dipakai ulang; jika tidak ada, slot yang paling lama
+    tidak dipakai di jendela itu ditimpa (setara eviksi MAX_KEYS).
+    """
+
+    def __init__(self, rate, burst, slots=SHARED_SLOTS):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.slots = slots
+        self.idle_ttl = self.burst / self.rate
+        # [hash u64 x slots][tokens f64 x slots][last_refill f64 x slots][allowed, limited]
+        self._memory = mmap.mmap(-1, slots * 24 + 16)
+        view = memoryview(self._memory)
+        self._hashes = view[:slots * 8].cast("Q")
+        self._tokens = view[slots * 8:slots * 16].cast("d")
+        self._last = view[slots * 16:slots * 24].cast("d")
+        self._counters = view[slots * 24:].cast("q")
+        self._lock = get_context("fork").Lock()
+
+    @property
+    def allowed(self):
+        return self._counters[0]
+
+    @property
+    def limited(self):
+        return self._counters[1]
+
+    def take(self, key, cost=1.0, now=None):
+        """Ambil `cost` token. Return 0.0 jika boleh, atau detik sampai token cukup."""
+        now = time.monotonic() if now is None else now
+        digest = int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little") or 1
+        hashes, tokens, last = self._hashes, self._tokens, self._last
+        start = digest % self.slots
+        with self._lock:
+            slot = reusable = oldest = None
+            for offset in range(PROBE_SLOTS):
+                index = (start + offset) % self.slots
+                if hashes[index] == digest:
+                    slot = index
+                    break
+                if reusable is None and (hashes[index] == 0 or now - last[index] >= self.idle_ttl):
+                    reusable = index
+                if oldest is None or last[index] < last[oldest]:
+                    oldest = index
+
+            if slot is None:
+                slot = reusable if reusable is not None else oldest
+                hashes[slot] = digest
+                tokens[slot] = self.burst
+            else:
+                tokens[slot] = min(self.burst, tokens[slot] + (now - last[slot]) * self.rate)
+            last[slot] = now
+
+            if tokens[slot] >= cost:
+                tokens[slot] -= cost
+                self._counters[0] += 1
+                return 0.0
+            self._counters[1] += 1
+            return (cost - tokens[slot]) / self.rate
+
+    def __len__(self):
+        now = time.monotonic()
+        return sum(1 for index in range(self.slots)
+                   if self._hashes[index] and now - self._last[index] < self.idle_ttl)
+
+# ==================== RULES ====================
+
+class RateLimitRule:
+    """Batas untuk satu route: `rate` request per detik dengan burst `burst`."""
+
+    def __init__(self, method, path, key, rate, burst):
+        if key not in ('ip', 'username'):
+            raise ValueError(f"key rate limit tidak dikenal: {key}")
+        self.method = method
+        self.path = path
+        self.key = key
+        self.name = f"{method} {path} per {key}"
+        self.buckets = TokenBuckets(rate, burst)
+
+def per_minute(count):
+    return count / 60.0
+
+DEFAULT_RULES = [
+    # Login: PBKDF2 mahal, batasi per IP dan per username (brute force satu akun dari banyak IP)
+    RateLimitRule("POST", "/auth/token", "ip", rate=per_minute(10), burst=10),
+    RateLimitRule("POST", "/auth/token", "username", rate=per_minute(5), burst=5),
+    RateLimitRule("POST", "/auth/register", "ip", rate=per_minute(5), burst=5),
+    RateLimitRule("POST", "/auth/forgot-password", "ip", rate=per_minute(3), burst=3),
+    # Serverless auth (api/auth.py)
+    RateLimitRule("POST", "/api/auth/login", "ip", rate=per_minute(10), burst=10),
+    RateLimitRule("POST", "/api/auth/login", "username", rate=per_minute(5), burst=5),
+    RateLimitRule("POST", "/api/auth/register", "ip", rate=per_minute(5), burst=5),
+    # Scoring
+    RateLimitRule("POST", "/predict", "ip", rate=20, burst=40),
+    RateLimitRule("POST", "/predict/batch", "ip", rate=2, burst=5),
+    RateLimitRule("POST", "/predict/columnar", "ip", rate=2, burst=5),
+    RateLimitRule("POST", "/predict/explain", "ip", rate=5, burst=10),
+    RateLimitRule("POST", "/jobs", "ip", rate=per_minute(10), burst=10),
+]
+
+class RateLimiter:
+    """Kumpulan aturan; lookup aturan per (method, path) O(1)."""
+
+    def __init__(self, rules=DEFAULT_RULES, enabled=RATE_LIMIT_ENABLED):
+        self.enabled = enabled
+        self.rules = list(rules)
+        self._routes = {}
+        for rule in self.rules:
+            self._routes.setdefault((rule.method, rule.path), []).append(rule)
+
+    def rules_for(self, method, path):
+        if not self.enabled:
+            return ()
+        return self._routes.get((method, path.rstrip('/') or '/'), ())
+
+    def use_shared_buckets(self, slots=SHARED_SLOTS):
+        """Pindahkan bucket semua aturan ke memori bersama (dipanggil sebelum fork)."""
+        for rule in self.rules:
+            rule.buckets = SharedTokenBuckets(rule.buckets.rate, rule.buckets.burst, slots)
+
+    def needs_username(self, method, path):
+        return any(rule.key == 'username' for rule in self.rules_for(method, path))
+
+    def check(self, method, path, client_ip, username=None, now=None):
+        """
+        Return 0.0 jika request boleh lanjut, atau detik Retry-After.
+        Aturan username dilewati jika username tidak diketahui.
+        """
+        for rule in self.rules_for(method, path):
+            value = client_ip if rule.key == 'ip' else username
+            if not value:
+                continue
+            retry_after = rule.buckets.take(f"{rule.key}:{value}", now=now)
+            if retry_after:
+                return retry_after
+        return 0.0
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "rules": {
+                rule.name: {
+                    "rate_per_s": round(rule.buckets.rate, 4),
+                    "burst": rule.buckets.burst,
+                    "keys": len(rule.buckets),
+                    "allowed": rule.buckets.allowed,
+                    "limited": rule.buckets.limited,
+                }
+                for rule in self.rules
+            },
+        }
+
+def retry_after_header(seconds):
+    """Nilai header Retry-After (detik bulat ke atas, minimal 1)."""
+    return str(max(1, math.ceil(seconds)))
+
+def username_from_body(body):
+    """Ambil field username dari body JSON (None jika tidak ada/tidak valid)."""
+    try:
+        data = json.loads(body)
+    except (ValueError, UnicodeDecodeError):
+        return None
+    username = data.get('username') if isinstance(data, dict) else None
+    return username if isinstance(username, str) else None
+
+def client_ip_from_forwarded(forwarded_for, fallback, hops=PROXY_HOPS):
+    """
+    IP client dari X-Forwarded-For: entri ke-`hops` dari kanan (ditambahkan
+    proxy tepercaya; entri di kirinya bisa dikirim client sendiri), atau fallback.
+    """
+    entries = [entry.strip() for entry in (forwarded_for or '').split(',') if entry.strip()]
+    if not entries:
+        return fallback
+    return entries[-hops] if len(entries) >= hops else entries[0]
+
+RATE_LIMITER = RateLimiter()
+
+# ==================== ASGI MIDDLEWARE ====================
+
+class RateLimitMiddleware:
+    """
+    Pure ASGI middleware (tanpa BaseHTTPMiddleware, response tidak di-buffer).
+
+    Body hanya dibaca untuk route dengan aturan username, lalu diputar ulang
+    ke aplikasi.
+    """
+
+    def __init__(self, app, limiter=RATE_LIMITER, trust_proxy=TRUST_PROXY):
+        self.app = app
+        self.limiter = limiter
+        self.trust_proxy = trust_proxy
+
+    def client_ip(self, scope):
+        fallback = scope["client"][0] if scope.get("client") else "unknown"
+        if self.trust_proxy:
+            for name, value in scope["headers"]:
+                if name == b"x-forwarded-for":
+                    return client_ip_from_forwarded(value.decode("latin-1"), fallback)
+        return fallback
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.limiter.rules_for(scope["method"], scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        method, path = scope["method"], scope["path"]
+        username = None
+        if self.limiter.needs_username(method, path):
+            body, receive = await self._buffer_body(receive)
+            username = username_from_body(body)
+
+        retry_after = self.limiter.check(method, path, self.client_ip(scope), username)
+        if retry_after:
+            await self._reject(send, retry_after)
+            return
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    async def _buffer_body(receive):
+        """
+        Baca body sampai MAX_BODY_BYTES untuk parsing dan kembalikan receive
+        pengganti. Sisa body yang lebih besar tidak di-buffer: receive
+        pengganti memutar ulang bagian yang sudah dibaca lalu meneruskan
+        sisanya langsung dari client.
+        """
+        messages = []
+        body = b""
+        more_body = True
+        while more_body and len(body) < MAX_BODY_BYTES:
+            message = await receive()
+            messages.append(message)
+            if message["type"] != "http.request":
+                break
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+        async def replay():
+            if messages:
+                return messages.pop(0)
+            return await receive()
+
+        return body, replay
+
+    @staticmethod
+    async def _reject(send, retry_after):
+        body = json.dumps({"detail": "Terlalu banyak request. Coba lagi nanti."}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"retry-after", retry_after_header(retry_after).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
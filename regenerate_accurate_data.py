@@ -1,98 +1,186 @@
 """
 Regenerate CSV dengan prediksi AKURAT dari model
+
+Incremental: setiap baris menyimpan hash dari feature input (`feature_hash`)
+dan versi model yang memberi skor (`model_version`). Saat dijalankan ulang,
+hanya baris yang input-nya berubah atau diskor model lain yang di-rescore.
+File ditulis ke temp file di folder yang sama lalu di-rename secara atomik,
+sehingga crash di tengah jalan tidak merusak bank-full.csv.
+
+Usage:
+    python regenerate_accurate_data.py
+    python regenerate_accurate_data.py --regenerate-duration   # buat ulang kolom duration
+    python regenerate_accurate_data.py --force                 # rescore semua baris
 """
-import pandas as pd
+import argparse
+import os
 import pickle
+import tempfile
+
 import numpy as np
+import pandas as pd
 
-print("\n" + "="*70)
-print("REGENERATE DATA PROSPEK DENGAN PREDIKSI AKURAT")
-print("="*70 + "\n")
-
-# Load original CSV
-df = pd.read_csv('bank-full.csv')
-print(f"📂 Loaded {len(df)} leads from bank-full.csv")
-
-# Load trained model
-with open('prescient_model.pkl', 'rb') as f:
-    model = pickle.load(f)
-print("✓ Model loaded\n")
-
-# Generate realistic duration based on features
-np.random.seed(42)
-
-# Duration logic:
-# - High balance → longer duration
-# - Management/technician → longer duration  
-# - Low campaigns → longer duration
-df['duration'] = 100  # base duration
-
-# Boost for high balance
-df.loc[df['Saldo'] > df['Saldo'].median(), 'duration'] += 200
-
-# Boost for good jobs
-high_value_jobs = ['management', 'technician', 'admin.']
-df.loc[df['Pekerjaan'].isin(high_value_jobs), 'duration'] += 150
-
-# Reduce for high campaigns (customer fatigue)
-df.loc[df['Campaign'] > 2, 'duration'] -= 100
-
-# Random variation
-df['duration'] += np.random.randint(-50, 100, len(df))
-df['duration'] = df['duration'].clip(50, 1000)
-
-print("📊 Duration generated based on features\n")
-
-# Prepare features for prediction
-X = df[['Pekerjaan', 'Saldo', 'Personal Loan', 'Housing Loan', 'Marital', 'Campaign', 'duration']].copy()
-
-# Get model predictions
-predictions_proba = model.predict_proba(X)[:, 1]
-predictions_label = ['Hot Lead' if p > 0.75 else ('Warm Lead' if p > 0.45 else 'Cold Lead') 
-                     for p in predictions_proba]
-
-# Update DataFrame
-df['Skor Probabilitas'] = predictions_proba.round(4)
-df['Prediksi'] = predictions_label
-
-# Sort by score (descending)
-df = df.sort_values('Skor Probabilitas', ascending=False).reset_index(drop=True)
-
-# Save updated CSV
-df.to_csv('bank-full.csv', index=False)
-
-print("="*70)
-print("HASIL UPDATE")
-print("="*70 + "\n")
-
-# New distribution
-hot = len(df[df['Skor Probabilitas'] > 0.75])
-warm = len(df[(df['Skor Probabilitas'] > 0.45) & (df['Skor Probabilitas'] <= 0.75)])
-cold = len(df[df['Skor Probabilitas'] <= 0.45])
-
-print("🎯 NEW Distribution:")
-print(f"   • Hot Lead (>0.75): {hot} leads ({hot/len(df)*100:.1f}%)")
-print(f"   • Warm Lead (0.45-0.75): {warm} leads ({warm/len(df)*100:.1f}%)")
-print(f"   • Cold Lead (≤0.45): {cold} leads ({cold/len(df)*100:.1f}%)\n")
-
-print("📈 Score Statistics:")
-print(f"   Mean: {df['Skor Probabilitas'].mean():.4f}")
-print(f"   Std:  {df['Skor Probabilitas'].std():.4f}")
-print(f"   Min:  {df['Skor Probabilitas'].min():.4f}")
-print(f"   Max:  {df['Skor Probabilitas'].max():.4f}\n")
-
-# Sample top 10
-print("="*70)
-print("TOP 10 HOT LEADS")
-print("="*70 + "\n")
-top10 = df.head(10)[['ID', 'Nama', 'Pekerjaan', 'Saldo', 'duration', 'Skor Probabilitas', 'Prediksi']]
-print(top10.to_string(index=False))
-
-print("\n" + "="*70)
-print("✅ FILE UPDATED: bank-full.csv")
-print("="*70)
-print("\nPrediksi sekarang AKURAT berdasarkan:")
-print("1. Duration (92% weight)")
-print("2. Balance/Saldo (78% weight)")  
-print("3. Job/Pekerjaan (65% weight)")
-print("4. Campaign count, loans, marital status\n")
+from lead_io import LEAD_SCHEMA, load_csv
+from lead_table import tier_counts
+from model_registry import ModelRegistry, file_sha256
+from scoring import (FEATURE_COLUMNS, HOT_THRESHOLD, WARM_THRESHOLD,
+                     HOT_LEAD, WARM_LEAD, COLD_LEAD)
+
+DATA_PATH = 'bank-full.csv'
+LEGACY_MODEL_PATH = 'prescient_model.pkl'
+
+def load_current_model():
+    """
+    Model default dari registry beserta versinya; fallback ke
+    prescient_model.pkl dengan versi berbasis hash file.
+    """
+    registry = ModelRegistry()
+    version = registry.default_version()
+    if version is not None:
+        return registry.load(version), version
+
+    with open(LEGACY_MODEL_PATH, 'rb') as f:
+        model = pickle.load(f)
+    return model, f"legacy-{file_sha256(LEGACY_MODEL_PATH)[:12]}"
+
+def generate_duration(df):
+    """
+    Generate realistic duration based on features
+
+    Duration logic:
+    - High balance → longer duration
+    - Management/technician → longer duration
+    - Low campaigns → longer duration
+    """
+    np.random.seed(42)
+    duration = pd.Series(100, index=df.index)  # base duration
+
+    # Boost for high balance
+    duration[df['Saldo'] > df['Saldo'].median()] += 200
+
+    # Boost for good jobs
+    high_value_jobs = ['management', 'technician', 'admin.']
+    duration[df['Pekerjaan'].isin(high_value_jobs)] += 150
+
+    # Reduce for high campaigns (customer fatigue)
+    duration[df['Campaign'] > 2] -= 100
+
+    # Random variation
+    duration += np.random.randint(-50, 100, len(df))
+    return duration.clip(50, 1000)
+
+def feature_hashes(X):
+    """Hash 64-bit (hex) per baris dari kolom feature input."""
+    # Integer dinaikkan ke int64 supaya hash tidak bergantung lebar dtype skema
+    X = X.astype({column: 'int64' for column in X.select_dtypes('integer').columns})
+    return pd.util.hash_pandas_object(X, index=False).map('{:016x}'.format)
+
+def write_csv_atomic(df, path):
+    """Tulis CSV ke temp file di folder yang sama lalu rename (atomik)."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.bank-full-', suffix='.csv')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+            df.to_csv(f, index=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Rescore bank-full.csv secara incremental.')
+    parser.add_argument('--regenerate-duration', action='store_true',
+                        help='Buat ulang kolom duration dari features (mengubah input semua baris)')
+    parser.add_argument('--force', action='store_true', help='Rescore semua baris')
+    parser.add_argument('--data', default=DATA_PATH, help='CSV prospek (default: bank-full.csv)')
+    args = parser.parse_args(argv)
+
+    print("\n" + "="*70)
+    print("REGENERATE DATA PROSPEK DENGAN PREDIKSI AKURAT")
+    print("="*70 + "\n")
+
+    # Load original CSV
+    df = load_csv(args.data, schema=LEAD_SCHEMA)
+    print(f"📂 Loaded {len(df)} leads from {args.data}")
+
+    # Load trained model
+    model, model_version = load_current_model()
+    print(f"✓ Model loaded (version: {model_version})\n")
+
+    if args.regenerate_duration or 'duration' not in df.columns:
+        df['duration'] = generate_duration(df)
+        print("📊 Duration generated based on features\n")
+
+    # Tentukan baris yang perlu di-rescore
+    X = df[FEATURE_COLUMNS]
+    hashes = feature_hashes(X)
+    if args.force or 'feature_hash' not in df.columns or 'model_version' not in df.columns:
+        stale = pd.Series(True, index=df.index)
+    else:
+        stale = ((df['feature_hash'].astype(str) != hashes)
+                 | (df['model_version'].astype(str) != model_version)
+                 | df['Skor Probabilitas'].isna())
+
+    rescored = int(stale.sum())
+    skipped = len(df) - rescored
+
+    if rescored:
+        # Get model predictions (hanya untuk baris yang berubah)
+        predictions_proba = model.predict_proba(X[stale])[:, 1]
+        df.loc[stale, 'Skor Probabilitas'] = predictions_proba.round(4)
+        df.loc[stale, 'Prediksi'] = np.select(
+            [predictions_proba > HOT_THRESHOLD, predictions_proba > WARM_THRESHOLD],
+            [HOT_LEAD, WARM_LEAD], COLD_LEAD)
+    df['feature_hash'] = hashes
+    df['model_version'] = model_version
+
+    # Sort by score (descending, stabil supaya urutan tidak berubah tanpa alasan)
+    df = df.sort_values('Skor Probabilitas', ascending=False, kind='mergesort').reset_index(drop=True)
+
+    # Save updated CSV (atomik)
+    write_csv_atomic(df, args.data)
+
+    print("="*70)
+    print("HASIL UPDATE")
+    print("="*70 + "\n")
+
+    print(f"♻️  Rescored: {rescored} rows")
+    print(f"⏭️  Skipped (tidak berubah): {skipped} rows\n")
+
+    # New distribution
+    scores = df['Skor Probabilitas'].to_numpy()
+    counts = tier_counts(scores)
+    hot, warm, cold = counts[HOT_LEAD], counts[WARM_LEAD], counts[COLD_LEAD]
+
+    print("🎯 NEW Distribution:")
+    print(f"   • Hot Lead (>0.75): {hot} leads ({hot/len(df)*100:.1f}%)")
+    print(f"   • Warm Lead (0.45-0.75): {warm} leads ({warm/len(df)*100:.1f}%)")
+    print(f"   • Cold Lead (≤0.45): {cold} leads ({cold/len(df)*100:.1f}%)\n")
+
+    print("📈 Score Statistics:")
+    print(f"   Mean: {scores.mean():.4f}")
+    print(f"   Std:  {scores.std(ddof=1):.4f}")
+    print(f"   Min:  {scores.min():.4f}")
+    print(f"   Max:  {scores.max():.4f}\n")
+
+    # Sample top 10
+    print("="*70)
+    print("TOP 10 HOT LEADS")
+    print("="*70 + "\n")
+    top10 = df.head(10)[['ID', 'Nama', 'Pekerjaan', 'Saldo', 'duration', 'Skor Probabilitas', 'Prediksi']]
+    print(top10.to_string(index=False))
+
+    print("\n" + "="*70)
+    print(f"✅ FILE UPDATED: {args.data}")
+    print("="*70)
+    print("\nPrediksi sekarang AKURAT berdasarkan:")
+    print("1. Duration (92% weight)")
+    print("2. Balance/Saldo (78% weight)")
+    print("3. Job/Pekerjaan (65% weight)")
+    print("4. Campaign count, loans, marital status\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Prescient - Predictive Lead Scoring
+Incremental Warm-Start Retraining
+
+Menambah trees pada model GradientBoosting yang sudah ada memakai outcome
+lead yang dicatat dashboard lewat POST /leads/outcomes, tanpa membangun
+ulang 300 trees dari nol.
+
+Langkah:
+1. Ambil model base dari registry (default, atau --base)
+2. Ambil outcome baru dari database (setelah outcome terakhir yang dipakai base)
+3. Sisihkan --holdout outcome baru (stratified) sebagai validasi; accuracy
+   sebelum/sesudah dihitung di sini, bukan pada data yang di-fit
+4. Warm-start: preprocessor tetap, classifier ditambah --add-trees trees
+   pada sisa outcome
+5. (Opsional) --compare-full: training penuh pada data + outcome, untuk
+   membandingkan wall-clock time
+6. Register sebagai versi baru (default hanya jika --promote)
+
+Usage:
+    python retrain_incremental.py --add-trees 20
+    python retrain_incremental.py --add-trees 20 --compare-full --promote
+"""
+
+import argparse
+import copy
+import time
+import warnings
+
+import pandas as pd
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+
+from database import SessionLocal, LeadOutcome, init_db
+from lead_io import LEAD_SCHEMA, load_csv
+from model_registry import ModelRegistry
+from scoring import FEATURE_COLUMNS
+
+warnings.filterwarnings('ignore')
+
+def load_outcomes(after_id=0):
+    """
+    Ambil outcome dengan id > after_id sebagai (X, y, last_id)
+    """
+    init_db()
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(LeadOutcome)
+            .filter(LeadOutcome.id > after_id)
+            .order_by(LeadOutcome.id)
+            .all()
+        )
+    finally:
+        db.close()
+
+    X = pd.DataFrame(
+        [[r.pekerjaan, r.saldo, r.personal_loan, r.housing_loan, r.marital, r.campaign, r.duration]
+         for r in rows],
+        columns=FEATURE_COLUMNS,
+    )
+    y = pd.Series([int(r.converted) for r in rows], name='target')
+    last_id = rows[-1].id if rows else after_id
+    return X, y, last_id
+
+def split_holdout(X, y, fraction, seed=42):
+    """
+    (X_train, X_holdout, y_train, y_holdout); stratified jika setiap kelas
+    punya minimal 2 outcome
+    """
+    stratify = y if y.value_counts().min() >= 2 else None
+    return train_test_split(X, y, test_size=fraction, random_state=seed, stratify=stratify)
+
+def warm_start_retrain(base_pipeline, X_new, y_new, add_trees):
+    """
+    Tambah `add_trees` boosting stages pada salinan model base.
+
+    Preprocessor tidak di-fit ulang supaya feature space tetap sama dengan
+    trees yang sudah ada; hanya classifier yang melanjutkan boosting dari
+    raw prediction model lama pada data baru.
+    """
+    preprocessor = base_pipeline.named_steps['preprocessor']
+    classifier = copy.deepcopy(base_pipeline.named_steps['classifier'])
+    if not hasattr(classifier, 'n_estimators_'):
+        raise ValueError("Model base bukan boosting model yang mendukung warm start")
+
+    classifier.set_params(warm_start=True, n_estimators=classifier.n_estimators_ + add_trees)
+    classifier.fit(preprocessor.transform(X_new), y_new)
+    classifier.set_params(warm_start=False)
+
+    return Pipeline([('preprocessor', preprocessor), ('classifier', classifier)])
+
+def full_retrain(X_new, y_new, data_path):
+    """
+    Training penuh dari nol (seperti train_gradient_model.py) pada data
+    training asli ditambah outcome baru. Hanya dipakai untuk perbandingan.
+    """
+    import train_gradient_model
+
+    X_base, y_base = train_gradient_model.prepare_target(load_csv(data_path, schema=LEAD_SCHEMA))
+    X = pd.concat([X_base, X_new], ignore_index=True)
+    y = pd.concat([y_base, y_new], ignore_index=True)
+
+    pipeline = Pipeline([
+        ('preprocessor', train_gradient_model.create_preprocessing_pipeline()),
+        ('classifier', train_gradient_model.create_classifier())
+    ])
+    pipeline.fit(X, y)
+    return pipeline
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Warm-start retraining dari outcome dashboard.')
+    parser.add_argument('--base', help='Versi model base (default: model default registry)')
+    parser.add_argument('--add-trees', type=int, default=20, help='Jumlah trees yang ditambahkan')
+    parser.add_argument('--min-outcomes', type=int, default=20, help='Minimal outcome baru untuk retrain')
+    parser.add_argument('--holdout', type=float, default=0.25,
+                        help='Proporsi outcome baru untuk validasi (tidak dipakai training)')
+    parser.add_argument('--compare-full', action='store_true',
+                        help='Jalankan juga training penuh untuk perbandingan waktu')
+    parser.add_argument('--data', default='bank-full.csv', help='Data training asli (untuk --compare-full)')
+    parser.add_argument('--promote', action='store_true', help='Jadikan versi baru sebagai default')
+    args = parser.parse_args(argv)
+
+    print("\n" + "="*60)
+    print("PRESCIENT - INCREMENTAL RETRAINING (WARM START)")
+    print("="*60 + "\n")
+
+    registry = ModelRegistry()
+    base_version = args.base or registry.default_version()
+    if base_version is None:
+        print("❌ Registry kosong. Jalankan train_gradient_model.py terlebih dahulu.")
+        return 1
+
+    base_meta = registry.get_metadata(base_version)
+    base_pipeline = registry.load(base_version)
+    after_id = (base_meta.get('incremental') or {}).get('last_outcome_id', 0)
+    print(f"📦 Base model: {base_version} ({base_pipeline.named_steps['classifier'].n_estimators_} trees)")
+
+    X_new, y_new, last_id = load_outcomes(after_id)
+    print(f"📥 Outcome baru: {len(X_new)} (id > {after_id})")
+    if len(X_new) < args.min_outcomes:
+        print(f"⚠️  Kurang dari {args.min_outcomes} outcome baru - retraining dilewati.")
+        return 0
+    if y_new.nunique() < 2:
+        print("⚠️  Outcome baru hanya berisi satu kelas - retraining dilewati.")
+        return 0
+
+    X_train, X_holdout, y_train, y_holdout = split_holdout(X_new, y_new, args.holdout)
+    if y_train.nunique() < 2:
+        print("⚠️  Outcome training hanya berisi satu kelas setelah holdout - retraining dilewati.")
+        return 0
+    print(f"✂️  Training: {len(X_train)} outcome, holdout validasi: {len(X_holdout)} outcome")
+
+    before = accuracy_score(y_holdout, base_pipeline.predict(X_holdout))
+
+    print(f"\n🚀 Warm start: menambah {args.add_trees} trees...")
+    start = time.perf_counter()
+    pipeline = warm_start_retrain(base_pipeline, X_train, y_train, args.add_trees)
+    incremental_seconds = time.perf_counter() - start
+    after = accuracy_score(y_holdout, pipeline.predict(X_holdout))
+    print(f"✓ Selesai dalam {incremental_seconds:.2f}s")
+    print(f"   Accuracy pada holdout (tidak dipakai training): {before:.4f} -> {after:.4f}")
+
+    metrics = {
+        'holdout_accuracy_before': round(float(before), 4),
+        'holdout_accuracy_after': round(float(after), 4),
+        'holdout_outcomes': len(X_holdout),
+        'incremental_seconds': round(incremental_seconds, 3),
+    }
+
+    if args.compare_full:
+        print("\n🐢 Full retrain untuk perbandingan...")
+        start = time.perf_counter()
+        full_retrain(X_train, y_train, args.data)
+        full_seconds = time.perf_counter() - start
+        metrics['full_retrain_seconds'] = round(full_seconds, 3)
+        metrics['speedup'] = round(full_seconds / incremental_seconds, 1)
+        print(f"✓ Full retrain: {full_seconds:.2f}s (warm start {metrics['speedup']}x lebih cepat)")
+
+    metadata = registry.register(
+        pipeline,
+        trainer='retrain_incremental.py',
+        metrics=metrics,
+        training_seconds=incremental_seconds,
+        set_default=args.promote,
+        # Catat outcome terakhir supaya retrain berikutnya hanya memakai data baru
+        extra={'incremental': {
+            'base_version': base_version,
+            'added_trees': args.add_trees,
+            'outcomes': len(X_train),
+            'last_outcome_id': last_id,
+        }},
+    )
+
+    print("\n" + "="*60)
+    print(f"✅ Registered {metadata['version']} "
+          f"({'default' if args.promote else 'belum default - coba via /models/shadow'})")
+    print("="*60 + "\n")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
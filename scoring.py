@@ -0,0 +1,64 @@
+"""
+Prescient - Scoring Helpers
+
+Logika bisnis labeling lead yang dipakai bersama oleh main.py dan
+worker shadow scoring, supaya threshold Hot/Warm/Cold hanya didefinisikan
+di satu tempat.
+"""
+
+import json
+
+# Kolom input model (PENTING: nama dan urutan harus sama dengan training)
+FEATURE_COLUMNS = ['Pekerjaan', 'Saldo', 'Personal Loan', 'Housing Loan',
+                   'Marital', 'Campaign', 'duration']
+
+# Logika bisnis untuk labeling (threshold sesuai requirement)
+# Hot Lead: >0.75 (75%)
+# Warm Lead: >0.45 (45%)
+# Cold Lead: <=0.45
+HOT_THRESHOLD = 0.75
+WARM_THRESHOLD = 0.45
+
+HOT_LEAD = "Hot Lead"
+WARM_LEAD = "Warm Lead"
+COLD_LEAD = "Cold Lead"
+
+RECOMMENDATIONS = {
+    HOT_LEAD: "🔥 Call Now - Prioritas tertinggi! Hubungi segera dengan penawaran khusus.",
+    WARM_LEAD: "📞 Follow Up Soon - Pendekatan dengan informasi produk yang menarik dalam 1-2 hari.",
+    COLD_LEAD: "📧 Nurture Campaign - Masukkan ke email campaign untuk warming up.",
+}
+
+def label_for_score(score):
+    """Label kategori (Hot/Warm/Cold Lead) untuk skor probabilitas."""
+    if score > HOT_THRESHOLD:
+        return HOT_LEAD
+    if score > WARM_THRESHOLD:
+        return WARM_LEAD
+    return COLD_LEAD
+
+# Response /predict yang sudah di-encode sebagian (fast path PRESCIENT_FAST_JSON).
+# Label dan rekomendasi di-encode sekali; per request hanya skor dan persentase
+# yang diformat. Hasilnya byte-identik dengan JSONResponse FastAPI
+# (ensure_ascii=False, separators=(",", ":")).
+
+def _encode(value):
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+_RESPONSE_PARTS = {
+    label: (
+        b',"label":' + _encode(label) + b',"probability_percentage":"',
+        b'%","recommendation":' + _encode(recommendation) + b'}',
+    )
+    for label, recommendation in RECOMMENDATIONS.items()
+}
+
+def encode_prediction(score, label=None):
+    """JSON PredictionResponse untuk satu skor (bytes)."""
+    middle, tail = _RESPONSE_PARTS[label or label_for_score(score)]
+    return (b'{"prediction_score":' + repr(round(score, 4)).encode("ascii") + middle
+            + f"{score * 100:.2f}".encode("ascii") + tail)
+
+def encode_predictions(scores):
+    """JSON list PredictionResponse untuk banyak skor (bytes)."""
+    return b"[" + b",".join([encode_prediction(score) for score in scores]) + b"]"
@@ -0,0 +1,360 @@
+"""
+Prescient - Asynchronous Scoring Jobs
+
+File lead yang besar tidak di-skor di dalam request HTTP. POST /jobs hanya
+menyimpan job lalu langsung return job id; worker thread lokal yang
+memproses (tanpa broker eksternal):
+
+- Antrian dan status job persisten di SQLite (PRESCIENT_JOBS_DB); file
+  upload dan hasil disimpan di PRESCIENT_JOBS_DIR/<job id>/.
+- Sumber job adalah file upload, atau referensi ke file CSV di
+  PRESCIENT_JOBS_SOURCE_DIR (path di luar folder itu ditolak).
+- CSV dibaca per chunk (PRESCIENT_JOB_CHUNK_ROWS baris); setiap chunk
+  di-skor, skornya di-append ke results.f8 (float64, baris ke-i di byte 8*i)
+  dan progress di-commit. Hasil bisa diunduh per halaman selama job berjalan.
+- Cancel diperiksa di antara chunk.
+- Per user paling banyak PRESCIENT_JOBS_PER_USER job berjalan bersamaan dan
+  PRESCIENT_JOBS_MAX_QUEUED job aktif (antri + berjalan).
+- Claim job atomik (BEGIN IMMEDIATE), jadi aman dengan beberapa worker
+  process (serve.py). Job 'running' yang heartbeat-nya berhenti (proses
+  mati) dikembalikan ke antrian dan diulang dari awal.
+"""
+
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from lead_io import LEAD_SCHEMA, read_header
+from scoring import FEATURE_COLUMNS
+
+JOBS_DB = os.environ.get("PRESCIENT_JOBS_DB", "scoring_jobs.db")
+JOBS_DIR = os.environ.get("PRESCIENT_JOBS_DIR", "scoring_jobs")
+JOBS_SOURCE_DIR = os.environ.get("PRESCIENT_JOBS_SOURCE_DIR", "data")
+DEFAULT_WORKERS = int(os.environ.get("PRESCIENT_JOB_WORKERS", "1"))
+PER_USER_RUNNING = int(os.environ.get("PRESCIENT_JOBS_PER_USER", "1"))
+PER_USER_ACTIVE = int(os.environ.get("PRESCIENT_JOBS_MAX_QUEUED", "10"))
+CHUNK_ROWS = int(os.environ.get("PRESCIENT_JOB_CHUNK_ROWS", "50000"))
+MAX_UPLOAD_BYTES = int(float(os.environ.get("PRESCIENT_JOB_MAX_UPLOAD_MB", "512")) * 1024 * 1024)
+STALE_SECONDS = 300.0
+POLL_SECONDS = 5.0
+
+INPUT_FILENAME = "input.csv"
+RESULTS_FILENAME = "results.f8"
+ACTIVE_STATUSES = ('queued', 'running')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id               TEXT PRIMARY KEY,
+    username         TEXT NOT NULL,
+    status           TEXT NOT NULL DEFAULT 'queued',
+    model_version    TEXT NOT NULL,
+    source           TEXT NOT NULL,
+    uploaded         INTEGER NOT NULL DEFAULT 0,
+    total_rows       INTEGER,
+    processed_rows   INTEGER NOT NULL DEFAULT 0,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    created_at       REAL NOT NULL,
+    started_at       REAL,
+    heartbeat_at     REAL,
+    finished_at      REAL,
+    error            TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_jobs_status ON jobs (status, created_at);
+CREATE INDEX IF NOT EXISTS ix_jobs_user ON jobs (username, created_at);
+"""
+
+COLUMNS = ("id", "username", "status", "model_version", "source", "uploaded", "total_rows", "processed_rows",
+           "cancel_requested", "created_at", "started_at", "heartbeat_at", "finished_at", "error")
+
+class JobLimitError(Exception):
+    """User sudah mencapai batas job aktif."""
+
+class JobCancelled(Exception):
+    pass
+
+class JobInterrupted(Exception):
+    """Worker dihentikan (shutdown) di tengah job."""
+
+def count_rows(path):
+    """Jumlah baris data (tanpa header), dihitung dari newline per blok 1 MB."""
+    rows = 0
+    last = b"\n"
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(1024 * 1024)
+            if not block:
+                break
+            rows += block.count(b"\n")
+            last = block[-1:]
+    if last != b"\n":
+        rows += 1
+    return max(rows - 1, 0)
+
+def iter_lead_chunks(path, chunk_rows):
+    """
+    DataFrame FEATURE_COLUMNS per chunk (kolom lain diabaikan). Kolom kategori
+    sebagai category; numerik sebagai float64 supaya file upload dengan
+    desimal ("1618.0") tetap terbaca.
+    """
+    header = read_header(path, LEAD_SCHEMA.sep)
+    missing = [column for column in FEATURE_COLUMNS if column not in header]
+    if missing:
+        raise ValueError(f"Kolom wajib hilang: {', '.join(missing)}")
+    dtypes = {column: ('category' if dtype == 'category' else 'float64')
+              for column, dtype in LEAD_SCHEMA.dtypes(FEATURE_COLUMNS).items()}
+    reader = pd.read_csv(path, sep=LEAD_SCHEMA.sep, usecols=FEATURE_COLUMNS, dtype=dtypes, chunksize=chunk_rows)
+    with reader:
+        for chunk in reader:
+            yield chunk[FEATURE_COLUMNS]
+
+class ScoringJobs:
+    """
+    Antrian job persisten + worker thread.
+
+    score_chunk(model_version, df) -> array skor; disediakan main.py
+    (memakai model resident dan scorer tercepat yang tersedia).
+    """
+
+    def __init__(self, score_chunk, path=JOBS_DB, directory=JOBS_DIR, source_dir=JOBS_SOURCE_DIR,
+                 workers=DEFAULT_WORKERS, per_user_running=PER_USER_RUNNING, per_user_active=PER_USER_ACTIVE,
+                 chunk_rows=CHUNK_ROWS):
+        self.score_chunk = score_chunk
+        self.path = path
+        self.directory = directory
+        self.source_dir = source_dir
+        self.workers = workers
+        self.per_user_running = per_user_running
+        self.per_user_active = per_user_active
+        self.chunk_rows = chunk_rows
+
+        self._db_lock = threading.Lock()
+        self._conn = None
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads = []
+        self._start_lock = threading.Lock()
+
+    # ---------- storage ----------
+
+    def _db(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _execute(self, sql, params=()):
+        with self._db_lock:
+            return self._db().execute(sql, params)
+
+    def job_dir(self, job_id):
+        return os.path.join(self.directory, job_id)
+
+    def new_upload(self):
+        """(job_id, path) untuk file upload baru; panggil submit() setelah file selesai ditulis."""
+        job_id = uuid.uuid4().hex
+        os.makedirs(self.job_dir(job_id), exist_ok=True)
+        return job_id, os.path.join(self.job_dir(job_id), INPUT_FILENAME)
+
+    def discard_upload(self, job_id):
+        shutil.rmtree(self.job_dir(job_id), ignore_errors=True)
+
+    def resolve_source(self, reference):
+        """Path absolut file referensi; ValueError jika di luar source_dir atau tidak ada."""
+        root = os.path.realpath(self.source_dir)
+        path = os.path.realpath(os.path.join(root, reference))
+        if os.path.commonpath([root, path]) != root:
+            raise ValueError(f"Sumber harus berada di dalam {self.source_dir}/")
+        if not os.path.isfile(path):
+            raise ValueError(f"File sumber tidak ditemukan: {reference}")
+        return path
+
+    def submit(self, username, model_version, source, job_id=None, uploaded=False):
+        """Masukkan job ke antrian dan bangunkan worker. Raise JobLimitError."""
+        job_id = job_id or uuid.uuid4().hex
+        with self._db_lock:
+            db = self._db()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                (active,) = db.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE username = ? AND status IN (?, ?)",
+                    (username,) + ACTIVE_STATUSES,
+                ).fetchone()
+                if active >= self.per_user_active:
+                    raise JobLimitError(f"Maksimal {self.per_user_active} job aktif per user")
+                db.execute(
+                    "INSERT INTO jobs (id, username, model_version, source, uploaded, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (job_id, username, model_version, source, int(uploaded), time.time()),
+                )
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        self.start()
+        self._wakeup.set()
+        return job_id
+
+    def get(self, job_id, username=None):
+        """Dict status job (None jika tidak ada atau milik user lain)."""
+        row = self._execute(f"SELECT {', '.join(COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(COLUMNS, row))
+        if username is not None and job["username"] != username:
+            return None
+        return job
+
+    def list(self, username, limit=50):
+        rows = self._execute(
+            f"SELECT {', '.join(COLUMNS)} FROM jobs WHERE username = ? ORDER BY created_at DESC LIMIT ?",
+            (username, limit),
+        ).fetchall()
+        return [dict(zip(COLUMNS, row)) for row in rows]
+
+    def cancel(self, job_id):
+        """Job antri langsung dibatalkan; job berjalan berhenti di batas chunk berikutnya."""
+        now = time.time()
+        with self._db_lock:
+            db = self._db()
+            db.execute("UPDATE jobs SET status = 'cancelled', finished_at = ? WHERE id = ? AND status = 'queued'",
+                       (now, job_id))
+            db.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = 'running'", (job_id,))
+
+    def results(self, job_id, offset, limit):
+        """Skor baris offset..offset+limit yang sudah diproses (np.float64 array)."""
+        job = self.get(job_id)
+        stop = min(offset + limit, job["processed_rows"])
+        if stop <= offset:
+            return np.empty(0)
+        with open(os.path.join(self.job_dir(job_id), RESULTS_FILENAME), 'rb') as f:
+            f.seek(offset * 8)
+            return np.frombuffer(f.read((stop - offset) * 8), dtype='<f8')
+
+    # ---------- worker ----------
+
+    def _claim(self):
+        """Ambil job antri tertua dari user yang belum mencapai batas job berjalan (atomik)."""
+        now = time.time()
+        with self._db_lock:
+            db = self._db()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                # Job dari proses yang mati diulang dari awal
+                db.execute(
+                    "UPDATE jobs SET status = 'queued', processed_rows = 0 WHERE status = 'running' AND heartbeat_at < ?",
+                    (now - STALE_SECONDS,),
+                )
+                row = db.execute(
+                    "SELECT id, model_version, source FROM jobs WHERE status = 'queued' AND username NOT IN ("
+                    "  SELECT username FROM jobs WHERE status = 'running' GROUP BY username HAVING COUNT(*) >= ?"
+                    ") ORDER BY created_at LIMIT 1",
+                    (self.per_user_running,),
+                ).fetchone()
+                if row is not None:
+                    db.execute(
+                        "UPDATE jobs SET status = 'running', processed_rows = 0, started_at = ?, heartbeat_at = ? "
+                        "WHERE id = ?",
+                        (now, now, row[0]),
+                    )
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        return row
+
+    def _progress(self, job_id, processed_rows):
+        """Commit progress; raise JobCancelled jika cancel diminta, JobInterrupted saat shutdown."""
+        with self._db_lock:
+            db = self._db()
+            db.execute("UPDATE jobs SET processed_rows = ?, heartbeat_at = ? WHERE id = ?",
+                       (processed_rows, time.time(), job_id))
+            (cancel,) = db.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if cancel:
+            raise JobCancelled()
+        if self._stopping.is_set():
+            raise JobInterrupted()
+
+    def _finish(self, job_id, status, error=None):
+        self._execute("UPDATE jobs SET status = ?, finished_at = ?, error = ? WHERE id = ?",
+                      (status, time.time(), error, job_id))
+
+    def _run(self, job_id, model_version, source):
+        os.makedirs(self.job_dir(job_id), exist_ok=True)
+        self._execute("UPDATE jobs SET total_rows = ? WHERE id = ?", (count_rows(source), job_id))
+        processed = 0
+        with open(os.path.join(self.job_dir(job_id), RESULTS_FILENAME), 'wb') as results:
+            self._progress(job_id, processed)
+            for chunk in iter_lead_chunks(source, self.chunk_rows):
+                if chunk.isna().any().any():
+                    raise ValueError(f"Baris {processed + 2}-{processed + len(chunk) + 1} berisi nilai kosong")
+                scores = np.asarray(self.score_chunk(model_version, chunk), dtype='<f8')
+                results.write(scores.tobytes())
+                results.flush()
+                processed += len(scores)
+                self._progress(job_id, processed)
+
+    def _worker(self):
+        while not self._stopping.is_set():
+            job = self._claim()
+            if job is None:
+                self._wakeup.wait(POLL_SECONDS)
+                self._wakeup.clear()
+                continue
+
+            job_id, model_version, source = job
+            started = time.monotonic()
+            try:
+                self._run(job_id, model_version, source)
+            except JobCancelled:
+                print(f"🛑 Job {job_id} dibatalkan")
+                self._finish(job_id, 'cancelled')
+            except JobInterrupted:
+                # Diulang dari awal saat worker berikutnya start
+                self._execute("UPDATE jobs SET status = 'queued', processed_rows = 0 WHERE id = ?", (job_id,))
+            except Exception as e:
+                print(f"❌ Job {job_id} gagal: {e}")
+                self._finish(job_id, 'failed', str(e)[:500])
+            else:
+                print(f"✓ Job {job_id} selesai dalam {time.monotonic() - started:.1f}s")
+                self._finish(job_id, 'done')
+
+    def start(self):
+        """Jalankan worker thread (idempotent)."""
+        with self._start_lock:
+            if self._threads or self._stopping.is_set():
+                return self
+            self._db()
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        return self
+
+    def stop(self, timeout=10):
+        """Hentikan worker; job yang sedang berjalan kembali ke antrian di batas chunk berikutnya."""
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        self._stopping.clear()
+
+    # ---------- monitoring ----------
+
+    def stats(self):
+        counts = dict(self._execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        return {
+            "workers": self.workers,
+            "started": bool(self._threads),
+            "per_user_running": self.per_user_running,
+            **{status: counts.get(status, 0) for status in ('queued', 'running', 'done', 'failed', 'cancelled')},
+        }
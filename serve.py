@@ -0,0 +1,289 @@
+"""
+Prescient - Production Server Launcher (pre-fork)
+
+`uvicorn main:app` menjalankan satu proses saja, dan `uvicorn --workers N`
+memakai spawn sehingga setiap worker meng-import pandas/sklearn dan memuat
+model sendiri. Launcher ini:
+
+1. Meng-import main.py dan memuat model SEKALI di proses parent, lalu
+   gc.freeze() supaya garbage collector tidak menyentuh (dan menyalin)
+   halaman memori objek yang sudah ada.
+2. Membuka satu socket listen dan fork N worker; setiap worker menjalankan
+   uvicorn di socket yang sama. Halaman model dibagi copy-on-write.
+3. Memilih event loop dan HTTP parser tercepat yang terpasang
+   (uvloop/httptools, fallback asyncio/h11).
+4. Mengawasi worker: worker yang mati diganti, SIGHUP me-restart worker
+   bergiliran tanpa menutup socket, SIGTERM/SIGINT shutdown graceful.
+
+State yang harus sama di semua worker tidak disimpan per proses:
+
+- revocation token, pointer model default, versi shadow dan perubahan tabel
+  lead ada di shared_state.py (SQLite), diperiksa per request lewat
+  `PRAGMA data_version`;
+- bucket rate limit dipindah ke memori bersama sebelum fork;
+- proses shadow scoring hanya satu, dijalankan parent (tick di loop Arbiter);
+- outbox email dan job scoring di-claim per worker dengan heartbeat.
+
+Yang tetap per proses hanya cache (token terverifikasi, penjelasan SHAP).
+
+Usage:
+    python serve.py                            # WEB_CONCURRENCY atau jumlah CPU
+    python serve.py --workers 4 --port 8000
+    python serve.py --max-requests 50000       # recycle worker berkala
+    kill -HUP <pid parent>                     # restart worker bergiliran
+"""
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+
+import uvicorn
+
+DEFAULT_HOST = "0.0.0.0"
+DEFAULT_PORT = 8000
+DEFAULT_BACKLOG = 2048
+GRACEFUL_TIMEOUT = 30
+MIN_WORKER_LIFETIME = 1.0   # worker yang mati lebih cepat dari ini dianggap crash loop
+
+def pick_loop():
+    try:
+        import uvloop  # noqa: F401
+        return "uvloop"
+    except ImportError:
+        return "asyncio"
+
+def pick_http():
+    try:
+        import httptools  # noqa: F401
+        return "httptools"
+    except ImportError:
+        return "h11"
+
+def default_workers():
+    return int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 1))
+
+# ==================== PRELOAD ====================
+
+def preload():
+    """
+    Import aplikasi dan muat model di parent, lalu bekukan heap untuk
+    copy-on-write. Return modul main (app + hook pemilik state bersama).
+    """
+    gc.disable()
+    import main
+    from database import engine
+
+    main.load_models()
+    # State bersama (shared_state.py) dan queue shadow dibuat sekali per
+    # server di sini, bukan di startup setiap worker
+    main.init_shared_state()
+    main.PREFORK_WORKER = True
+    # Bucket rate limit dibagi semua worker (bukan batas x jumlah worker)
+    main.RATE_LIMITER.use_shared_buckets()
+    # Koneksi database tidak boleh dibagi antar proses
+    engine.dispose()
+
+    gc.collect()
+    gc.freeze()
+    return main
+
+def bind_socket(host, port, backlog=DEFAULT_BACKLOG):
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+# ==================== ARBITER ====================
+
+class Arbiter:
+    """
+    Parent process: fork, awasi dan restart worker uvicorn. `tick` dipanggil
+    di setiap putaran loop dan `on_shutdown` setelah semua worker berhenti
+    (tugas yang hanya boleh jalan sekali per server, misalnya shadow scoring).
+    """
+
+    def __init__(self, app, sock, workers, loop, http, log_level="info", max_requests=None,
+                 tick=None, on_shutdown=None):
+        self.app = app
+        self.sock = sock
+        self.workers = workers
+        self.loop = loop
+        self.http = http
+        self.log_level = log_level
+        self.max_requests = max_requests
+        self.tick = tick
+        self.on_shutdown = on_shutdown
+        self.children = {}    # pid -> waktu spawn (monotonic)
+        self.retiring = set()  # pid lama yang sedang shutdown saat SIGHUP
+        self._stopping = False
+        self._reload = False
+
+    # ---------- worker ----------
+
+    def spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                code = self._run_worker()
+            finally:
+                os._exit(code)
+        self.children[pid] = time.monotonic()
+        return pid
+
+    def _run_worker(self):
+        for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGCHLD):
+            signal.signal(sig, signal.SIG_DFL)
+        # Objek hasil preload tetap frozen; objek baru dikelola GC seperti biasa
+        gc.enable()
+
+        config = uvicorn.Config(
+            self.app,
+            loop=self.loop,
+            http=self.http,
+            lifespan="on",
+            log_level=self.log_level,
+            limit_max_requests=self.max_requests,
+            timeout_graceful_shutdown=GRACEFUL_TIMEOUT,
+        )
+        server = uvicorn.Server(config)
+        server.run(sockets=[self.sock])
+        return 0 if server.started else 3
+
+    # ---------- supervisor ----------
+
+    def _handle_stop(self, signum, frame):
+        self._stopping = True
+
+    def _handle_reload(self, signum, frame):
+        self._reload = True
+
+    def _reap(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            started = self.children.pop(pid, None)
+            if pid in self.retiring:
+                self.retiring.discard(pid)
+                continue
+            if started is not None and not self._stopping:
+                code = os.waitstatus_to_exitcode(status)
+                print(f"⚠️  Worker {pid} berhenti (exit {code}), menjalankan pengganti")
+                if time.monotonic() - started < MIN_WORKER_LIFETIME:
+                    time.sleep(MIN_WORKER_LIFETIME)
+
+    def _rolling_restart(self):
+        """Ganti worker satu per satu: spawn baru dulu, lalu hentikan yang lama"""
+        print(f"🔄 SIGHUP: restart {len(self.children)} worker bergiliran")
+        for pid in list(self.children):
+            if self._stopping:
+                return
+            new_pid = self.spawn()
+            self.children.pop(pid, None)
+            self.retiring.add(pid)
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                self.retiring.discard(pid)
+            print(f"   worker {pid} -> {new_pid}")
+            time.sleep(MIN_WORKER_LIFETIME)
+            self._reap()
+
+    def _tick(self):
+        if self.tick is None:
+            return
+        try:
+            self.tick()
+        except Exception as e:
+            print(f"⚠️  Tick parent gagal: {e}")
+
+    def _shutdown(self):
+        pids = list(self.children) + list(self.retiring)
+        print(f"🛑 Shutdown: menghentikan {len(pids)} worker...")
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+        deadline = time.monotonic() + GRACEFUL_TIMEOUT + 5
+        while (self.children or self.retiring) and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.1)
+        for pid in list(self.children) + list(self.retiring):
+            print(f"   worker {pid} tidak berhenti, SIGKILL")
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        if self.on_shutdown is not None:
+            self.on_shutdown()
+        self.sock.close()
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGHUP, self._handle_reload)
+
+        for _ in range(self.workers):
+            self.spawn()
+        print(f"✅ {self.workers} worker berjalan (pid parent {os.getpid()}): {sorted(self.children)}")
+
+        while not self._stopping:
+            self._reap()
+            if self._reload:
+                self._reload = False
+                self._rolling_restart()
+            while not self._stopping and len(self.children) < self.workers:
+                self.spawn()
+            self._tick()
+            time.sleep(0.5)
+
+        self._shutdown()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Jalankan Prescient API dengan pre-fork worker.')
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=int(os.environ.get("PORT", DEFAULT_PORT)))
+    parser.add_argument('--workers', type=int, default=default_workers(),
+                        help='Jumlah worker (default: WEB_CONCURRENCY atau jumlah CPU)')
+    parser.add_argument('--max-requests', type=int, default=None,
+                        help='Restart worker setelah N request (default: tidak pernah)')
+    parser.add_argument('--log-level', default='info')
+    args = parser.parse_args(argv)
+
+    loop, http = pick_loop(), pick_http()
+
+    print("\n" + "="*60)
+    print("PRESCIENT - PREDICTIVE LEAD SCORING API (pre-fork)")
+    print("="*60)
+    print(f"Workers: {args.workers}   Loop: {loop}   HTTP: {http}")
+    print(f"Listening: http://{args.host}:{args.port}")
+    print("="*60 + "\n")
+
+    if not hasattr(os, "fork"):
+        # Windows: tidak ada fork, jalankan satu proses biasa
+        print("⚠️  os.fork tidak tersedia, menjalankan 1 worker tanpa pre-fork")
+        uvicorn.run("main:app", host=args.host, port=args.port, loop=loop, http=http, log_level=args.log_level)
+        return 0
+
+    application = preload()
+    sock = bind_socket(args.host, args.port)
+    Arbiter(application.app, sock, args.workers, loop, http, log_level=args.log_level,
+            max_requests=args.max_requests, tick=application.owner_tick,
+            on_shutdown=application.owner_shutdown).run()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
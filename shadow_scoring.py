@@ -0,0 +1,284 @@
+"""
+Prescient - Shadow Scoring
+
+Model kandidat (shadow) ikut menilai salinan setiap request /predict di
+proses worker terpisah, sehingga latency /predict tidak terpengaruh.
+
+- Request disalin ke queue yang dibatasi (maxsize). Jika penuh, salinan
+  langsung di-drop (dihitung di `dropped`), tidak pernah mengantri tanpa batas.
+- Worker berjalan dengan CPU budget sendiri: nice level lebih rendah,
+  affinity CPU opsional, dan thread BLAS/OpenMP dibatasi 1.
+- Worker mengirim ringkasan per batch (delta skor, perubahan label) yang
+  digabung ke aggregate streaming di proses utama.
+- Di serve.py hanya ada satu worker shadow, dijalankan parent: queue dan
+  counter dibuat sebelum fork sehingga semua worker HTTP bisa submit().
+"""
+
+import os
+import queue
+import threading
+import time
+from multiprocessing import get_context
+
+from scoring import FEATURE_COLUMNS, label_for_score
+
+DEFAULT_QUEUE_SIZE = 1000
+DEFAULT_BATCH_SIZE = 64
+
+# ==================== WORKER PROCESS ====================
+
+def _apply_cpu_budget(nice, cpus):
+    """Turunkan prioritas worker dan (opsional) kunci ke CPU tertentu."""
+    if nice:
+        try:
+            os.nice(nice)
+        except OSError:
+            pass
+    if cpus and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, cpus)
+        except OSError:
+            pass
+
+def _shadow_worker(model_path, tasks, results, batch_size, nice, cpus):
+    """
+    Loop worker: ambil batch salinan request, skor dengan model shadow,
+    lalu kirim ringkasan batch ke proses utama.
+    """
+    _apply_cpu_budget(nice, cpus)
+
+    import joblib
+    import pandas as pd
+    from threadpoolctl import threadpool_limits
+
+    threadpool_limits(1)
+    model = joblib.load(model_path)
+
+    while True:
+        item = tasks.get()
+        if item is None:
+            break
+        batch = [item]
+        stop = False
+        while len(batch) < batch_size:
+            try:
+                item = tasks.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                stop = True
+                break
+            batch.append(item)
+
+        rows = [features for features, _ in batch]
+        primary_scores = [score for _, score in batch]
+        started = time.perf_counter()
+        try:
+            shadow_scores = model.predict_proba(pd.DataFrame(rows, columns=FEATURE_COLUMNS))[:, 1]
+        except Exception as e:
+            results.put({"errors": len(batch), "error": str(e)})
+            if stop:
+                break
+            continue
+
+        summary = BatchSummary()
+        for primary, shadow in zip(primary_scores, shadow_scores):
+            summary.add(float(primary), float(shadow))
+        summary.seconds = time.perf_counter() - started
+        results.put(summary.as_dict())
+
+        if stop:
+            break
+
+# ==================== STREAMING AGGREGATES ====================
+
+class BatchSummary:
+    """
+    Aggregate streaming untuk delta skor (shadow - primary) dan label flip.
+
+    Mean/variance memakai Welford, dan dua summary bisa digabung
+    (algoritma paralel Chan), jadi memori tetap O(1) berapapun trafiknya.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.abs_sum = 0.0
+        self.max_abs = 0.0
+        self.flips = 0
+        self.transitions = {}
+        self.errors = 0
+        self.seconds = 0.0
+
+    def add(self, primary, shadow):
+        delta = shadow - primary
+        self.count += 1
+        diff = delta - self.mean
+        self.mean += diff / self.count
+        self.m2 += diff * (delta - self.mean)
+        self.abs_sum += abs(delta)
+        self.max_abs = max(self.max_abs, abs(delta))
+
+        primary_label = label_for_score(primary)
+        shadow_label = label_for_score(shadow)
+        if primary_label != shadow_label:
+            self.flips += 1
+            key = f"{primary_label} -> {shadow_label}"
+            self.transitions[key] = self.transitions.get(key, 0) + 1
+
+    def merge(self, other):
+        if other.get("errors"):
+            self.errors += other["errors"]
+        count = other.get("count", 0)
+        if not count:
+            return
+        total = self.count + count
+        diff = other["mean"] - self.mean
+        self.mean += diff * count / total
+        self.m2 += other["m2"] + diff * diff * self.count * count / total
+        self.count = total
+        self.abs_sum += other["abs_sum"]
+        self.max_abs = max(self.max_abs, other["max_abs"])
+        self.flips += other["flips"]
+        for key, value in other["transitions"].items():
+            self.transitions[key] = self.transitions.get(key, 0) + value
+        self.seconds += other["seconds"]
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self.m2,
+            "abs_sum": self.abs_sum,
+            "max_abs": self.max_abs,
+            "flips": self.flips,
+            "transitions": self.transitions,
+            "errors": self.errors,
+            "seconds": self.seconds,
+        }
+
+# ==================== SHADOW SCORER ====================
+
+class ShadowScorer:
+    """
+    Mengelola proses worker shadow dan aggregate hasilnya.
+
+    Queue dan counter dibuat di konstruktor (di serve.py: di parent sebelum
+    fork), sehingga `submit()` bisa dipanggil dari proses mana saja: hanya
+    put_nowait ke queue terbatas, tanpa menunggu worker. start(), stop() dan
+    stats() hanya dipanggil oleh satu proses pemilik.
+    """
+
+    def __init__(self, max_queue=DEFAULT_QUEUE_SIZE, batch_size=DEFAULT_BATCH_SIZE, nice=10, cpus=None):
+        self.version = None
+        self.model_path = None
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.nice = nice
+        self.cpus = cpus
+
+        self._ctx = get_context("spawn")
+        self._tasks = self._ctx.Queue(maxsize=max_queue)
+        self._results = self._ctx.Queue()
+        self._running = self._ctx.Value("b", 0)
+        self._submitted = self._ctx.Value("q", 0)
+        self._dropped = self._ctx.Value("q", 0)
+
+        self.summary = BatchSummary()
+        self._lock = threading.Lock()
+        self._process = None
+        self._collector = None
+
+    def start(self, version, model_path):
+        """Jalankan worker shadow untuk version (worker lama dihentikan, aggregate direset)."""
+        self.stop()
+        self.version = version
+        self.model_path = model_path
+        self.summary = BatchSummary()
+        for counter in (self._submitted, self._dropped):
+            with counter.get_lock():
+                counter.value = 0
+        self._process = self._ctx.Process(
+            target=_shadow_worker,
+            args=(model_path, self._tasks, self._results, self.batch_size, self.nice, self.cpus),
+            name=f"shadow-{version}",
+            daemon=True,
+        )
+        self._process.start()
+        self._collector = threading.Thread(target=self._collect, name="shadow-collector", daemon=True)
+        self._collector.start()
+        self._running.value = 1
+        return self
+
+    def _collect(self):
+        while True:
+            result = self._results.get()
+            if result is None:
+                break
+            with self._lock:
+                self.summary.merge(result)
+
+    @staticmethod
+    def _count(counter):
+        with counter.get_lock():
+            counter.value += 1
+
+    def submit(self, features, primary_score):
+        """Salin satu request ke worker shadow; drop jika worker tidak jalan atau queue penuh."""
+        if not self._running.value:
+            self._count(self._dropped)
+            return False
+        try:
+            self._tasks.put_nowait((features, primary_score))
+        except queue.Full:
+            self._count(self._dropped)
+            return False
+        self._count(self._submitted)
+        return True
+
+    def running(self):
+        return self._process is not None and self._process.is_alive()
+
+    def stop(self, timeout=5.0):
+        """Hentikan worker shadow; aggregate tetap tersedia lewat stats()."""
+        self._running.value = 0
+        if self._process is None:
+            return
+        try:
+            self._tasks.put_nowait(None)
+        except queue.Full:
+            pass
+        self._process.join(timeout)
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join(timeout)
+        self._results.put(None)
+        self._collector.join(timeout)
+        self._process = None
+
+    def stats(self):
+        """Snapshot aggregate: delta skor, flip rate, dan tekanan queue."""
+        with self._lock:
+            s = self.summary
+            count = s.count
+            variance = s.m2 / (count - 1) if count > 1 else 0.0
+            return {
+                "version": self.version,
+                "running": self.running(),
+                "submitted": self._submitted.value,
+                "dropped": self._dropped.value,
+                "scored": count,
+                "errors": s.errors,
+                "queue_capacity": self.max_queue,
+                "score_delta": {
+                    "mean": round(s.mean, 6),
+                    "std": round(variance ** 0.5, 6),
+                    "mean_abs": round(s.abs_sum / count, 6) if count else 0.0,
+                    "max_abs": round(s.max_abs, 6),
+                },
+                "label_flips": s.flips,
+                "label_flip_rate": round(s.flips / count, 6) if count else 0.0,
+                "transitions": dict(s.transitions),
+                "worker_ms_per_row": round(s.seconds * 1000 / count, 4) if count else None,
+            }
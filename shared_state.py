@@ -0,0 +1,158 @@
+"""
+Prescient - Shared Worker State
+
+serve.py menjalankan beberapa worker hasil fork; state yang harus sama di
+semua worker tidak boleh hanya disimpan di memori satu proses. SharedState
+menyimpannya di satu file SQLite (mode WAL) yang dipakai bersama:
+
+- settings        : key -> JSON (pointer model default, konfigurasi shadow,
+                    snapshot statistik shadow)
+- revoked_tokens  : hash SHA-256 access token yang di-logout, sampai exp
+- lead_updates    : log perubahan LeadTable (status, skor, rescore) yang
+                    diputar ulang oleh worker lain
+
+Setiap worker tetap membaca dari cache memori. sync() dipanggil per request
+dan hanya menjalankan `PRAGMA data_version` (beberapa mikrodetik); nilainya
+berubah jika proses lain commit, dan baru saat itu listener yang terdaftar
+membaca ulang bagiannya. Tulisan dari proses sendiri sudah diterapkan
+langsung oleh pemanggilnya.
+
+Koneksi dibuka ulang otomatis setelah fork (koneksi SQLite tidak boleh
+dibagi antar proses).
+
+Environment:
+    PRESCIENT_SHARED_STATE_DB   file SQLite (default data/shared_state.db)
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+SHARED_STATE_DB = os.environ.get("PRESCIENT_SHARED_STATE_DB", os.path.join("data", "shared_state.db"))
+BUSY_TIMEOUT_SECONDS = 30
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS settings (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS revoked_tokens (
+    token_hash TEXT PRIMARY KEY,
+    exp        REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS lead_updates (
+    id      INTEGER PRIMARY KEY AUTOINCREMENT,
+    lead_id TEXT,
+    field   TEXT NOT NULL,
+    value   BLOB NOT NULL
+);
+"""
+
+class SharedState:
+    """State lintas worker di SQLite dengan deteksi perubahan lewat data_version."""
+
+    def __init__(self, path=SHARED_STATE_DB):
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = None
+        self._pid = None
+        self._inherited = None
+        self._data_version = None
+        self._listeners = []
+
+    # ---------- connection ----------
+
+    def _connection(self):
+        if self._conn is None or self._pid != os.getpid():
+            # Koneksi warisan parent tidak boleh ditutup di child (close bisa
+            # checkpoint/menghapus WAL yang masih dipakai parent), cukup ditinggal
+            self._inherited = self._conn
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_SECONDS,
+                                   isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn, self._pid = conn, os.getpid()
+            self._data_version = None
+        return self._conn
+
+    # ---------- change detection ----------
+
+    def subscribe(self, listener):
+        """Daftarkan callable tanpa argumen yang dipanggil saat proses lain mengubah state."""
+        self._listeners.append(listener)
+
+    def sync(self):
+        """
+        Panggil listener jika ada commit dari proses lain sejak sync terakhir
+        (juga pada sync pertama setelah koneksi dibuka, misalnya setelah fork).
+        """
+        with self._lock:
+            version = self._connection().execute("PRAGMA data_version").fetchone()[0]
+            if version == self._data_version:
+                return False
+            self._data_version = version
+        for listener in self._listeners:
+            listener()
+        return True
+
+    # ---------- settings ----------
+
+    def get(self, key, default=None):
+        with self._lock:
+            row = self._connection().execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set(self, key, value):
+        with self._lock:
+            self._connection().execute(
+                "INSERT INTO settings (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, json.dumps(value)),
+            )
+
+    # ---------- revoked tokens ----------
+
+    def revoke(self, token_hash, exp):
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM revoked_tokens WHERE exp <= ?", (time.time(),))
+            conn.execute("INSERT OR REPLACE INTO revoked_tokens (token_hash, exp) VALUES (?, ?)", (token_hash, exp))
+
+    def revoked_tokens(self):
+        """{token_hash: exp} untuk token yang belum kadaluarsa."""
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT token_hash, exp FROM revoked_tokens WHERE exp > ?", (time.time(),)).fetchall()
+        return dict(rows)
+
+    # ---------- lead updates ----------
+
+    def append_lead_update(self, lead_id, field, value):
+        """Catat perubahan lead; return id log-nya."""
+        with self._lock:
+            cursor = self._connection().execute(
+                "INSERT INTO lead_updates (lead_id, field, value) VALUES (?, ?, ?)", (lead_id, field, value))
+            return cursor.lastrowid
+
+    def lead_updates(self, after_id):
+        """List (id, lead_id, field, value) dengan id > after_id, urut id."""
+        with self._lock:
+            return self._connection().execute(
+                "SELECT id, lead_id, field, value FROM lead_updates WHERE id > ? ORDER BY id", (after_id,)).fetchall()
+
+    def compact_lead_scores(self, before_id):
+        """Hapus log skor sebelum before_id (sudah ditimpa rescore dengan id before_id)."""
+        with self._lock:
+            self._connection().execute(
+                "DELETE FROM lead_updates WHERE id < ? AND field IN ('score', 'scores')", (before_id,))
+
+    def clear_lead_updates(self):
+        with self._lock:
+            self._connection().execute("DELETE FROM lead_updates")
+
+SHARED_STATE = SharedState()
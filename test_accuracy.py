@@ -5,12 +5,15 @@ import pandas as pd
 import pickle
 import numpy as np
 
+from lead_io import load_csv
+from lead_table import tier_counts
+
 print("\n" + "="*70)
 print("ANALISIS AKURASI PREDIKSI - CSV vs MODEL")
 print("="*70 + "\n")
 
 # Load CSV data
-df = pd.read_csv('bank-full.csv')
+df = load_csv('bank-full.csv')
 print(f"📊 Total data: {len(df)} leads\n")
 
 # Load trained model
@@ -49,9 +52,8 @@ print(f"   • 0.5-0.8 (Warm): {len(df[(df['Skor Probabilitas'] > 0.5) & (df['Sk
 print(f"   • <0.5 (Cold): {len(df[df['Skor Probabilitas'] <= 0.5])} leads ({len(df[df['Skor Probabilitas'] <= 0.5])/len(df)*100:.1f}%)\n")
 
 print("🤖 Model Prediksi (GradientBoosting):")
-hot = len(df[df['Model_Score'] > 0.75])
-warm = len(df[(df['Model_Score'] > 0.45) & (df['Model_Score'] <= 0.75)])
-cold = len(df[df['Model_Score'] <= 0.45])
+counts = tier_counts(df['Model_Score'].to_numpy())
+hot, warm, cold = counts['Hot Lead'], counts['Warm Lead'], counts['Cold Lead']
 print(f"   • Hot Lead (>0.75): {hot} leads ({hot/len(df)*100:.1f}%)")
 print(f"   • Warm Lead (0.45-0.75): {warm} leads ({warm/len(df)*100:.1f}%)")
 print(f"   • Cold Lead (≤0.45): {cold} leads ({cold/len(df)*100:.1f}%)\n")
@@ -145,7 +145,8 @@ try:
     
     response = requests.post(
         f'{base_url}/predict',
-        json=sample_data
+        json=sample_data,
+        headers={'Authorization': f'Bearer {access_token}'}
     )
     if response.status_code == 200:
         data = response.json()
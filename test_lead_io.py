@@ -0,0 +1,40 @@
+"""
+Test lead_io: frame dari cache biner harus bisa ditulis seperti hasil parse CSV
+
+Usage:
+    python -m pytest test_lead_io.py -q
+"""
+
+import shutil
+
+import pytest
+
+import lead_io
+from lead_io import load_csv
+
+LEADS_PATH = "bank-full.csv"
+
+@pytest.fixture
+def lead_cache(tmp_path, monkeypatch):
+    """CACHE_DIR kosong di folder sementara, plus salinan bank-full.csv."""
+    monkeypatch.setattr(lead_io, "CACHE_DIR", str(tmp_path / "cache"))
+    path = tmp_path / "bank-full.csv"
+    shutil.copyfile(LEADS_PATH, path)
+    return str(path)
+
+@pytest.mark.parametrize("use_pyarrow", [True, False])
+def test_cached_frame_is_writable(lead_cache, monkeypatch, use_pyarrow):
+    if use_pyarrow and not lead_io.HAS_PYARROW:
+        pytest.skip("pyarrow tidak terpasang")
+    monkeypatch.setattr(lead_io, "HAS_PYARROW", use_pyarrow)
+
+    cold = load_csv(lead_cache)
+    warm = load_csv(lead_cache)
+    assert warm.equals(cold)
+
+    for df in (cold, warm):
+        df.loc[df.index[:3], 'Prediksi'] = 'Hot Lead'
+        df.loc[df.index[:3], 'Status'] = 'done'
+        df['Pekerjaan'] = df['Pekerjaan'].cat.add_categories(['x'])
+        df.loc[df.index[0], 'Pekerjaan'] = 'x'
+        assert (df['Prediksi'].iloc[:3] == 'Hot Lead').all()
@@ -48,14 +48,30 @@ print("\n" + "="*70)
 print("PRESCIENT - PREDICT ENDPOINT TEST")
 print("="*70 + "\n")
 
-url = "http://127.0.0.1:8000/predict"
+base_url = "http://127.0.0.1:8000"
+url = f"{base_url}/predict"
+
+# /predict butuh token: register (abaikan jika sudah ada) lalu login
+TEST_USER = {"email": "predict@test.com", "username": "predictuser", "password": "predict123"}
+headers = {}
+try:
+    requests.post(f"{base_url}/auth/register", json=TEST_USER)
+    login = requests.post(f"{base_url}/auth/token",
+                          json={"username": TEST_USER["username"], "password": TEST_USER["password"]})
+    if login.status_code == 200:
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        print("🔑 Login OK, token diterima")
+    else:
+        print(f"⚠️  Login gagal ({login.status_code}): {login.text}")
+except requests.exceptions.ConnectionError:
+    pass
 
 for test in test_cases:
     print(f"\n🧪 Testing: {test['name']}")
     print(f"   Input: {json.dumps(test['data'], indent=6)}")
     
     try:
-        response = requests.post(url, json=test['data'])
+        response = requests.post(url, json=test['data'], headers=headers)
         
         if response.status_code == 200:
             result = response.json()
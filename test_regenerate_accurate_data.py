@@ -0,0 +1,49 @@
+"""
+Test regenerate_accurate_data: rescore bank-full.csv dengan cache lead yang
+sudah hangat (frame dari cache biner harus bisa ditulis)
+
+Usage:
+    python -m pytest test_regenerate_accurate_data.py -q
+"""
+
+import os
+import shutil
+
+import pytest
+
+import lead_io
+import regenerate_accurate_data
+from lead_io import LEAD_SCHEMA, load_csv
+
+LEADS_PATH = "bank-full.csv"
+
+@pytest.fixture
+def leads_csv(tmp_path, monkeypatch):
+    if not os.path.exists(regenerate_accurate_data.LEGACY_MODEL_PATH):
+        pytest.skip("prescient_model.pkl tidak ada")
+    monkeypatch.setattr(lead_io, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(regenerate_accurate_data.ModelRegistry, "default_version", lambda self: None)
+    path = tmp_path / "bank-full.csv"
+    shutil.copyfile(LEADS_PATH, path)
+    return str(path)
+
+def test_force_rescore_with_warm_cache(leads_csv):
+    load_csv(leads_csv, schema=LEAD_SCHEMA)  # hangatkan cache
+    regenerate_accurate_data.main(['--data', leads_csv, '--force'])
+
+    df = load_csv(leads_csv, schema=LEAD_SCHEMA)
+    assert df['model_version'].str.startswith('legacy-').all()
+    assert df['Prediksi'].notna().all()
+
+def test_incremental_rescore_with_warm_cache(leads_csv, capsys):
+    regenerate_accurate_data.main(['--data', leads_csv])
+
+    # Ubah input satu baris, hangatkan cache untuk file baru, lalu rescore lagi
+    df = load_csv(leads_csv, schema=LEAD_SCHEMA, cache=False)
+    df.loc[0, 'Saldo'] += 1000
+    regenerate_accurate_data.write_csv_atomic(df, leads_csv)
+    load_csv(leads_csv, schema=LEAD_SCHEMA)
+    capsys.readouterr()
+
+    regenerate_accurate_data.main(['--data', leads_csv])
+    assert "Rescored: 1 rows" in capsys.readouterr().out
@@ -43,6 +43,7 @@ except Exception as e:
 
 # Test 4: Login
 print('\n4. Login User...')
+headers = {}
 try:
     r = requests.post(f'{base}/auth/token', json={
         'username': 'demouser',
@@ -52,6 +53,7 @@ try:
     if r.status_code == 200:
         data = r.json()
         print(f'   Token received: {data["access_token"][:30]}...')
+        headers = {'Authorization': f'Bearer {data["access_token"]}'}
     else:
         print(f'   Response: {r.json()}')
 except Exception as e:
@@ -71,7 +73,7 @@ r = requests.post(f'{base}/predict', json={
     "housing": "yes", "loan": "no", "contact": "cellular",
     "day": 15, "month": "may", "duration": 300, "campaign": 2,
     "pdays": -1, "previous": 0, "poutcome": "unknown"
-})
+}, headers=headers)
 print(f'   Status: {r.status_code}')
 if r.status_code == 200:
     data = r.json()
@@ -23,13 +23,15 @@ from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 from sklearn.ensemble import GradientBoostingClassifier
 from sklearn.metrics import classification_report, confusion_matrix, roc_auc_score, accuracy_score
+from lead_io import LEAD_SCHEMA, load_csv
+from model_registry import ModelRegistry
 import pickle
+import time
 import warnings
 warnings.filterwarnings('ignore')
 
-print("\n" + "="*60)
-print("PRESCIENT - GRADIENT BOOSTING MODEL TRAINING")
-print("="*60 + "\n")
+FEATURE_COLUMNS = ['Pekerjaan', 'Saldo', 'Personal Loan', 'Housing Loan',
+                   'Marital', 'Campaign', 'duration']
 
 def load_and_prepare_data(filepath='bank-full.csv'):
     """
@@ -42,9 +44,18 @@ def load_and_prepare_data(filepath='bank-full.csv'):
     Target: Skor Probabilitas > 0.5 → 1 (conversion), else → 0
     """
     print(f"📂 Loading data dari: {filepath}")
-    df = pd.read_csv(filepath)
+    df = load_csv(filepath, schema=LEAD_SCHEMA)
     print(f"✓ Data berhasil dimuat: {df.shape[0]} rows, {df.shape[1]} columns\n")
     
+    return prepare_target(df)
+
+def prepare_target(df):
+    """
+    Buat target biner dan feature 'duration' dari DataFrame yang sudah dimuat.
+    
+    Dipisah dari load_and_prepare_data supaya benchmark_training.py bisa
+    mengukur stage load dan target prep secara terpisah.
+    """
     # Create realistic target distribution based on various factors
     # Karena semua data punya score 0.95, kita buat distribusi realistis
     # berdasarkan kombinasi features untuk training yang proper
@@ -86,10 +97,7 @@ def load_and_prepare_data(filepath='bank-full.csv'):
     df['duration'] = df['duration'].clip(0, 1000)  # 0-1000 seconds
     
     # Select features
-    feature_cols = ['Pekerjaan', 'Saldo', 'Personal Loan', 'Housing Loan', 
-                    'Marital', 'Campaign', 'duration']
-    
-    X = df[feature_cols].copy()
+    X = df[FEATURE_COLUMNS].copy()
     y = df['target'].copy()
     
     print("📊 Target Distribution:")
@@ -123,6 +131,19 @@ def create_preprocessing_pipeline():
     
     return preprocessor
 
+def create_classifier():
+    """GradientBoostingClassifier dengan hyperparameters produksi."""
+    return GradientBoostingClassifier(
+        n_estimators=300,
+        max_depth=10,
+        learning_rate=0.1,
+        min_samples_split=10,
+        min_samples_leaf=5,
+        subsample=0.8,
+        random_state=42,
+        verbose=0
+    )
+
 def train_model(X, y):
     """
     Train GradientBoostingClassifier dengan hyperparameters optimal.
@@ -148,16 +169,7 @@ def train_model(X, y):
     print("   - min_samples_leaf: 5")
     print("   - subsample: 0.8\n")
     
-    gb_classifier = GradientBoostingClassifier(
-        n_estimators=300,
-        max_depth=10,
-        learning_rate=0.1,
-        min_samples_split=10,
-        min_samples_leaf=5,
-        subsample=0.8,
-        random_state=42,
-        verbose=0
-    )
+    gb_classifier = create_classifier()
     
     # Create full pipeline
     pipeline = Pipeline([
@@ -218,7 +230,14 @@ def train_model(X, y):
     print(f"   CV Scores: {cv_scores}")
     print(f"   Mean CV Score: {cv_scores.mean():.4f} (+/- {cv_scores.std()*2:.4f})\n")
     
-    return pipeline
+    metrics = {
+        "train_accuracy": round(float(train_score), 4),
+        "test_accuracy": round(float(test_score), 4),
+        "roc_auc": round(float(roc_auc), 4),
+        "cv_accuracy_mean": round(float(cv_scores.mean()), 4),
+    }
+    
+    return pipeline, metrics
 
 def save_model(pipeline, filepath='prescient_model.pkl'):
     """Save trained pipeline to disk."""
@@ -228,16 +247,32 @@ def save_model(pipeline, filepath='prescient_model.pkl'):
     print("✓ Model saved successfully!\n")
 
 def main():
+    print("\n" + "="*60)
+    print("PRESCIENT - GRADIENT BOOSTING MODEL TRAINING")
+    print("="*60 + "\n")
+    
     try:
         # Load data
         X, y = load_and_prepare_data('bank-full.csv')
         
         # Train model
-        pipeline = train_model(X, y)
+        start = time.perf_counter()
+        pipeline, metrics = train_model(X, y)
+        training_seconds = time.perf_counter() - start
         
         # Save model
         save_model(pipeline, 'prescient_model.pkl')
         
+        # Register versi baru di model registry
+        metadata = ModelRegistry().register(
+            pipeline,
+            trainer='train_gradient_model.py',
+            metrics=metrics,
+            training_data='bank-full.csv',
+            training_seconds=training_seconds,
+        )
+        print(f"📚 Registered model version: {metadata['version']} (default)\n")
+        
         print("="*60)
         print("✅ MODEL TRAINING COMPLETED SUCCESSFULLY!")
         print("="*60)
@@ -13,7 +13,10 @@ from sklearn.preprocessing import StandardScaler, OneHotEncoder
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 from sklearn.metrics import classification_report, confusion_matrix, roc_auc_score
+from lead_io import BANK_SCHEMA, load_csv
+from model_registry import ModelRegistry
 import joblib
+import time
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -32,7 +35,7 @@ def load_data(filepath):
     Load dataset bank dengan delimiter semicolon
     """
     print(f"\n📂 Loading data dari: {filepath}")
-    df = pd.read_csv(filepath, delimiter=';')
+    df = load_csv(filepath, schema=BANK_SCHEMA)
     print(f"✓ Data berhasil dimuat: {df.shape[0]} rows, {df.shape[1]} columns")
     return df
 
@@ -44,7 +47,7 @@ def preprocess_data(df):
     
     # Pisahkan features (X) dan target (y)
     X = df.drop('y', axis=1)
-    y = df['y'].map({'no': 0, 'yes': 1})  # Convert ke binary
+    y = (df['y'] == 'yes').astype(int)  # Convert ke binary
     
     print(f"✓ Features shape: {X.shape}")
     print(f"✓ Target distribution:\n{y.value_counts()}")
@@ -52,15 +55,20 @@ def preprocess_data(df):
     
     return X, y
 
-def create_preprocessing_pipeline():
+def create_preprocessing_pipeline(categorical_features=None, numerical_features=None):
     """
     Membuat pipeline preprocessing dengan ColumnTransformer
+
+    Default kolom mengikuti dataset bank marketing (delimiter ';').
+    Kolom lain bisa diberikan, misalnya oleh benchmark_training.py.
     """
     # Definisi kolom kategorikal dan numerik
-    categorical_features = ['job', 'marital', 'education', 'default', 
-                          'housing', 'loan', 'contact', 'month', 'poutcome']
-    numerical_features = ['age', 'balance', 'day', 'duration', 
-                         'campaign', 'pdays', 'previous']
+    if categorical_features is None:
+        categorical_features = ['job', 'marital', 'education', 'default', 
+                              'housing', 'loan', 'contact', 'month', 'poutcome']
+    if numerical_features is None:
+        numerical_features = ['age', 'balance', 'day', 'duration', 
+                             'campaign', 'pdays', 'previous']
     
     print(f"\n🔄 Membuat preprocessing pipeline...")
     print(f"   Categorical features: {len(categorical_features)}")
@@ -158,7 +166,9 @@ def train_and_evaluate(pipeline, X_train, X_test, y_train, y_test):
     print(f"ROC-AUC Score: {roc_auc:.4f}")
     print("="*60)
     
-    return pipeline
+    metrics = {"roc_auc": round(float(roc_auc), 4)}
+    
+    return pipeline, metrics
 
 def save_model(pipeline, filepath='prescient_model.pkl'):
     """
@@ -203,11 +213,27 @@ def main():
     pipeline = create_model_pipeline(preprocessor)
     
     # 6. Train and evaluate
-    trained_pipeline = train_and_evaluate(pipeline, X_train, X_test, y_train, y_test)
+    start = time.perf_counter()
+    trained_pipeline, metrics = train_and_evaluate(pipeline, X_train, X_test, y_train, y_test)
+    training_seconds = time.perf_counter() - start
     
     # 7. Save model
     save_model(trained_pipeline)
     
+    # 8. Register versi baru di model registry. Model ini memakai skema bank
+    # marketing (';'), bukan FEATURE_COLUMNS yang dipakai route scoring, jadi
+    # tidak pernah dijadikan default.
+    metadata = ModelRegistry().register(
+        trained_pipeline,
+        trainer='train_model.py',
+        metrics=metrics,
+        training_data='bank-full.csv',
+        training_seconds=training_seconds,
+        set_default=False,
+    )
+    print(f"📚 Registered model version: {metadata['version']} "
+          "(bukan default: skema bank marketing, tidak cocok dengan FEATURE_COLUMNS)")
+    
     print("\n" + "="*60)
     print("✅ TRAINING SELESAI!")
     print("="*60)
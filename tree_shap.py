@@ -0,0 +1,298 @@
+"""
+Prescient - TreeSHAP Explanations
+
+Kontribusi per fitur yang eksak (SHAP path-dependent, Lundberg et al.) untuk
+GradientBoostingClassifier, dalam satuan log-odds:
+
+    base_value + sum(contributions) == logit(prediction_score)
+
+Semua pohon di-flatten sekali per model menjadi tabel leaf. Untuk setiap
+leaf disimpan fitur unik di jalurnya, interval (lower, upper] tiap fitur dan
+zero fraction (proporsi cover data training yang melewati jalur tersebut).
+Untuk satu baris x, one_j = 1 jika x_j berada di interval fitur j, dan
+kontribusi leaf ke fitur i adalah
+
+    value * (one_i - zero_i) * sum_S w(|S|, M) * prod_{j in S} one_j * prod_{j not in S, j != i} zero_j
+
+Jumlah atas subset S dihitung dari koefisien polinomial
+prod_j (zero_j + one_j * t) yang dibagi (zero_i + one_i * t), vektor
+untuk semua baris x semua leaf sekaligus (numpy, tanpa loop per pohon).
+Jalur yang lebih pendek dari M di-pad dengan fitur dummy (zero = one = 1)
+yang tidak mengubah nilai Shapley fitur lain.
+
+Kolom one-hot dijumlahkan kembali ke field input (tujuh kolom LeadInput)
+langsung saat scatter, karena nilai SHAP aditif.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+
+import numpy as np
+from sklearn.ensemble import GradientBoostingClassifier
+
+from lead_encoder import encoder_for
+
+# Batas elemen array (baris x leaf x M) per chunk, supaya memori tetap kecil untuk batch besar
+CHUNK_ELEMENTS = 2_000_000
+LATENCY_WINDOW = 1000
+
+# ==================== TREE EXPLAINER ====================
+
+def flatten_tree(tree, scale):
+    """
+    List (value, {fitur: (lower, upper, zero_fraction)}) untuk setiap leaf
+    sklearn tree: x mencapai leaf jika lower < x[fitur] <= upper untuk semua
+    fitur di jalurnya. value sudah dikali scale (learning rate).
+    """
+    tree = tree.tree_
+    left, right = tree.children_left, tree.children_right
+    cover = tree.weighted_n_node_samples
+    leaves = []
+    stack = [(0, {})]
+    while stack:
+        node, path = stack.pop()
+        if left[node] == -1:
+            leaves.append((float(tree.value[node].ravel()[0]) * scale, path))
+            continue
+        feature, threshold = int(tree.feature[node]), float(tree.threshold[node])
+        lower, upper, zero_fraction = path.get(feature, (-np.inf, np.inf, 1.0))
+        # sklearn: x <= threshold ke kiri
+        for child, child_lower, child_upper in ((left[node], lower, min(upper, threshold)),
+                                                (right[node], max(lower, threshold), upper)):
+            child_path = dict(path)
+            child_path[feature] = (child_lower, child_upper, zero_fraction * cover[child] / cover[node])
+            stack.append((child, child_path))
+    return leaves
+
+class TreeExplainer:
+    """TreeSHAP vektor untuk ensemble pohon regresi (skor = init + scale * sum pohon)."""
+
+    def __init__(self, trees, scale, init_value, groups, n_groups):
+        leaves = []
+        for tree in trees:
+            leaves.extend(flatten_tree(tree, scale))
+
+        depth = max(1, max(len(path) for _, path in leaves))
+        n_leaves = len(leaves)
+        self.n_groups = n_groups
+        self.depth = depth
+        self.values = np.empty(n_leaves)
+        # Slot padding: interval tak hingga, zero fraction 1, masuk ke kolom buangan n_groups
+        self.features = np.zeros((n_leaves, depth), dtype=np.int64)
+        self.lower = np.full((n_leaves, depth), -np.inf)
+        self.upper = np.full((n_leaves, depth), np.inf)
+        self.zero_fractions = np.ones((n_leaves, depth))
+        self.slot_groups = np.full((n_leaves, depth), n_groups, dtype=np.int64)
+
+        for leaf, (value, path) in enumerate(leaves):
+            self.values[leaf] = value
+            for slot, (feature, (lower, upper, zero_fraction)) in enumerate(path.items()):
+                self.features[leaf, slot] = feature
+                self.lower[leaf, slot] = lower
+                self.upper[leaf, slot] = upper
+                self.zero_fractions[leaf, slot] = zero_fraction
+                self.slot_groups[leaf, slot] = groups[feature]
+
+        # w(s, M) = s! (M - s - 1)! / M!
+        self.weights = np.array([
+            math.factorial(s) * math.factorial(depth - s - 1) / math.factorial(depth) for s in range(depth)
+        ])
+        # Nilai harapan model = init + sum leaf value * peluang mencapai leaf (menurut cover)
+        self.expected_value = float(init_value + np.sum(self.values * np.prod(self.zero_fractions, axis=1)))
+
+    @classmethod
+    def from_gradient_boosting(cls, classifier, groups, n_groups):
+        """TreeExplainer untuk GradientBoostingClassifier biner, atau None."""
+        if not isinstance(classifier, GradientBoostingClassifier) or classifier.estimators_.shape[1] != 1:
+            return None
+        trees = classifier.estimators_[:, 0]
+        # Init (log-odds prior) = decision_function dikurangi kontribusi semua pohon
+        probe = np.zeros((1, classifier.n_features_in_))
+        init_value = classifier.decision_function(probe)[0] - classifier.learning_rate * sum(
+            tree.predict(probe)[0] for tree in trees)
+        return cls(trees, classifier.learning_rate, init_value, groups, n_groups)
+
+    def shap_values(self, X):
+        """Kontribusi (n, n_groups) dalam log-odds untuk matriks fitur X (n, n_features)."""
+        # Pohon sklearn membandingkan fitur sebagai float32
+        X = np.asarray(X, dtype=np.float32)
+        n_rows = X.shape[0]
+        out = np.empty((n_rows, self.n_groups))
+        chunk = max(1, CHUNK_ELEMENTS // self.lower.size)
+        for start in range(0, n_rows, chunk):
+            x = X[start:start + chunk][:, self.features]
+            one = ((x > self.lower) & (x <= self.upper)).astype(np.float64)
+            out[start:start + chunk] = self._scatter(self._leaf_contributions(one))
+        return out
+
+    def _leaf_contributions(self, one):
+        """Kontribusi (n, leaf, M) dari indikator one (n, leaf, M)."""
+        zero = self.zero_fractions
+        depth = self.depth
+        n_rows, n_leaves, _ = one.shape
+
+        # Koefisien t^0..t^M dari prod_j (zero_j + one_j * t)
+        poly = np.zeros((depth + 1, n_rows, n_leaves))
+        poly[0] = 1.0
+        for j in range(depth):
+            poly[1:j + 2] = poly[1:j + 2] * zero[:, j] + poly[:j + 1] * one[:, :, j]
+            poly[0] *= zero[:, j]
+
+        phi = np.empty_like(one)
+        for i in range(depth):
+            one_i, zero_i = one[:, :, i], zero[:, i]
+            # Bagi dengan (zero_i + t) dari koefisien teratas jika one_i = 1, atau dengan zero_i jika one_i = 0
+            quotient = poly[depth].copy()
+            total_in = self.weights[depth - 1] * quotient
+            for k in range(depth - 1, 0, -1):
+                quotient = poly[k] - zero_i * quotient
+                total_in += self.weights[k - 1] * quotient
+            total_out = np.tensordot(self.weights, poly[:depth], axes=1) / zero_i
+            phi[:, :, i] = self.values * (one_i - zero_i) * np.where(one_i > 0, total_in, total_out)
+        return phi
+
+    def _scatter(self, phi):
+        """Jumlahkan kontribusi slot leaf ke kolom group-nya (satu bincount untuk semua baris)."""
+        n_rows = phi.shape[0]
+        width = self.n_groups + 1
+        index = (np.arange(n_rows)[:, None, None] * width + self.slot_groups).ravel()
+        totals = np.bincount(index, weights=phi.ravel(), minlength=n_rows * width)
+        return totals.reshape(n_rows, width)[:, :self.n_groups]
+
+# ==================== LEAD EXPLAINER ====================
+
+class LeadExplainer:
+    """LeadEncoder + TreeExplainer: skor dan kontribusi per field input."""
+
+    def __init__(self, encoder, tree_explainer, fields):
+        self.encoder = encoder
+        self.tree_explainer = tree_explainer
+        self.fields = fields
+
+    @classmethod
+    def from_pipeline(cls, pipeline):
+        encoder = encoder_for(pipeline)
+        if encoder is None:
+            return None
+        fields, groups = encoder.field_groups()
+        tree_explainer = TreeExplainer.from_gradient_boosting(encoder.classifier, groups, len(fields))
+        if tree_explainer is None:
+            return None
+        return cls(encoder, tree_explainer, fields)
+
+    @property
+    def base_value(self):
+        return self.tree_explainer.expected_value
+
+    def explain_rows(self, rows):
+        """
+        (scores, contributions) untuk list dict lead; contributions adalah
+        list dict {field: log-odds}. Raise UnknownCategory.
+        """
+        X = self.encoder.encode_rows(rows)
+        scores = self.encoder.classifier.predict_proba(X)[:, 1]
+        values = self.tree_explainer.shap_values(X)
+        contributions = [dict(zip(self.fields, row)) for row in values.tolist()]
+        return scores, contributions
+
+_EXPLAINERS = {}
+_EXPLAINERS_LOCK = threading.Lock()
+
+def explainer_for(model):
+    """LeadExplainer untuk model (flatten pohon sekali, di-cache), atau None jika tidak didukung."""
+    entry = _EXPLAINERS.get(id(model))
+    if entry is not None and entry[0] is model:
+        return entry[1]
+    with _EXPLAINERS_LOCK:
+        entry = _EXPLAINERS.get(id(model))
+        if entry is None or entry[0] is not model:
+            entry = (model, LeadExplainer.from_pipeline(model))
+            _EXPLAINERS[id(model)] = entry
+    return entry[1]
+
+def release_explainer(model):
+    """Lepaskan LeadExplainer (dan referensi model) saat model dikeluarkan dari memori."""
+    with _EXPLAINERS_LOCK:
+        entry = _EXPLAINERS.get(id(model))
+        if entry is not None and entry[0] is model:
+            del _EXPLAINERS[id(model)]
+
+# ==================== CACHE ====================
+
+class ExplanationCache:
+    """
+    LRU (versi model, fitur lead) -> (skor, kontribusi).
+
+    Skor disimpan bersama penjelasannya, jadi cache hit tidak memanggil
+    predict_proba maupun TreeSHAP. Latency dicatat per baris yang dihitung.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._row_latency = deque(maxlen=LATENCY_WINDOW)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def record_latency(self, seconds, rows):
+        """Catat waktu penjelasan per baris (seconds untuk `rows` baris)."""
+        if rows:
+            with self._lock:
+                self._row_latency.append(seconds / rows)
+
+    def stats(self):
+        with self._lock:
+            values = np.array(self._row_latency) * 1000
+            stats = {"entries": len(self._entries), "max_entries": self.max_entries,
+                     "hits": self.hits, "misses": self.misses}
+        if len(values):
+            p50, p95 = np.percentile(values, [50, 95])
+            stats["ms_per_row"] = {"p50": round(float(p50), 3), "p95": round(float(p95), 3),
+                                   "max": round(float(values.max()), 3)}
+        else:
+            stats["ms_per_row"] = None
+        return stats
+
+def explain_cached(cache, version, explainer, rows):
+    """
+    (scores, contributions, seconds_per_row) untuk rows; baris yang sudah
+    ada di cache tidak dihitung ulang. seconds_per_row None jika semua hit.
+    """
+    keys = [(version,) + tuple(row[field] for field in explainer.fields) for row in rows]
+    results = [cache.get(key) for key in keys]
+    missing = [i for i, result in enumerate(results) if result is None]
+
+    seconds_per_row = None
+    if missing:
+        started = time.perf_counter()
+        scores, contributions = explainer.explain_rows([rows[i] for i in missing])
+        elapsed = time.perf_counter() - started
+        cache.record_latency(elapsed, len(missing))
+        seconds_per_row = elapsed / len(missing)
+        for i, score, contribution in zip(missing, scores.tolist(), contributions):
+            results[i] = (score, contribution)
+            cache.put(keys[i], results[i])
+
+    return [r[0] for r in results], [r[1] for r in results], seconds_per_row
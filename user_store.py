@@ -0,0 +1,123 @@
+"""
+Prescient - User Store untuk serverless auth (api/auth.py, netlify/functions/auth.py)
+
+Menggantikan data/users.json yang dibaca dan ditulis ulang seluruhnya setiap
+login/register. User disimpan di SQLite (mode WAL):
+
+- Lookup O(1)/O(log n) lewat PRIMARY KEY username dan UNIQUE index email,
+  tanpa parse seluruh file.
+- Register adalah satu INSERT dalam transaksi; keunikan username/email
+  dijaga oleh constraint database, jadi register bersamaan tidak saling
+  menimpa.
+- Penulis bersamaan antar proses diserialisasi oleh lock file SQLite
+  (busy timeout), pembaca tidak diblokir penulis karena WAL.
+
+Saat pertama dibuka, isi users.json lama (jika ada) dimigrasikan sekali.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+
+BUSY_TIMEOUT_SECONDS = 30
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    username  TEXT PRIMARY KEY,
+    email     TEXT NOT NULL UNIQUE,
+    password  TEXT NOT NULL,
+    is_active INTEGER NOT NULL DEFAULT 1
+)
+"""
+
+class UserExists(Exception):
+    """Username atau email sudah terdaftar (`field` berisi kolom yang bentrok)."""
+
+    def __init__(self, field):
+        super().__init__(f"{field} sudah terdaftar")
+        self.field = field
+
+class UserStore:
+    """User store berbasis SQLite (WAL) dengan migrasi dari users.json."""
+
+    def __init__(self, path, legacy_json=None, default_users=None):
+        """
+        path: file SQLite. legacy_json: users.json lama untuk dimigrasikan.
+        default_users: callable yang mengembalikan list user awal, dipakai
+        hanya jika store masih kosong dan tidak ada users.json.
+        """
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_SECONDS,
+                                     isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(SCHEMA)
+        self._seed(legacy_json, default_users)
+
+    def _seed(self, legacy_json, default_users):
+        if self._conn.execute("SELECT 1 FROM users LIMIT 1").fetchone():
+            return
+
+        if legacy_json and os.path.exists(legacy_json):
+            with open(legacy_json, 'r') as f:
+                users = list(json.load(f).values())
+        elif default_users is not None:
+            users = default_users()
+        else:
+            return
+
+        with self._lock:
+            # BEGIN IMMEDIATE: hanya satu proses yang melakukan migrasi
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO users (username, email, password, is_active) VALUES (?, ?, ?, ?)",
+                    [(u['username'], u['email'], u['password'], int(u.get('is_active', True))) for u in users],
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    @staticmethod
+    def _to_dict(row):
+        if row is None:
+            return None
+        user = dict(row)
+        user['is_active'] = bool(user['is_active'])
+        return user
+
+    def get_by_username(self, username):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM users WHERE username = ?", (username,)).fetchone()
+        return self._to_dict(row)
+
+    def get_by_email(self, email):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM users WHERE email = ?", (email,)).fetchone()
+        return self._to_dict(row)
+
+    def create(self, username, email, password, is_active=True):
+        """Tambah user; raise UserExists('username'|'email') jika bentrok."""
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT INTO users (username, email, password, is_active) VALUES (?, ?, ?, ?)",
+                    (username, email, password, int(is_active)),
+                )
+        except sqlite3.IntegrityError as e:
+            raise UserExists('email' if 'users.email' in str(e) else 'username')
+        return {"username": username, "email": email, "password": password, "is_active": is_active}
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+    def close(self):
+        self._conn.close()